@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+
+_START = time.perf_counter()
+
+import sys
+from typing import Dict, List, Optional
+
+try:
+    from . import run_all
+except Exception:
+    import run_all
+
+# `python -m crawlers [source ...] [run_all options]`: crawls only the named
+# sources, importing only their scrapers. Sources are named by label, output
+# basename or module (news, specs, launch_vehicle_specs, ...); none means all.
+IMPORT_SECONDS = time.perf_counter() - _START
+
+
+def source_names(follow: bool = True) -> Dict[str, str]:
+    # Every accepted name -> output basename
+    names: Dict[str, str] = {}
+    for source in run_all.build_sources(follow=follow):
+        names[source.label.lower()] = source.basename
+        names[source.basename] = source.basename
+        module = getattr(source.rows, "module", None)
+        if module:
+            names[module] = source.basename
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = run_all.build_parser("Crawl some or all ISRO sources into data/")
+    ap.prog = "python -m crawlers"
+    ap.add_argument("sources", nargs="*", metavar="source", help="sources to crawl (default: all); see --list")
+    ap.add_argument("--list", action="store_true", help="print the source names and exit")
+    args = ap.parse_args(argv)
+
+    names = source_names()
+    if args.list:
+        for source in run_all.build_sources(follow=True):
+            aliases = sorted(n for n, b in names.items() if b == source.basename and n != source.basename)
+            print(source.basename + (f" ({', '.join(aliases)})" if aliases else ""))
+        return 0
+    unknown = [s for s in args.sources if s.lower() not in names]
+    if unknown:
+        ap.error(f"unknown source(s): {', '.join(unknown)} (see --list)")
+    only = list(dict.fromkeys(names[s.lower()] for s in args.sources)) or None
+
+    kwargs = run_all.main_kwargs(args)
+    if only is not None and "mission_pages" in only:
+        kwargs["follow"] = True
+    print(f"Crawler imports took {IMPORT_SECONDS * 1000:.0f} ms", file=sys.stderr)
+    results = run_all.main(**kwargs, only=only, import_seconds=IMPORT_SECONDS)
+    return 1 if any(n is None for n in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
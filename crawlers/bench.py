@@ -0,0 +1,532 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    from .utils import PARSER_BACKENDS, Page, RowTable, best_table_by_headers, table_to_dicts, norm_key, parse_date, _parse_date_text
+    from .spacecraft_missions import EXPECTED_HEADERS as SPACECRAFT_HEADERS, TABLE as SPACECRAFT_TABLE, normalize_rows
+    from .normalize import ArrowBackend, PythonBackend, coerce_serial, is_header_row, normalize_table
+    from .launch_missions import EXPECTED_HEADERS as LAUNCH_HEADERS
+    from .mission_details import _find_heading_sections, _text
+    from .lazy import crawler_module, optional_module
+    from .launch_vehicle_specs import vehicle_page, vehicle_row
+    from .text_store import configure_text_store, get_text_store
+except Exception:
+    _CUR = os.path.dirname(os.path.abspath(__file__))
+    if _CUR not in sys.path:
+        sys.path.insert(0, _CUR)
+    from utils import PARSER_BACKENDS, Page, RowTable, best_table_by_headers, table_to_dicts, norm_key, parse_date, _parse_date_text
+    from spacecraft_missions import EXPECTED_HEADERS as SPACECRAFT_HEADERS, TABLE as SPACECRAFT_TABLE, normalize_rows
+    from normalize import ArrowBackend, PythonBackend, coerce_serial, is_header_row, normalize_table
+    from launch_missions import EXPECTED_HEADERS as LAUNCH_HEADERS
+    from mission_details import _find_heading_sections, _text
+    from lazy import crawler_module, optional_module
+    from launch_vehicle_specs import vehicle_page, vehicle_row
+    from text_store import configure_text_store, get_text_store
+
+
+# Fixture pages are saved ISRO HTML: plain *.html files or the *.gz blobs of
+# the response cache (data/.http_cache). The default is the small trimmed set
+# committed next to this file; point --fixtures at a cache for a full crawl's pages.
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_pages(root: str) -> List[Tuple[str, bytes]]:
+    pages: List[Tuple[str, bytes]] = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if name.endswith(".html"):
+            with open(path, "rb") as f:
+                pages.append((name, f.read()))
+        elif name.endswith(".gz"):
+            with gzip.open(path, "rb") as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    # Best of `repeat` runs, in seconds
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_best_table(soup: BeautifulSoup, expected_keys: Iterable[str]) -> Optional[Tag]:
+    # best_table_by_headers as it was before header-only scoring, kept as the baseline
+    candidates = soup.find_all("table")
+    if not candidates:
+        return None
+    expected = {norm_key(k) for k in expected_keys}
+    best: Optional[Tag] = None
+    best_score = -1
+    for t in candidates:
+        rows = table_to_dicts(t)
+        if not rows:
+            continue
+        keys = set().union(*[set(r.keys()) for r in rows])
+        score = len(keys & expected) * 100 + len(rows)
+        if score > best_score:
+            best_score = score
+            best = t
+    if best is None:
+        best = max(candidates, key=lambda x: len(table_to_dicts(x)) if table_to_dicts(x) else 0)
+    return best
+
+
+def bench_tables(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    soups = [BeautifulSoup(content, "lxml") for _, content in pages]
+    expected = list(SPACECRAFT_HEADERS) + list(LAUNCH_HEADERS)
+
+    for soup in soups:
+        if legacy_best_table(soup, expected) is not best_table_by_headers(soup, expected):
+            print("warning: table choice differs from the legacy scorer", file=sys.stderr)
+
+    def run(pick: Callable[[BeautifulSoup, Iterable[str]], Optional[Tag]]) -> Callable[[], None]:
+        def go():
+            for soup in soups:
+                t = pick(soup, expected)
+                if t is not None:
+                    table_to_dicts(t)
+        return go
+
+    return {
+        "legacy": timeit(run(legacy_best_table), repeat),
+        "current": timeit(run(best_table_by_headers), repeat),
+    }
+
+
+def legacy_parse_date(value: str) -> str:
+    # parse_date before the regex fast paths and memo, kept as the baseline
+    v = re.sub(r"\s+", " ", value).strip()
+    if not v:
+        return ""
+    for fmt in ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%b %Y", "%Y-%m-%d", "%Y"):
+        try:
+            dt = datetime.strptime(v, fmt)
+            return dt.date().isoformat()
+        except Exception:
+            pass
+    dateparser = optional_module("dateutil.parser")
+    if dateparser is not None:
+        try:
+            dt = dateparser.parse(v, dayfirst=False, yearfirst=False)
+            if dt:
+                return dt.date().isoformat()
+        except Exception:
+            pass
+    return v
+
+
+def bench_dates(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    # Every "date" cell of the launch and spacecraft tables found in the fixtures
+    values: List[str] = []
+    for _, content in pages:
+        soup = BeautifulSoup(content, "lxml")
+        for expected in (SPACECRAFT_HEADERS, LAUNCH_HEADERS):
+            t = best_table_by_headers(soup, expected)
+            if t is not None:
+                values.extend(r["date"] for r in table_to_dicts(t) if "date" in r)
+    if not values:
+        print("warning: no date cells found in the fixtures", file=sys.stderr)
+
+    mismatches = [v for v in values if legacy_parse_date(v) != parse_date(v, "bench.date")]
+    if mismatches:
+        print(f"warning: {len(mismatches)} dates differ from the legacy parser, e.g. {mismatches[0]!r}", file=sys.stderr)
+
+    def current():
+        _parse_date_text.cache_clear()
+        for v in values:
+            parse_date(v, "bench.date")
+
+    return {
+        "legacy": timeit(lambda: [legacy_parse_date(v) for v in values], repeat),
+        "current": timeit(current, repeat),
+    }
+
+
+def legacy_heading_sections(soup: BeautifulSoup) -> Dict[str, List[str]]:
+    # _find_heading_sections before the single walk: find_all_next() per heading
+    sections: Dict[str, List[str]] = {}
+    for h in soup.find_all(["h1", "h2", "h3", "h4"]):
+        title = _text(h).strip().lower()
+        if not title:
+            continue
+        items: List[str] = []
+        for sib in h.find_all_next():
+            if sib == h:
+                continue
+            if sib.name in {"h1", "h2", "h3", "h4"}:
+                break
+            if sib.name in {"ul", "ol"}:
+                for li in sib.find_all("li", recursive=False):
+                    t = _text(li)
+                    if t:
+                        items.append(t)
+            elif sib.name == "p":
+                t = _text(sib)
+                if t:
+                    items.append(t)
+        if items:
+            sections[title] = items
+    return sections
+
+
+def bench_sections(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    soups = [BeautifulSoup(content, "lxml") for _, content in pages]
+    for (name, _), soup in zip(pages, soups):
+        if legacy_heading_sections(soup) != _find_heading_sections(soup):
+            print(f"warning: sections of {name} differ from the legacy extractor", file=sys.stderr)
+    return {
+        "legacy": timeit(lambda: [legacy_heading_sections(s) for s in soups], repeat),
+        "current": timeit(lambda: [_find_heading_sections(s) for s in soups], repeat),
+    }
+
+
+def backend_extract(backend: str, content: bytes) -> Tuple[List[Tuple[str, str]], List[Optional[List[Dict[str, str]]]], str, Dict[str, str]]:
+    # Everything the link, table, text and spec crawlers take from a page
+    page = Page(content, PARSER_BACKENDS[backend])
+    tables = [page.table_rows(expected) for expected in (SPACECRAFT_HEADERS, LAUNCH_HEADERS)]
+    return page.links(), tables, page.text(), page.kv_pairs()
+
+
+def backend_mismatches(pages: List[Tuple[str, bytes]], backend: str, reference: str = "soup") -> List[str]:
+    # "<page>: <part>" for every answer `backend` gives differently from `reference`
+    out: List[str] = []
+    for name, content in pages:
+        want, got = backend_extract(reference, content), backend_extract(backend, content)
+        for part, a, b in zip(("links", "tables", "text", "kv_pairs"), want, got):
+            if a != b:
+                out.append(f"{name}: {part}")
+    return out
+
+
+def check_backends(pages: List[Tuple[str, bytes]]) -> List[str]:
+    # Every backend against soup on every fixture page
+    return [f"{name}: {m}" for name in sorted(PARSER_BACKENDS) if name != "soup" for m in backend_mismatches(pages, name)]
+
+
+# A module that takes a while to import, so threads resolving it together
+# overlap its import
+_SLOW_MODULE = """
+import time
+time.sleep(0.2)
+VALUE = 1
+"""
+_CONCURRENT_IMPORT = """
+import sys, threading
+sys.path[:0] = [sys.argv[1], sys.argv[2]]
+from lazy import crawler_module
+barrier = threading.Barrier(8)
+errors = []
+def resolve():
+    barrier.wait()
+    try:
+        crawler_module("slow_module").VALUE
+    except Exception as exc:
+        errors.append(repr(exc))
+threads = [threading.Thread(target=resolve) for _ in range(8)]
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+print("\\n".join(errors))
+"""
+
+
+def check_lazy_imports(pages: List[Tuple[str, bytes]]) -> List[str]:
+    # Eight threads resolve one slow crawler module at once, as the source
+    # threads of run_all --workers do; none may see it half imported
+    tmp = tempfile.mkdtemp(prefix="isro-lazy-")
+    try:
+        with open(os.path.join(tmp, "slow_module.py"), "w", encoding="utf-8") as f:
+            f.write(_SLOW_MODULE)
+        here = os.path.dirname(os.path.abspath(__file__))
+        out = subprocess.run([sys.executable, "-c", _CONCURRENT_IMPORT, tmp, here], capture_output=True, text=True)
+        if out.returncode:
+            return [f"concurrent import exited {out.returncode}: {out.stderr.strip()}"]
+        return [line for line in out.stdout.splitlines() if line]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def check_crawl(pages: List[Tuple[str, bytes]]) -> List[str]:
+    # A full crawl of the committed fixtures through crawl_bench, against the
+    # rows and requests of its baseline; crawl_bench imports this module, so
+    # it is loaded here
+    return crawler_module("crawl_bench").check()
+
+
+def rss_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_memory(fn: Callable[[], object]) -> Tuple[int, Optional[int]]:
+    # (peak Python heap in bytes, peak resident growth in KiB or None). The heap
+    # figure misses libxml2's own allocations, so on Linux the resident high
+    # water mark is reset and read back as well.
+    tracemalloc.start()
+    try:
+        fn()
+        heap = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    rss: Optional[int] = None
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        base = rss_kb("VmRSS")
+        fn()
+        peak = rss_kb("VmHWM")
+        if base is not None and peak is not None:
+            rss = max(0, peak - base)
+    except OSError:
+        pass
+    return heap, rss
+
+
+def bench_backends(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    names = ["soup"] + sorted(n for n in PARSER_BACKENDS if n != "soup")
+    for name in names[1:]:
+        mismatches = backend_mismatches(pages, name)
+        if mismatches:
+            print(f"warning: {name} differs from soup on {len(mismatches)} page parts, e.g. {mismatches[0]}", file=sys.stderr)
+
+    for name in names:
+        heaps, rss = [], []
+        for _, content in pages:
+            h, r = peak_memory(lambda: backend_extract(name, content))
+            heaps.append(h)
+            if r is not None:
+                rss.append(r)
+        worst = f"heap {max(heaps) / 1024:.0f} KiB" + (f", rss +{max(rss)} KiB" if rss else "")
+        print(f"backends: {name} peak memory per page (worst of {len(pages)}): {worst}")
+
+    def run(name: str) -> Callable[[], None]:
+        return lambda: [backend_extract(name, content) for _, content in pages]
+
+    return {name: timeit(run(name), repeat) for name in names}
+
+
+def archive_rows(pages: List[Tuple[str, bytes]], n: int) -> Iterator[Dict[str, str]]:
+    # n table rows cycled from the fixtures, every cell a fresh string as a
+    # parse would produce, standing in for a full historical archive
+    base = [row for _, content in pages for row in (Page(content, PARSER_BACKENDS["lxml"]).table_rows(SPACECRAFT_HEADERS) or [])]
+    for i in range(n if base else 0):
+        yield {k: (v + " ")[:-1] for k, v in base[i % len(base)].items()}
+
+
+def legacy_normalize_row(row: Dict[str, str]) -> Dict[str, str]:
+    # The per-row normalize_row() the table scrapers had before normalize.py
+    if "date" in row:
+        row["date"] = parse_date(row.get("date", ""), "spacecraft.date")
+    lvm = row.get("launch_vehicle_mission") or row.get("launch_vehicle") or ""
+    if lvm and "/" in lvm:
+        parts = [p.strip() for p in lvm.split("/", 1)]
+        row.setdefault("launch_vehicle", parts[0])
+        row.setdefault("mission", parts[1])
+    return row
+
+
+def legacy_as_current(rows: Iterable[Dict[str, str]]) -> List[Dict[str, object]]:
+    # Legacy output plus what the batch stage adds: header rows dropped, serials as ints
+    out = []
+    for row in rows:
+        if is_header_row(row):
+            continue
+        if "serial" in row:
+            row["serial"] = coerce_serial(row["serial"])
+        out.append(row)
+    return out
+
+
+def bench_rows(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    n = 20000
+
+    def legacy() -> List[Dict[str, str]]:
+        # A list of dicts, normalized into copies as normalize_rows() used to
+        rows = list(archive_rows(pages, n))
+        return [legacy_normalize_row(dict(r)) for r in rows]
+
+    def current() -> RowTable:
+        return normalize_rows(RowTable(archive_rows(pages, n)))
+
+    if legacy_as_current(legacy()) != list(current()):
+        print("warning: RowTable rows differ from the list of dicts", file=sys.stderr)
+    for label, fn in (("legacy", legacy), ("current", current)):
+        heap, _ = peak_memory(fn)
+        print(f"rows: {label} peak heap for {n} rows: {heap / 1024:.0f} KiB")
+    return {"legacy": timeit(legacy, repeat), "current": timeit(current, repeat)}
+
+
+def bench_normalize(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    # Normalizing only, over tables already held in memory: per row (with
+    # the same header and serial cleanup), then column-wise with each backend. The date memo is cleared before every
+    # run, so each one parses its dates from scratch.
+    n = 20000
+    base = list(archive_rows(pages, n))
+    backends = [("python", PythonBackend())]
+    if optional_module("pyarrow.compute") is not None:
+        backends.append(("arrow", ArrowBackend()))
+
+    outputs = {label: list(normalize_table(RowTable(base), SPACECRAFT_TABLE, be)) for label, be in backends}
+    expected = legacy_as_current(legacy_normalize_row(dict(r)) for r in base)
+    for label, out in outputs.items():
+        if out != expected:
+            print(f"warning: {label} normalize output differs from the per-row normalize", file=sys.stderr)
+
+    def per_row():
+        _parse_date_text.cache_clear()
+        return legacy_as_current(legacy_normalize_row(dict(r)) for r in base)
+
+    def batch(be) -> Callable[[], RowTable]:
+        tables = [RowTable(base) for _ in range(max(1, repeat))]
+
+        def go():
+            _parse_date_text.cache_clear()
+            return normalize_table(tables.pop(), SPACECRAFT_TABLE, be)
+
+        return go
+
+    timings = {"per-row": timeit(per_row, repeat)}
+    for label, be in backends:
+        timings[label] = timeit(batch(be), repeat)
+    return timings
+
+
+# Entry points timed by the startup benchmark, as imports from the directory
+# holding the crawlers package. The first imports every scraper up front,
+# the way run_all did before its sources were loaded lazily.
+STARTUP_IMPORTS: Dict[str, str] = {
+    "eager": "crawlers.run_all, crawlers.spacecraft_missions, crawlers.launch_missions, crawlers.timeline, "
+    "crawlers.upcoming_missions, crawlers.news, crawlers.launch_vehicle_specs, crawlers.mission_details, "
+    "crawlers.frontier, httpx, dateutil.parser, pyarrow, multiprocessing",
+    "run_all": "crawlers.run_all",
+    "news job": "crawlers.__main__, crawlers.news",
+}
+
+
+def import_seconds(modules: str) -> float:
+    # Total -X importtime self time of a fresh interpreter importing `modules`,
+    # minus the interpreter's own startup imports
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def total(code: str) -> float:
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=root, capture_output=True, text=True, check=True).stderr
+        return sum(int(m.group(1)) for m in re.finditer(r"^import time:\s+(\d+) \|", out, re.M)) / 1e6
+
+    return total(f"import {modules}") - total("pass")
+
+
+def bench_specs(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    # Vehicle spec rows from every page: the old 10,000-character text dump
+    # against structured fields plus a text store reference. Sizes are of the
+    # rows as JSON, which is what the API and its prompts carry; timings
+    # include parsing the page.
+    store_dir = tempfile.mkdtemp(prefix="isro-texts-")
+    configure_text_store(store_dir)
+    backend = PARSER_BACKENDS["lxml"]
+
+    def legacy() -> List[Dict]:
+        return [{"vehicle": name, "url": "", "content": Page(content, backend).text()[:10000]} for name, content in pages]
+
+    def current() -> List[Dict]:
+        return [vehicle_row(name, "", vehicle_page(Page(content, backend))) for name, content in pages]
+
+    try:
+        for label, fn in (("legacy", legacy), ("current", current)):
+            size = sum(len(json.dumps(row, ensure_ascii=False)) for row in fn())
+            print(f"specs: {label} rows {size / 1024:.1f} KiB as JSON")
+        print(f"specs: text store {get_text_store().size() / 1024:.1f} KiB for {len(pages)} pages")
+        return {"legacy": timeit(legacy, repeat), "current": timeit(current, repeat)}
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def bench_startup(pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, float]:
+    # Import cost of the crawler entry points; pages are not needed
+    return {label: min(import_seconds(modules) for _ in range(max(1, repeat))) for label, modules in STARTUP_IMPORTS.items()}
+
+
+BENCHMARKS: Dict[str, Callable[[List[Tuple[str, bytes]], int], Dict[str, float]]] = {
+    "tables": bench_tables,
+    "dates": bench_dates,
+    "sections": bench_sections,
+    "backends": bench_backends,
+    "rows": bench_rows,
+    "normalize": bench_normalize,
+    "specs": bench_specs,
+    "startup": bench_startup,
+}
+# Benchmarks that run without fixture pages
+PAGELESS = frozenset(("startup", "lazy", "crawl"))
+# Checks, run before the benchmarks: each returns its failures, and any failure
+# makes bench.py exit 1, so `python crawlers/bench.py parity` can gate a change
+# such as the lxml default ($ISRO_PARSER)
+CHECKS: Dict[str, Callable[[List[Tuple[str, bytes]]], List[str]]] = {
+    "parity": check_backends,
+    "lazy": check_lazy_imports,
+    "crawl": check_crawl,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    names = sorted(CHECKS) + sorted(BENCHMARKS)
+    ap = argparse.ArgumentParser(description="Parity checks and micro-benchmarks over saved ISRO pages")
+    ap.add_argument("which", nargs="*", default=names, help=f"checks and benchmarks to run: {', '.join(names)}")
+    ap.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="directory of saved pages (default: crawlers/fixtures)")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per benchmark; the best one is reported (default: 5)")
+    args = ap.parse_args(argv)
+    unknown = [n for n in args.which if n not in CHECKS and n not in BENCHMARKS]
+    if unknown:
+        ap.error(f"unknown: {', '.join(unknown)}")
+
+    pages = load_pages(args.fixtures) if os.path.isdir(args.fixtures) else []
+    if not pages and not PAGELESS.issuperset(args.which):
+        print(f"No fixture pages under {args.fixtures}", file=sys.stderr)
+        return 1
+    failed = False
+    for name in (n for n in args.which if n in CHECKS):
+        failures = CHECKS[name](pages)
+        for failure in failures:
+            print(f"{name}: FAIL {failure}", file=sys.stderr)
+        print(f"{name} [{len(pages)} pages]: {'FAIL' if failures else 'ok'}")
+        failed = failed or bool(failures)
+    for name in (n for n in args.which if n in BENCHMARKS):
+        timings = BENCHMARKS[name](pages, args.repeat)
+        # The first entry (the legacy code, or the soup backend) is the baseline
+        labels = list(timings)
+        base = timings[labels[0]] if labels else None
+        parts = []
+        for label, secs in timings.items():
+            extra = f" ({base / secs:.1f}x)" if base and label != labels[0] and secs > 0 else ""
+            parts.append(f"{label} {secs * 1000:.1f} ms{extra}")
+        print(f"{name} [{len(pages)} pages]: " + ", ".join(parts))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
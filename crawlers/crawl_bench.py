@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+try:
+    import resource
+except Exception:
+    resource = None
+
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+try:
+    from . import run_all
+    from .bench import DEFAULT_FIXTURES, rss_kb
+    from .utils import configure_async_transport, configure_session, set_host_budget
+except Exception:
+    _CUR = os.path.dirname(os.path.abspath(__file__))
+    if _CUR not in sys.path:
+        sys.path.insert(0, _CUR)
+    import run_all
+    from bench import DEFAULT_FIXTURES, rss_kb
+    from utils import configure_async_transport, configure_session, set_host_budget
+
+
+# End-to-end crawl benchmark. Recorded pages (a directory of .html files plus
+# manifest.json mapping each original URL to its file) are served by a local
+# stand-in server in a child process; run_all.main() crawls them with the
+# network redirected there, the cache off and no pacing delay. Results can be
+# saved as a baseline and later runs fail when they regress past a threshold.
+# The default fixtures are the trimmed pages committed in crawlers/fixtures,
+# with a manifest covering every URL a default crawl requests (list pages
+# with their numbered pages included) and the baseline recorded from them.
+MANIFEST = "manifest.json"
+BASELINE = "baseline.json"
+
+# Below this many seconds a change is noise, whatever the ratio. Stages also
+# get a floor of STAGE_FLOOR of the whole crawl, as short stages jitter most.
+NOISE_FLOOR = 0.005
+STAGE_FLOOR = 0.05
+
+
+def _slug(url: str) -> str:
+    parts = urlsplit(url)
+    name = re.sub(r"\.html?$", "", parts.path) + ("_" + parts.query if parts.query else "")
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", name).strip("_") or "index"
+
+
+def record(cache_dir: str, out: str) -> int:
+    # Fixtures from a response cache filled by a live crawl (data/.http_cache)
+    with open(os.path.join(cache_dir, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    os.makedirs(out, exist_ok=True)
+    manifest: Dict[str, str] = {}
+    used = set()
+    for url in sorted(index):
+        try:
+            blob = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".gz"
+            with gzip.open(os.path.join(cache_dir, blob), "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        name, n = _slug(url), 1
+        while f"{name}.html" in used:
+            n += 1
+            name = f"{_slug(url)}_{n}"
+        used.add(f"{name}.html")
+        with open(os.path.join(out, f"{name}.html"), "wb") as f:
+            f.write(content)
+        manifest[url] = f"{name}.html"
+    with open(os.path.join(out, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return len(manifest)
+
+
+def load_fixtures(root: str) -> Dict[str, bytes]:
+    with open(os.path.join(root, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages: Dict[str, bytes] = {}
+    for url, name in manifest.items():
+        with open(os.path.join(root, name), "rb") as f:
+            pages[url] = f.read()
+    return pages
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    # GET /<host><path>?<query> answers with the page recorded for https://<host><path>?<query>
+    pages: Dict[str, bytes] = {}
+
+    def do_GET(self):
+        body = self.pages.get("https://" + self.path.lstrip("/"))
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(root: str, conn):
+    _FixtureHandler.pages = load_fixtures(root)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+class _ReplayAdapter(HTTPAdapter):
+    # Sends every request to the stand-in server, keeping the original host in the path
+    def __init__(self, origin: str, **kwargs):
+        self.origin = origin
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = _replay_url(self.origin, request.url)
+        return super().send(request, **kwargs)
+
+
+def _replay_url(origin: str, url: str) -> str:
+    parts = urlsplit(url)
+    if parts.netloc == origin:
+        return url
+    return f"http://{origin}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+if httpx is not None:
+    class _ReplayTransport(httpx.AsyncHTTPTransport):
+        # _ReplayAdapter for the async crawler
+        def __init__(self, origin: str, **kwargs):
+            self.origin = origin
+            super().__init__(**kwargs)
+
+        async def handle_async_request(self, request):
+            request.url = httpx.URL(_replay_url(self.origin, str(request.url)))
+            return await super().handle_async_request(request)
+
+
+@contextlib.contextmanager
+def fixture_server(root: str):
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve, args=(root, child), daemon=True)
+    proc.start()
+    try:
+        if not parent.poll(30):
+            raise RuntimeError("fixture server did not start")
+        yield f"127.0.0.1:{parent.recv()}"
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def _reset_peak_rss() -> Optional[int]:
+    # Current RSS in KiB after resetting the high-water mark (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    return rss_kb("VmRSS")
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def crawl_once(
+    origin: str,
+    *,
+    workers: Optional[int] = None,
+    parse_workers: int = 0,
+    parser: Optional[str] = None,
+    use_async: bool = False,
+) -> Dict:
+    workdir = tempfile.mkdtemp(prefix="isro-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        set_host_budget(per_host=8, delay=0)
+        adapter = _ReplayAdapter(origin, pool_connections=8, pool_maxsize=8)
+        session = configure_session(pool_size=8)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if use_async:
+            configure_async_transport(lambda: _ReplayTransport(origin))
+
+        base_rss = _reset_peak_rss()
+        start, start_cpu, start_children = time.perf_counter(), time.process_time(), _children_cpu()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            counts = run_all.main(
+                workers=workers, parse_workers=parse_workers, parser=parser, report="report.json", use_async=use_async, cache=False
+            )
+        seconds = time.perf_counter() - start
+        cpu = time.process_time() - start_cpu + _children_cpu() - start_children
+        peak = rss_kb("VmHWM")
+        if base_rss is not None and peak is not None:
+            rss = max(0, peak - base_rss)
+        else:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else 0
+        with open("report.json", "r", encoding="utf-8") as f:
+            report = json.load(f)
+    finally:
+        configure_async_transport(None)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "seconds": seconds,
+        "cpu": cpu,
+        "rss_kb": rss,
+        "rows": counts,
+        "requests": report["requests"]["count"],
+        "stages": {k: {f: v[f] for f in ("seconds", "cpu") if f in v} for k, v in report["stages"].items()},
+    }
+
+
+def best_of(runs: List[Dict]) -> Dict:
+    # Smallest value of every timing and of the memory figure across the runs
+    out = dict(runs[0])
+    for field in ("seconds", "cpu", "rss_kb"):
+        out[field] = min(r[field] for r in runs)
+    stages: Dict[str, Dict[str, float]] = {}
+    for r in runs:
+        for name, values in r["stages"].items():
+            slot = stages.setdefault(name, dict(values))
+            for f, v in values.items():
+                slot[f] = min(slot.get(f, v), v)
+    out["stages"] = stages
+    return out
+
+
+def compare(baseline: Dict, result: Dict, threshold: float) -> List[str]:
+    regressions: List[str] = []
+
+    def check(label: str, base: Optional[float], cur: Optional[float], floor: float):
+        if base is None or cur is None:
+            return
+        if cur > base * (1 + threshold) and cur - base > floor:
+            change = f"+{(cur / base - 1) * 100:.0f}%" if base else "was 0"
+            regressions.append(f"{label}: {base:.4g} -> {cur:.4g} ({change})")
+
+    check("crawl seconds", baseline.get("seconds"), result["seconds"], NOISE_FLOOR)
+    check("crawl cpu", baseline.get("cpu"), result["cpu"], NOISE_FLOOR)
+    check("peak rss KiB", baseline.get("rss_kb"), result["rss_kb"], 1024)
+    stage_floor = max(NOISE_FLOOR, STAGE_FLOOR * baseline.get("seconds", 0.0))
+    for name, base in baseline.get("stages", {}).items():
+        cur = result["stages"].get(name, {})
+        for f in ("seconds", "cpu"):
+            check(f"{name} {f}", base.get(f), cur.get(f), stage_floor)
+    if baseline.get("rows") is not None and baseline["rows"] != result["rows"]:
+        regressions.append(f"rows changed: {baseline['rows']} -> {result['rows']}")
+    return regressions
+
+
+def check(root: str = DEFAULT_FIXTURES, baseline_path: Optional[str] = None) -> List[str]:
+    # One crawl of the fixtures against the baseline's rows and request
+    # count, which do not depend on the machine; timings are left to run()
+    with open(baseline_path or os.path.join(root, BASELINE), "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with fixture_server(root) as origin:
+        result = crawl_once(origin)
+    failures = [f"{label} failed" for label, n in result["rows"].items() if n is None]
+    if result["rows"] != baseline.get("rows"):
+        failures.append(f"rows {baseline.get('rows')} -> {result['rows']}")
+    if result["requests"] != baseline.get("requests"):
+        failures.append(f"requests {baseline.get('requests')} -> {result['requests']}")
+    return failures
+
+
+def run(args: argparse.Namespace) -> int:
+    if not os.path.exists(os.path.join(args.fixtures, MANIFEST)):
+        print(f"No {MANIFEST} under {args.fixtures}; record fixtures first", file=sys.stderr)
+        return 1
+    baseline_path = args.baseline or os.path.join(args.fixtures, BASELINE)
+    with fixture_server(args.fixtures) as origin:
+        # Unmeasured warm-up: lazy imports and first-use caches would otherwise
+        # land in whichever run comes first
+        crawl_once(origin, workers=args.workers, parse_workers=args.parse_workers, parser=args.parser, use_async=args.use_async)
+        runs = [
+            crawl_once(origin, workers=args.workers, parse_workers=args.parse_workers, parser=args.parser, use_async=args.use_async)
+            for _ in range(max(1, args.repeat))
+        ]
+    result = best_of(runs)
+
+    print(f"crawl: {result['seconds'] * 1000:.1f} ms wall, {result['cpu'] * 1000:.1f} ms cpu, "
+          f"peak rss +{result['rss_kb']} KiB, {result['requests']} requests")
+    for name, values in sorted(result["stages"].items(), key=lambda kv: -kv[1].get("cpu", kv[1]["seconds"])):
+        cpu = f", {values['cpu'] * 1000:.1f} ms cpu" if "cpu" in values else ""
+        print(f"  {name}: {values['seconds'] * 1000:.1f} ms{cpu}")
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, result, args.threshold)
+    for line in regressions:
+        print(f"regression: {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Replay recorded ISRO pages through a full crawl and compare with a baseline")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="turn a response cache filled by a live crawl into fixtures")
+    rec.add_argument("--cache", default=os.environ.get("ISRO_HTTP_CACHE", os.path.join("data", ".http_cache")))
+    rec.add_argument("--out", required=True, help="fixture directory to write")
+
+    r = sub.add_parser("run", help="crawl the fixtures and report timings")
+    r.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="directory holding manifest.json and the recorded pages (default: crawlers/fixtures)")
+    r.add_argument("--baseline", default=None, help=f"baseline file (default: <fixtures>/{BASELINE})")
+    r.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    r.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing (default: 0.2, i.e. 20%%)")
+    r.add_argument("--repeat", type=int, default=5, help="measured crawls after one warm-up; the best figures are kept (default: 5)")
+    r.add_argument("--workers", type=int, default=None, help="as run_all --workers (default: run_all's)")
+    r.add_argument("--parse-workers", type=int, default=0)
+    r.add_argument("--parser", default=None)
+    r.add_argument("--async", dest="use_async", action="store_true", help="crawl with the asyncio engine (needs httpx)")
+    args = ap.parse_args(argv)
+
+    if args.command == "record":
+        print(f"Recorded {record(args.cache, args.out)} pages into {args.out}")
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from .utils import load_rows, save_json
+    from .normalize import is_header_row
+except Exception:
+    from utils import load_rows, save_json
+    from normalize import is_header_row
+
+
+ENTITIES_PATH = os.path.join("data", "entities.json")
+
+# Applied to lowercased names before splitting, in order. Like the search
+# index synonyms these must mean the same in Python and JavaScript: the server
+# resolves ids with the copy saved in the entities file.
+ALIASES: List[Tuple[str, str]] = [
+    (r"\bgslv[\s\-_]*(?:mk|mark)[\s\-_.]*(?:iii|3)\b", "lvm3"),
+    (r"\blvm[\s\-_]*3\b", "lvm3"),
+    (r"\bgslv[\s\-_]*(?:mk|mark)[\s\-_.]*(?:ii|2)\b", "gslv"),
+    (r"\bmars orbiter mission\b|\bmangalyaan\b", "mom"),
+]
+NAME_SPLIT = r"[^a-z0-9]+"
+# Words that do not tell one mission from another
+FILLER = frozenset(("the", "of", "mission", "satellite", "spacecraft"))
+
+# Fuzzy matches need this much token overlap (Jaccard), and the same numbers
+MATCH_THRESHOLD = 0.6
+
+_alias_res = [(re.compile(p), r) for p, r in ALIASES]
+_split_re = re.compile(NAME_SPLIT)
+
+
+def canonical_id(name: str) -> str:
+    # "Aditya-L1", "Aditya L-1" -> "aditya-l1"; "GSLV Mk III-M1" -> "lvm3-m1"
+    s = (name or "").lower()
+    for pattern, repl in _alias_res:
+        s = pattern.sub(repl, s)
+    parts = [tok for tok in _split_re.split(s) if tok]
+    if any(tok.isalpha() and tok not in FILLER for tok in parts):
+        # "Mission 12" stays "mission-12" rather than a bare number
+        parts = [tok for tok in parts if tok not in FILLER]
+    tokens: List[str] = []
+    for tok in parts:
+        if tok.isdigit() and tokens and tokens[-1].isalpha() and len(tokens[-1]) <= 2:
+            # A one- or two-letter token glued to the number after it: "l 1", "c 56"
+            tokens[-1] += tok
+        elif tok not in tokens:
+            tokens.append(tok)
+    return "-".join(tokens)
+
+
+def _numbers(key: str) -> str:
+    return ",".join(sorted(set(re.findall(r"\d+", key))))
+
+
+def _blocks(key: str) -> Set[str]:
+    # Blocking keys: only names sharing one are ever compared. Numbered names
+    # must carry the same numbers to match, so those block on the numbers
+    # alone; the rest on their distinctive (4+ letter) tokens.
+    numbers = _numbers(key)
+    if numbers:
+        return {"#" + numbers}
+    toks = key.split("-")
+    return {t for t in toks if len(t) >= 4} or set(toks)
+
+
+class EntityIndex:
+    # Canonical ids for one kind of entity. Names resolve by exact canonical
+    # id first, then by token overlap against the candidates that share a
+    # blocking key, so resolving n names costs n times the block size rather
+    # than n squared comparisons.
+    def __init__(self):
+        self.entities: Dict[str, Dict] = {}
+        self.lookup: Dict[str, str] = {}  # canonical variant -> entity id
+        self._blocks: Dict[str, Set[str]] = {}
+
+    def resolve(self, name: str) -> Optional[str]:
+        key = canonical_id(name)
+        return self._match(key) if key else None
+
+    def _match(self, key: str) -> Optional[str]:
+        found = self.lookup.get(key)
+        if found is not None:
+            return found
+        tokens, numbers = set(key.split("-")), _numbers(key)
+        best, best_score = None, MATCH_THRESHOLD
+        candidates: Set[str] = set()
+        for block in _blocks(key):
+            candidates |= self._blocks.get(block, set())
+        for variant in sorted(candidates):
+            if _numbers(variant) != numbers:
+                continue
+            other = set(variant.split("-"))
+            score = len(tokens & other) / len(tokens | other)
+            if score >= best_score:
+                best, best_score = self.lookup[variant], score
+        return best
+
+    def add(self, name: str) -> Optional[str]:
+        # Entity id for `name`, creating the entity when nothing matches
+        key = canonical_id(name)
+        if not key:
+            return None
+        eid = self._match(key)
+        if eid is None:
+            eid = key
+            self.entities[eid] = {"name": name.strip(), "names": []}
+        entity = self.entities[eid]
+        if name.strip() not in entity["names"]:
+            entity["names"].append(name.strip())
+        if key not in self.lookup:
+            self.lookup[key] = eid
+            for block in _blocks(key):
+                self._blocks.setdefault(block, set()).add(key)
+        return eid
+
+
+def split_launch(row: Dict) -> Tuple[str, str]:
+    # (flight, mission) from "PSLV-C56/DS-SAR", falling back on the split columns
+    lvm = row.get("launch_vehicle_mission") or ""
+    if "/" in lvm:
+        flight, mission = (p.strip() for p in lvm.split("/", 1))
+    else:
+        flight, mission = lvm.strip(), ""
+    return flight or row.get("launch_vehicle") or "", mission or row.get("mission") or ""
+
+
+def build_entities(sources: Dict[str, Sequence[Dict]]) -> Dict:
+    # sources: "spacecraft", "launches", "details", "upcoming" -> rows as saved
+    missions, flights = EntityIndex(), EntityIndex()
+
+    def attach(index: EntityIndex, eid: Optional[str], kind: str, row: Dict):
+        if eid is not None:
+            index.entities[eid].setdefault(kind, []).append(row)
+
+    # Header rows are dropped at crawl time now, but older data files still have them
+    for row in sources.get("spacecraft", ()):
+        if is_header_row(row):
+            continue
+        flight, _ = split_launch(row)
+        fid = flights.add(flight)
+        mid = missions.add(row.get("name") or row.get("mission") or "")
+        attach(flights, fid, "spacecraft", row)
+        attach(missions, mid, "spacecraft", row)
+        if mid is not None and fid is not None:
+            missions.entities[mid].setdefault("flight", fid)
+
+    for row in sources.get("launches", ()):
+        if is_header_row(row):
+            continue
+        flight, mission = split_launch(row)
+        fid = flights.add(flight)
+        attach(flights, fid, "launches", row)
+        mid = missions.add(mission) if mission else None
+        attach(missions, mid, "launches", row)
+        if mid is not None and fid is not None:
+            missions.entities[mid].setdefault("flight", fid)
+
+    # Detail and upcoming pages only join existing missions or start their own
+    for row in sources.get("details", ()):
+        mid = missions.add(row.get("name") or "")
+        attach(missions, mid, "details", row)
+        if mid is not None and row.get("launch_vehicle"):
+            fid = flights.add(row["launch_vehicle"])
+            missions.entities[mid].setdefault("flight", fid)
+    by_url = {row["url"]: mid for mid, m in missions.entities.items() for row in m.get("details", ()) if row.get("url")}
+    for row in sources.get("upcoming", ()):
+        mid = by_url.get(row.get("url") or "") or missions.add(row.get("title") or "")
+        attach(missions, mid, "upcoming", row)
+
+    vehicles: Dict[str, Dict] = {}
+    for fid, flight in flights.entities.items():
+        vehicle = fid.split("-", 1)[0]
+        flight["vehicle"] = vehicle
+        vehicles.setdefault(vehicle, {"flights": []})["flights"].append(fid)
+    for mission in missions.entities.values():
+        if mission.get("flight"):
+            mission["vehicle"] = flights.entities[mission["flight"]]["vehicle"]
+
+    return {
+        "version": 1,
+        "canonical": {"aliases": ALIASES, "split": NAME_SPLIT, "filler": sorted(FILLER)},
+        "missions": missions.entities,
+        "flights": flights.entities,
+        "vehicles": vehicles,
+        # Every name variant seen, canonicalized, to its id
+        "lookup": {"missions": missions.lookup, "flights": flights.lookup},
+    }
+
+
+# (entity source, file under data/) joined after a crawl; missing files are skipped
+RESOLVED_SOURCES: List[Tuple[str, str]] = [
+    ("spacecraft", "spacecraft_missions"),
+    ("launches", "launch_missions"),
+    ("details", "mission_details"),
+    ("upcoming", "upcoming_missions"),
+]
+
+
+def write_entities(data_dir: str = "data", path: Optional[str] = None, sources: Iterable[Tuple[str, str]] = RESOLVED_SOURCES) -> int:
+    entities = build_entities({kind: load_rows(data_dir, basename) or [] for kind, basename in sources})
+    save_json(path or os.path.join(data_dir, "entities.json"), entities)
+    return len(entities["missions"])
+
+
+if __name__ == "__main__":
+    print(f"Resolved {write_entities()} missions into {ENTITIES_PATH}")
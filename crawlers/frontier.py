@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+try:
+    from .utils import (
+        PARSER_BACKENDS,
+        extract_page,
+        parse_page,
+        best_table_by_headers,
+        norm_space,
+        pagination_links,
+        JsonSink,
+        CsvSink,
+        stream_rows,
+    )
+    from .timeline import BASE as TIMELINE_BASE, parse_timeline
+    from .upcoming_missions import BASE as UPCOMING_BASE, parse_upcoming
+    from .spacecraft_missions import BASE as SPACECRAFT_BASE, EXPECTED_HEADERS as SPACECRAFT_HEADERS
+    from .mission_details import mission_row, parse_mission_detail
+except Exception:
+    from utils import (
+        PARSER_BACKENDS,
+        extract_page,
+        parse_page,
+        best_table_by_headers,
+        norm_space,
+        pagination_links,
+        JsonSink,
+        CsvSink,
+        stream_rows,
+    )
+    from timeline import BASE as TIMELINE_BASE, parse_timeline
+    from upcoming_missions import BASE as UPCOMING_BASE, parse_upcoming
+    from spacecraft_missions import BASE as SPACECRAFT_BASE, EXPECTED_HEADERS as SPACECRAFT_HEADERS
+    from mission_details import mission_row, parse_mission_detail
+
+
+# Follow-through crawl: the timeline, upcoming-missions and spacecraft lists
+# are seeds, every mission page they link to is fetched and parsed like
+# mission_details does, and mission links found on those pages are followed
+# in turn up to a depth limit. Progress is journaled under FRONTIER_DIR so an
+# interrupted crawl picks up where it stopped.
+FRONTIER_DIR = os.path.join("data", ".frontier")
+JOURNAL = "journal.jsonl"
+ISRO_HOST = "www.isro.gov.in"
+
+# Hrefs on a mission page that lead to another mission page; the same hints
+# the upcoming-missions and timeline lists go by
+DETAIL_HINTS = ("Gaganyaan", "NISAR", "Mission", "mission", "timeline=timeline")
+
+
+class FrontierEntry(NamedTuple):
+    url: str
+    depth: int  # links away from a seed; list pages and their pagination are 0
+    kind: str  # "timeline", "upcoming", "table" or "detail"
+    name: str = ""
+    category: str = ""
+    via: str = ""  # page the link was found on
+
+
+SEEDS: List[FrontierEntry] = [
+    FrontierEntry(TIMELINE_BASE, 0, "timeline", category="timeline"),
+    FrontierEntry(UPCOMING_BASE, 0, "upcoming", category="upcoming"),
+    FrontierEntry(SPACECRAFT_BASE, 0, "table", category="spacecraft"),
+]
+
+
+def canonical_url(href: str, base: str = f"https://{ISRO_HOST}/") -> Optional[str]:
+    # Absolute URL without fragment and with a lowercased host; None for
+    # anything that is not http(s)
+    parts = urlsplit(urljoin(base, href.strip()))
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+class Frontier:
+    # Breadth-first queue of pages to visit. A URL is queued at most once and
+    # only up to `max_depth` links from a seed. Every visited page is appended
+    # to a journal along with the links found on it, so the journal is both
+    # the visited set and the checkpoint: replaying it rebuilds the queue
+    # without fetching anything again. Failed pages are not journaled and are
+    # tried again on resume.
+    def __init__(self, path: str, max_depth: int = 2):
+        self.path = path
+        self.max_depth = max_depth
+        self._queue: Deque[FrontierEntry] = deque()
+        self._seen: Set[str] = set()
+        self._done: Set[str] = set()
+        self._journal = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def add(self, entry: FrontierEntry) -> bool:
+        if entry.depth > self.max_depth or entry.url in self._seen:
+            return False
+        self._seen.add(entry.url)
+        self._queue.append(entry)
+        return True
+
+    def pop(self) -> Optional[FrontierEntry]:
+        return self._queue.popleft() if self._queue else None
+
+    def resume(self, seeds: Iterable[FrontierEntry]) -> int:
+        # Queue the seeds plus every link journaled so far, minus the pages
+        # already visited; returns how many those are
+        for seed in seeds:
+            self.add(seed)
+        for line in self._read_journal():
+            self._done.add(line["entry"][0])
+            for link in line["links"]:
+                self.add(FrontierEntry(*link))
+        self._queue = deque(e for e in self._queue if e.url not in self._done)
+        self._seen |= self._done
+        return len(self._done)
+
+    def record(self, entry: FrontierEntry, row: Optional[Dict], links: List[FrontierEntry]):
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._journal = open(self.path, "a", encoding="utf-8")
+        line = {"entry": list(entry), "row": row, "links": [list(link) for link in links]}
+        self._journal.write(json.dumps(line, ensure_ascii=False) + "\n")
+        # Flushed per page: the journal is only as good as its last line
+        self._journal.flush()
+        self._done.add(entry.url)
+        for link in links:
+            self.add(link)
+
+    def rows(self) -> Iterator[Dict]:
+        # Rows of every visited page, in visiting order
+        for line in self._read_journal():
+            if line["row"] is not None:
+                yield line["row"]
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def clear(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _read_journal(self) -> Iterator[Dict]:
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for text in f:
+                try:
+                    yield json.loads(text)
+                except ValueError:
+                    # A line cut short by the interruption; that page is visited again
+                    continue
+
+
+def is_detail_link(url: str) -> bool:
+    return any(hint in url for hint in DETAIL_HINTS)
+
+
+def parse_table_links(expected: List[str], page_basename: str, soup: BeautifulSoup) -> Dict[str, List]:
+    # Links inside the list table, plus the list's other pages
+    t = best_table_by_headers(soup, expected)
+    links = [(norm_space(a.get_text(" ")), a.get("href") or "") for a in t.find_all("a")] if t is not None else []
+    return {"links": links, "pages": pagination_links(PARSER_BACKENDS["soup"].links(soup), page_basename)}
+
+
+def parse_followed_page(soup: BeautifulSoup) -> Dict[str, object]:
+    return {"detail": parse_mission_detail(soup), "links": PARSER_BACKENDS["soup"].links(soup)}
+
+
+def _detail_links(entry: FrontierEntry, links: Iterable[Tuple[str, str]], hinted: bool = False) -> List[FrontierEntry]:
+    # Every ISRO link of a list is a mission page; from a mission page, with
+    # its menus and footers, only links that look like one (`hinted`)
+    out: List[FrontierEntry] = []
+    for text, href in links:
+        url = canonical_url(href, entry.url) if href else None
+        if not url or url == entry.url or urlsplit(url).netloc != ISRO_HOST:
+            continue
+        if not hinted or is_detail_link(url):
+            out.append(FrontierEntry(url, entry.depth + 1, "detail", text, entry.category, entry.url))
+    return out
+
+
+def _visit_list(parse: Callable, name: str, entry: FrontierEntry) -> Tuple[Optional[Dict], List[FrontierEntry]]:
+    items = extract_page(entry.url, parse, name=name)
+    return None, _detail_links(entry, ((item["title"], item["url"]) for item in items))
+
+
+def _visit_table(entry: FrontierEntry) -> Tuple[Optional[Dict], List[FrontierEntry]]:
+    page = parse_page(entry.url, partial(parse_table_links, SPACECRAFT_HEADERS, "SpacecraftMissions"), name="frontier_table")
+    # The list's other pages are the same list, so they stay at its depth
+    pages = [FrontierEntry(canonical_url(u) or u, entry.depth, "table", category=entry.category, via=entry.url) for u in page["pages"]]
+    return None, pages + _detail_links(entry, page["links"])
+
+
+def _visit_detail(entry: FrontierEntry) -> Tuple[Optional[Dict], List[FrontierEntry]]:
+    page = parse_page(entry.url, parse_followed_page, name="frontier_detail")
+    row = {**mission_row(entry.url, page["detail"], entry.name, entry.category), "depth": entry.depth, "via": entry.via}
+    return row, _detail_links(entry, page["links"], hinted=True)
+
+
+VISITORS: Dict[str, Callable[[FrontierEntry], Tuple[Optional[Dict], List[FrontierEntry]]]] = {
+    "timeline": partial(_visit_list, parse_timeline, "timeline"),
+    "upcoming": partial(_visit_list, parse_upcoming, "upcoming"),
+    "table": _visit_table,
+    "detail": _visit_detail,
+}
+
+
+def crawl(frontier: Frontier, max_workers: int = 4) -> Tuple[int, int]:
+    # Visits pages until the frontier runs dry; returns (visited, failed).
+    # Only this thread touches the frontier; workers just fetch and parse.
+    visited = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        running: Dict[Future, FrontierEntry] = {}
+        while True:
+            while len(running) < max(1, max_workers):
+                entry = frontier.pop()
+                if entry is None:
+                    break
+                running[pool.submit(VISITORS[entry.kind], entry)] = entry
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                entry = running.pop(fut)
+                try:
+                    row, links = fut.result()
+                except Exception as exc:
+                    print(f"Followed page {entry.url} failed: {exc!r}", file=sys.stderr)
+                    failed += 1
+                    continue
+                frontier.record(entry, row, links)
+                visited += 1
+    return visited, failed
+
+
+def iter_followed_pages(
+    max_depth: int = 2,
+    max_workers: int = 4,
+    state_dir: str = FRONTIER_DIR,
+    fresh: bool = False,
+) -> Iterator[Dict]:
+    frontier = Frontier(os.path.join(state_dir, JOURNAL), max_depth)
+    if fresh:
+        frontier.clear()
+    resumed = frontier.resume(SEEDS)
+    if resumed:
+        print(f"Resuming follow-through crawl: {resumed} pages already visited, {len(frontier)} queued")
+    try:
+        crawl(frontier, max_workers)
+    finally:
+        frontier.close()
+    yield from frontier.rows()
+    # Finished: the next crawl starts from the seeds again
+    frontier.clear()
+
+
+def scrape_followed_pages(max_depth: int = 2, max_workers: int = 4) -> List[Dict]:
+    return list(iter_followed_pages(max_depth=max_depth, max_workers=max_workers))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Follow timeline, upcoming and spacecraft links into mission pages")
+    ap.add_argument("--max-depth", type=int, default=2, help="links followed away from the list pages (default: 2)")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--fresh", action="store_true", help="discard an interrupted crawl's checkpoint instead of resuming it")
+    args = ap.parse_args()
+    rows = iter_followed_pages(max_depth=args.max_depth, max_workers=args.workers, fresh=args.fresh)
+    n = stream_rows(rows, [JsonSink("data/mission_pages.json"), CsvSink("data/mission_pages.csv")])
+    print(f"Saved {n} followed mission pages")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+# Share of max_bytes an over-full cache is evicted down to
+EVICT_TO = 0.9
+
+
+class CacheMiss(RuntimeError):
+    pass
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    content: bytes
+    fresh: bool
+
+
+class ResponseCache:
+    # Gzip blobs keyed by sha1(url) plus one JSON index holding validators
+    # (ETag / Last-Modified), fetch time, blob size and last access per URL.
+    def __init__(
+        self,
+        root: str,
+        *,
+        ttl: float = 900.0,
+        ttl_rules: Optional[Dict[str, float]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        offline: bool = False,
+    ):
+        self.root = root
+        self.ttl = ttl
+        self.ttl_rules = dict(ttl_rules or {})
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._index: Dict[str, Dict] = self._load_index()
+        # Bytes of every blob in the index, kept current so put() never re-sums them
+        self._total = sum(int(e.get("size", 0)) for e in self._index.values())
+        atexit.register(self.flush)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self._index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp, self._index_path)
+        self._dirty = False
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def _blob_path(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".gz")
+
+    def ttl_for(self, url: str) -> float:
+        # The longest matching URL fragment wins, e.g. {"Press.html": 3600, "LVM3": 86400}
+        best = None
+        for fragment, ttl in self.ttl_rules.items():
+            if fragment in url and (best is None or len(fragment) > len(best)):
+                best = fragment
+        return self.ttl if best is None else self.ttl_rules[best]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._index.get(url)
+        if not entry:
+            return None
+        try:
+            with gzip.open(self._blob_path(url), "rb") as f:
+                content = f.read()
+        except OSError:
+            with self._lock:
+                entry = self._index.pop(url, None)
+                if entry is not None:
+                    self._total -= int(entry.get("size", 0))
+                self._dirty = True
+            return None
+        now = time.time()
+        with self._lock:
+            entry["accessed"] = now
+            self._dirty = True
+        fresh = now - float(entry.get("fetched", 0)) < self.ttl_for(url)
+        return CachedResponse(url=url, content=content, fresh=fresh)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._index.get(url)
+        if not entry or not os.path.exists(self._blob_path(url)):
+            return {}
+        headers: Dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url: str):
+        # A 304 revalidated the stored body, so its TTL starts over
+        with self._lock:
+            entry = self._index.get(url)
+            if entry:
+                entry["fetched"] = entry["accessed"] = time.time()
+                self._dirty = True
+
+    def put(self, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._blob_path(url)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(content)
+        os.replace(tmp, path)
+        now = time.time()
+        size = os.path.getsize(path)
+        with self._lock:
+            old = self._index.get(url)
+            if old is not None:
+                self._total -= int(old.get("size", 0))
+            self._index[url] = {
+                "etag": etag or "",
+                "last_modified": last_modified or "",
+                "fetched": now,
+                "accessed": now,
+                "size": size,
+            }
+            self._total += size
+            self._evict(keep=url)
+            # Written by flush(), at the end of a crawl or at exit, not once per page
+            self._dirty = True
+
+    def _evict(self, keep: Optional[str] = None):
+        if self._total <= self.max_bytes:
+            return
+        # Down to a low-water mark, so a full cache is not re-sorted on every put
+        target = self.max_bytes * EVICT_TO
+        for url, entry in sorted(self._index.items(), key=lambda kv: kv[1].get("accessed", 0)):
+            if self._total <= target:
+                break
+            if url == keep:
+                continue
+            try:
+                os.remove(self._blob_path(url))
+            except OSError:
+                pass
+            self._total -= int(entry.get("size", 0))
+            del self._index[url]
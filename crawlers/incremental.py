@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Part of every page memo key. Bump it when a parser's result changes shape
+# without the parser being renamed; the memo then drops every older result
+# instead of handing it to code that expects the new shape.
+MEMO_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def row_hash(row: Dict) -> str:
+    return content_hash(json.dumps(row, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+def parser_id(parse: Callable) -> str:
+    # "module.qualname" of a parse callback, through any partials. The module
+    # is named without the package, so both ways of running the crawlers share keys.
+    while isinstance(parse, partial):
+        parse = parse.func
+    module = getattr(parse, "__module__", "") or ""
+    return f"{module.rsplit('.', 1)[-1]}.{getattr(parse, '__qualname__', type(parse).__name__)}"
+
+
+def memo_key(name: str, parse: Callable, url: str) -> str:
+    # A page's memo entry is only reused by the same parser at the same MEMO_VERSION
+    return f"v{MEMO_VERSION}:{name}:{parser_id(parse)}:{url}"
+
+
+class PageMemo:
+    # Parsed result per memo_key() together with the sha1 of the page it was
+    # parsed from; an unchanged page hands back the stored result unparsed.
+    # Results are kept as JSON text: one string per page instead of its rows
+    # as live dicts, and every lookup hands out a fresh copy that callers may
+    # normalize in place.
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._pages: Dict[str, Tuple[str, str]] = self._load()  # key -> (sha1, result as JSON)
+
+    def _load(self) -> Dict[str, Tuple[str, str]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        # Results keyed for another MEMO_VERSION are never looked up again, so they are not kept
+        # (and the next flush() writes the file without them)
+        prefix = f"v{MEMO_VERSION}:"
+        pages = {
+            key: (entry["sha1"], json.dumps(entry.get("result"), ensure_ascii=False))
+            for key, entry in data.items()
+            if key.startswith(prefix) and isinstance(entry, dict) and "sha1" in entry
+        }
+        self._dirty = len(pages) < len(data)
+        return pages
+
+    def lookup(self, key: str, digest: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._pages.get(key)
+        if entry and entry[0] == digest:
+            return json.loads(entry[1])
+        return None
+
+    def store(self, key: str, digest: str, result: Any):
+        text = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._pages[key] = (digest, text)
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                # Same file as json.dump({key: {"sha1": ..., "result": ...}}) wrote
+                f.write("{")
+                for n, (key, (digest, text)) in enumerate(self._pages.items()):
+                    prefix = ", " if n else ""
+                    f.write(f'{prefix}{json.dumps(key, ensure_ascii=False)}: {{"sha1": {json.dumps(digest)}, "result": {text}}}')
+                f.write("}")
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+def row_identity(row: Dict, key_fields: Sequence[str]) -> str:
+    return "|".join(str(row.get(k, "")) for k in key_fields)
+
+
+class RowDiff:
+    # Streams rows against `previous` (row identity -> row hash from the last
+    # run), keeping only hashes and the rows that changed. Rows sharing an
+    # identity (blank keys, repeated table lines) are told apart by the order
+    # they appear in, so every row keeps a stable slot.
+    def __init__(self, previous: Dict[str, str], key_fields: Sequence[str]):
+        self.previous = previous
+        self.key_fields = list(key_fields)
+        self.hashes: Dict[str, str] = {}
+        self.added: List[Dict] = []
+        self.updated: List[Dict] = []
+        self._seen: Dict[str, int] = {}
+
+    def add(self, row: Dict):
+        ident = row_identity(row, self.key_fields)
+        n = self._seen.get(ident, 0) + 1
+        self._seen[ident] = n
+        if n > 1:
+            ident = f"{ident}#{n}"
+        digest = row_hash(row)
+        self.hashes[ident] = digest
+        old = self.previous.get(ident)
+        if old is None:
+            self.added.append({"id": ident, "row": row})
+        elif old != digest:
+            self.updated.append({"id": ident, "row": row})
+
+    def changes(self) -> Dict[str, Any]:
+        return {
+            "key": self.key_fields,
+            "added": self.added,
+            "updated": self.updated,
+            "removed": [ident for ident in self.previous if ident not in self.hashes],
+        }
+
+
+class RowIndex:
+    # Row identity -> row hash per output basename, one JSON file each.
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, basename: str) -> str:
+        return os.path.join(self.root, f"{basename}.rows.json")
+
+    def load(self, basename: str) -> Dict[str, str]:
+        try:
+            with open(self._path(basename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, basename: str, hashes: Dict[str, str]):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(basename)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def parse_memoized(memo: Optional[PageMemo], key: str, content: bytes, parse: Callable[[bytes], Any]) -> Any:
+    if memo is None:
+        return parse(content)
+    digest = content_hash(content)
+    cached = memo.lookup(key, digest)
+    if cached is not None:
+        return cached
+    result = parse(content)
+    memo.store(key, digest, result)
+    return result
+
+
+async def parse_memoized_async(memo: Optional[PageMemo], key: str, content: bytes, parse: Callable[[bytes], Awaitable[Any]]) -> Any:
+    # parse_memoized() for a coroutine parse
+    if memo is None:
+        return await parse(content)
+    digest = content_hash(content)
+    cached = memo.lookup(key, digest)
+    if cached is not None:
+        return cached
+    result = await parse(content)
+    memo.store(key, digest, result)
+    return result
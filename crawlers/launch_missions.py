@@ -1,29 +1,31 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import Dict, Iterator
 
 from bs4 import BeautifulSoup
 
 try:
     from .utils import (
-        get_soup,
-        best_table_by_headers,
-        table_to_dicts,
-        extract_pagination_links,
-        save_json,
-        save_csv,
-        parse_date,
+        async_paginated_table,
+        iter_paginated_table,
+        RowTable,
+        JsonSink,
+        CsvSink,
+        stream_rows,
     )
+    from .metrics import timed
+    from .normalize import TableSpec, normalize_stream, normalize_table
 except Exception:
     from utils import (
-        get_soup,
-        best_table_by_headers,
-        table_to_dicts,
-        extract_pagination_links,
-        save_json,
-        save_csv,
-        parse_date,
+        async_paginated_table,
+        iter_paginated_table,
+        RowTable,
+        JsonSink,
+        CsvSink,
+        stream_rows,
     )
+    from metrics import timed
+    from normalize import TableSpec, normalize_stream, normalize_table
 
 BASE = "https://www.isro.gov.in/LaunchMissions.html"
 EXPECTED_HEADERS = [
@@ -36,48 +38,29 @@ EXPECTED_HEADERS = [
 ]
 
 
-def normalize_rows(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    out: List[Dict[str, str]] = []
-    for r in rows:
-        row = dict(r)
-        if "date" in row:
-            row["date"] = parse_date(row.get("date", ""))
-        lvm = row.get("launch_vehicle_mission") or row.get("launch_vehicle") or ""
-        if lvm and "/" in lvm:
-            parts = [p.strip() for p in lvm.split("/", 1)]
-            row.setdefault("launch_vehicle", parts[0])
-            row.setdefault("mission", parts[1])
-        out.append(row)
-    return out
-
-
-def scrape_launches() -> List[Dict[str, str]]:
-    first = get_soup(BASE)
-    table = best_table_by_headers(first, EXPECTED_HEADERS)
-    if table is None:
-        return []
-    rows = table_to_dicts(table)
-
-    pages = extract_pagination_links(first, "LaunchMissions")
-    urls = [BASE] + [u for u in pages if u != BASE]
-
-    all_rows: List[Dict[str, str]] = []
-    for i, url in enumerate(urls):
-        if i > 0:
-            soup = get_soup(url)
-            t = best_table_by_headers(soup, EXPECTED_HEADERS)
-            if not t:
-                continue
-            page_rows = table_to_dicts(t)
-        else:
-            page_rows = rows
-        all_rows.extend(page_rows)
-
-    return normalize_rows(all_rows)
+TABLE = TableSpec(date_column="date", date_context="launches.date")
+
+
+def normalize_rows(rows: RowTable) -> RowTable:
+    # In place, column by column; see normalize.normalize_table
+    return normalize_table(rows, TABLE)
+
+
+def iter_launches(max_workers: int = 4) -> Iterator[Dict[str, str]]:
+    rows = iter_paginated_table(BASE, "LaunchMissions", EXPECTED_HEADERS, max_workers=max_workers)
+    yield from normalize_stream(rows, TABLE, stage="normalize:launches")
+
+
+def scrape_launches(max_workers: int = 4) -> RowTable:
+    return RowTable(iter_launches(max_workers=max_workers))
+
+
+async def async_scrape_launches() -> RowTable:
+    rows = await async_paginated_table(BASE, "LaunchMissions", EXPECTED_HEADERS)
+    with timed("normalize:launches"):
+        return normalize_rows(rows)
 
 
 if __name__ == "__main__":
-    data = scrape_launches()
-    save_json("data/launch_missions.json", data)
-    save_csv("data/launch_missions.csv", data)
-    print(f"Saved {len(data)} launch mission rows")
+    n = stream_rows(iter_launches(), [JsonSink("data/launch_missions.json"), CsvSink("data/launch_missions.csv")])
+    print(f"Saved {n} launch mission rows")
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from typing import List, Dict
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
 try:
-    from .utils import get_soup, norm_space, save_json, save_csv
+    from .utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
+    from .text_store import get_text_store
+    from .lazy import LazyModule
 except Exception:
-    from utils import get_soup, norm_space, save_json, save_csv
+    from utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
+    from text_store import get_text_store
+    from lazy import LazyModule
+
+# Only the async crawl gathers vehicle pages on an event loop
+asyncio = LazyModule("asyncio")
 
 
 VEHICLES = [
@@ -13,21 +21,192 @@ VEHICLES = [
     ("LVM3", "https://www.isro.gov.in/LVM3.html"),
 ]
 
+# Numeric spec field -> (unit kind, key fragments of the spec table rows it is read from).
+# The first table row whose key holds a fragment wins; failing that, the
+# page text is searched for the fragment followed by a number.
+SPEC_FIELDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "stages": ("count", ("number of stages", "no. of stages", "no of stages", "stages")),
+    "height_m": ("length", ("height", "overall length")),
+    "diameter_m": ("length", ("diameter",)),
+    "liftoff_mass_t": ("tonnes", ("lift-off mass", "lift off mass", "liftoff mass", "lift-off weight", "lift off weight", "gross lift")),
+}
+# Payload capability per orbit, from rows like "Payload to GTO" or values like "1,750 kg to SSO".
+# Sub-GTO (PSLV's headline figure) is a lower orbit than GTO and gets its own field.
+ORBITS: Dict[str, Tuple[str, ...]] = {
+    "payload_leo_kg": ("leo", "low earth orbit"),
+    "payload_gto_kg": ("gto", "geosynchronous transfer orbit", "geo-synchronous transfer orbit"),
+    "payload_sub_gto_kg": ("sub-gto", "sub gto", "sub-geosynchronous transfer orbit", "sub geosynchronous transfer orbit"),
+    "payload_sso_kg": ("sso", "sspo", "sun synchronous", "sun-synchronous"),
+}
+NUMERIC_FIELDS = list(SPEC_FIELDS) + list(ORBITS)
+CSV_FIELDS = ["vehicle", "url", *NUMERIC_FIELDS, "text_hash", "text_chars"]
 
-def scrape_vehicle_specs() -> List[Dict]:
-    out: List[Dict] = []
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)"
+_UNITS = {
+    "length": {"m": 1.0, "metre": 1.0, "metres": 1.0, "meter": 1.0, "meters": 1.0},
+    "tonnes": {"t": 1.0, "tonne": 1.0, "tonnes": 1.0, "ton": 1.0, "tons": 1.0, "kg": 0.001},
+    "kg": {"kg": 1.0, "kgs": 1.0, "t": 1000.0, "tonne": 1000.0, "tonnes": 1000.0, "ton": 1000.0, "tons": 1000.0},
+}
+_QUANTITY_RE = re.compile(_NUMBER + r"\s*(metres|meters|metre|meter|tonnes|tonne|tons|ton|kgs|kg|m|t)\b", re.I)
+_NUMBER_CHARS = frozenset("0123456789,.")
+_COUNT_WORDS = {"two": 2, "three": 3, "four": 4, "five": 5}
+_COUNT_RE = re.compile(r"\b(\d|two|three|four|five)\b", re.I)
+_STAGES_RE = re.compile(r"\b(\d|two|three|four|five)[\s-]+stages?\b", re.I)
+_ORBIT_FIELDS = {n: field for field, names in ORBITS.items() for n in names}
+# Longest name first, and never an orbit right after "sub", so "sub-gto" is not read as GTO
+_ORBIT_RE = re.compile(r"\b(?<!sub.)(?:" + "|".join(re.escape(n) for n in sorted(_ORBIT_FIELDS, key=len, reverse=True)) + r")\b")
+# How far after a key fragment in the page text its number may sit
+TEXT_WINDOW = 40
+
+
+def _quantity(text: str, kind: str) -> Optional[float]:
+    # First number in `text` with a unit of `kind`, in that kind's unit;
+    # Indian digit grouping ("3,20,000 kg") reads the same as any other
+    if kind == "count":
+        m = _COUNT_RE.search(text)
+        if not m:
+            return None
+        word = m.group(1).lower()
+        return float(_COUNT_WORDS.get(word) or int(word))
+    units = _UNITS[kind]
+    for m in _QUANTITY_RE.finditer(text):
+        factor = units.get(m.group(2).lower())
+        if factor is not None:
+            return round(float(m.group(1).replace(",", "")) * factor, 3)
+    return None
+
+
+def _as_number(value: Optional[float]) -> Optional[float]:
+    # Whole numbers as ints, so 4 stages read "4" rather than "4.0" in the CSV
+    if value is not None and value == int(value):
+        return int(value)
+    return value
+
+
+def _from_kvs(kvs: Dict[str, str], fragments: Tuple[str, ...], kind: str) -> Optional[float]:
+    for fragment in fragments:
+        for key, value in kvs.items():
+            if fragment in key:
+                found = _quantity(value, kind)
+                if found is not None:
+                    return found
+    return None
+
+
+def _from_text(low: str, fragments: Tuple[str, ...], kind: str) -> Optional[float]:
+    # `low`: the lowercased page text
+    for fragment in fragments:
+        start = low.find(fragment)
+        while start != -1:
+            end = start + len(fragment)
+            found = _quantity(low[end: end + TEXT_WINDOW], kind)
+            if found is not None:
+                return found
+            start = low.find(fragment, end)
+    return None
+
+
+def _orbit_payloads(low: str) -> Dict[str, float]:
+    # "1,750 kg to SSO; 1,425 kg to Sub-GTO": each orbit named in the text
+    # takes the last mass quantity shortly before it. Only the text around
+    # orbit names is searched for quantities.
+    out: Dict[str, float] = {}
+    if not any(n in low for n in _ORBIT_FIELDS):
+        # A plain substring test is far cheaper than the regex over a whole page
+        return out
+    for hit in _ORBIT_RE.finditer(low):
+        field = _ORBIT_FIELDS[hit.group(0)]
+        if field in out:
+            continue
+        start = max(0, hit.start() - TEXT_WINDOW)
+        while start > 0 and low[start - 1] in _NUMBER_CHARS:
+            # Never start inside a number
+            start -= 1
+        before = list(_QUANTITY_RE.finditer(low, start, hit.start()))
+        if before:
+            kg = _quantity(before[-1].group(0), "kg")
+            if kg is not None:
+                out[field] = kg
+    return out
+
+
+def extract_specs(kvs: Dict[str, str], text: str) -> Dict[str, Optional[float]]:
+    # The numeric fields of one vehicle page, None where the page does not say
+    low = text.lower()
+    out: Dict[str, Optional[float]] = {}
+    for field, (kind, fragments) in SPEC_FIELDS.items():
+        found = _from_kvs(kvs, fragments, kind)
+        if found is None and kind == "count":
+            m = _STAGES_RE.search(low) if "stage" in low else None
+            found = _quantity(m.group(1), "count") if m else None
+        elif found is None:
+            found = _from_text(low, fragments, kind)
+        out[field] = found
+    for field in ORBITS:
+        out[field] = None
+    for key, value in kvs.items():
+        # Rows like "Payload to Sub-GTO"; matched as words, not substrings
+        hit = _ORBIT_RE.search(key)
+        if hit and out[_ORBIT_FIELDS[hit.group(0)]] is None:
+            out[_ORBIT_FIELDS[hit.group(0)]] = _quantity(value, "kg")
+    missing = [f for f in ORBITS if out[f] is None]
+    if missing:
+        payload_text = " ; ".join(v for k, v in kvs.items() if "payload" in k or "capabilit" in k)
+        for source in (payload_text.lower(), low):
+            found = _orbit_payloads(source)
+            for field in missing:
+                if out[field] is None:
+                    out[field] = found.get(field)
+    return {k: _as_number(v) for k, v in out.items()}
+
+
+def vehicle_page(page: Page) -> Dict[str, object]:
+    return {"kv": page.kv_pairs(), "text": page.text()}
+
+
+def vehicle_row(name: str, url: str, parsed: Dict) -> Dict:
+    # Numeric specs and the spec table as columns; the page text itself goes
+    # to the text store and the row keeps its hash
+    kvs, text = parsed["kv"], parsed["text"]
+    return {
+        "vehicle": name,
+        "url": url,
+        **extract_specs(kvs, text),
+        "specs": kvs,
+        "text_hash": get_text_store().put(text),
+        "text_chars": len(text),
+    }
+
+
+def iter_vehicle_specs() -> Iterator[Dict]:
     for name, url in VEHICLES:
         try:
-            soup = get_soup(url)
-            text = norm_space(soup.get_text(" "))
-            out.append({"vehicle": name, "url": url, "content": text[:10000]})
+            row = vehicle_row(name, url, extract_page(url, vehicle_page, name="specs"))
         except Exception:
-            # Skip missing or moved pages to avoid halting entire run
+            # Skip missing or moved pages, or a result that is not what vehicle_row
+            # expects, to avoid halting entire run
             continue
-    return out
+        yield row
+
+
+def scrape_vehicle_specs() -> List[Dict]:
+    return list(iter_vehicle_specs())
+
+
+async def async_scrape_vehicle_specs() -> List[Dict]:
+    pages = [async_extract_page(url, vehicle_page, name="specs") for _, url in VEHICLES]
+    parsed = await asyncio.gather(*pages, return_exceptions=True)
+    rows: List[Dict] = []
+    for (name, url), p in zip(VEHICLES, parsed):
+        # Missing or moved pages and unusable results are skipped, as in iter_vehicle_specs()
+        if isinstance(p, BaseException):
+            continue
+        try:
+            rows.append(vehicle_row(name, url, p))
+        except Exception:
+            continue
+    return rows
 
 
 if __name__ == "__main__":
-    rows = scrape_vehicle_specs()
-    save_json("data/launch_vehicle_specs.json", rows)
-    save_csv("data/launch_vehicle_specs.csv", rows)
+    stream_rows(iter_vehicle_specs(), [JsonSink("data/launch_vehicle_specs.json"), CsvSink("data/launch_vehicle_specs.csv", CSV_FIELDS)])
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+try:
+    from . import metrics
+except Exception:
+    import metrics
+
+
+# Deferred imports, so an entry point only pays for the modules the sources
+# it runs actually touch. Crawler modules are named without the package
+# ("news", "utils") and resolved the way the try/except imports elsewhere do:
+# inside the crawlers package when it is one, top-level otherwise.
+_PACKAGE = __package__ or ""
+
+_optional: Dict[str, Optional[ModuleType]] = {}
+
+
+def crawler_module(name: str) -> ModuleType:
+    full = f"{_PACKAGE}.{name}" if _PACKAGE else name
+    loaded = full in sys.modules
+    start = time.perf_counter()
+    # Always through import_module: a module another thread is still importing
+    # is already in sys.modules half built, and import_module waits on its
+    # import lock until it is done
+    module = importlib.import_module(full)
+    if not loaded:
+        metrics.observe(f"import:{name}", time.perf_counter() - start)
+    return module
+
+
+def optional_module(name: str) -> Optional[ModuleType]:
+    # The module, imported on first call, or None when it is not installed
+    try:
+        return _optional[name]
+    except KeyError:
+        pass
+    try:
+        module: Optional[ModuleType] = importlib.import_module(name)
+    except Exception:
+        module = None
+    _optional[name] = module
+    return module
+
+
+class LazyModule:
+    # Stands in for a module-level `import name` that is always present but
+    # only needed on some paths; the first attribute access imports it
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}{'' if self._module is None else ' (loaded)'}>"
+
+
+class LazyAttr:
+    # `from <crawler module> import <attr>` done on first use. Calling it
+    # calls the attribute, so it can stand in for a scraper function.
+    def __init__(self, module: str, attr: str):
+        self.module = module
+        self.attr = attr
+        self._value: Any = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def resolve(self) -> Any:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = getattr(crawler_module(self.module), self.attr)
+                    self._loaded = True
+        return self._value
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<lazy {self.module}.{self.attr}>"
+
+
+def resolve(value: Any) -> Any:
+    return value.resolve() if isinstance(value, LazyAttr) else value
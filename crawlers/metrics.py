@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Per-run crawl instrumentation: stage timings, per-URL request records and
+# free-form counters/gauges, exported as a JSON report and as a Prometheus
+# textfile for node_exporter's textfile collector. Stages timed inside parse
+# pool processes are not seen here; the parent still times the whole parse.
+# A stage's CPU time is that of the thread that ran it, so work it hands to
+# other threads or processes is not included.
+
+PROMETHEUS_PREFIX = "isro_crawl_"
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.stages: Dict[str, List] = {}  # stage -> [calls, seconds, cpu seconds or None]
+        self.counters: Dict[LabelKey, float] = {}
+        self.gauges: Dict[LabelKey, float] = {}
+        self.requests: List[Dict] = []
+
+    def observe(self, stage: str, seconds: float, calls: int = 1, cpu: Optional[float] = None):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                self.stages[stage] = [calls, seconds, cpu]
+            else:
+                entry[0] += calls
+                entry[1] += seconds
+                if cpu is not None:
+                    entry[2] = (entry[2] or 0.0) + cpu
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        start, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, cpu=time.thread_time() - start_cpu)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges[_key(name, labels)] = value
+
+    def record_request(self, url: str, status: Optional[int], seconds: float, nbytes: int, attempts: int, cache: str):
+        # cache: "hit", "stale", "revalidated", "miss" or "error"
+        with self._lock:
+            self.requests.append({
+                "url": url,
+                "status": status,
+                "seconds": round(seconds, 6),
+                "bytes": nbytes,
+                "attempts": attempts,
+                "cache": cache,
+            })
+
+    def report(self) -> Dict:
+        with self._lock:
+            requests = list(self.requests)
+            stages = {}
+            for k, (calls, seconds, cpu) in sorted(self.stages.items()):
+                stages[k] = {"calls": int(calls), "seconds": round(seconds, 6)}
+                if cpu is not None:
+                    stages[k]["cpu"] = round(cpu, 6)
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())]
+            gauges = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.gauges.items())]
+        by_cache: Dict[str, int] = {}
+        by_status: Dict[str, int] = {}
+        for r in requests:
+            by_cache[r["cache"]] = by_cache.get(r["cache"], 0) + 1
+            by_status[str(r["status"])] = by_status.get(str(r["status"]), 0) + 1
+        return {
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "seconds": round(time.perf_counter() - self._clock, 6),
+            "stages": stages,
+            "requests": {
+                "count": len(requests),
+                "bytes": sum(r["bytes"] for r in requests),
+                "retries": sum(max(0, r["attempts"] - 1) for r in requests),
+                "seconds": round(sum(r["seconds"] for r in requests), 6),
+                "by_cache": by_cache,
+                "by_status": by_status,
+                "slowest": sorted(requests, key=lambda r: -r["seconds"])[:10],
+            },
+            "counters": counters,
+            "gauges": gauges,
+            "urls": requests,
+        }
+
+    def prometheus(self) -> str:
+        rep = self.report()
+        out: List[str] = []
+
+        def family(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, object], float]]):
+            full = PROMETHEUS_PREFIX + name
+            out.append(f"# HELP {full} {help_text}")
+            out.append(f"# TYPE {full} gauge")
+            for labels, value in samples:
+                out.append(f"{full}{_labels(labels)} {_number(value)}")
+
+        family("last_run_timestamp_seconds", "Unix time the crawl started.", [({}, self.started)])
+        family("run_seconds", "Wall time of the crawl.", [({}, rep["seconds"])])
+        family("stage_seconds", "Seconds spent per stage.", [({"stage": k}, v["seconds"]) for k, v in rep["stages"].items()])
+        family("stage_cpu_seconds", "Thread CPU seconds per stage, where measured.", [({"stage": k}, v["cpu"]) for k, v in rep["stages"].items() if "cpu" in v])
+        family("stage_calls", "Calls per stage.", [({"stage": k}, v["calls"]) for k, v in rep["stages"].items()])
+
+        per: Dict[Tuple[str, str], List[float]] = {}
+        for r in rep["urls"]:
+            entry = per.setdefault((r["cache"], str(r["status"])), [0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += r["seconds"]
+            entry[2] += r["bytes"]
+        groups = sorted(per.items())
+        family("requests", "Fetches by cache outcome and status.", [({"cache": c, "status": s}, v[0]) for (c, s), v in groups])
+        family("request_seconds", "Fetch latency summed by cache outcome and status.", [({"cache": c, "status": s}, v[1]) for (c, s), v in groups])
+        family("request_bytes", "Body bytes by cache outcome and status.", [({"cache": c, "status": s}, v[2]) for (c, s), v in groups])
+        family("request_retries", "Extra attempts across all fetches.", [({}, rep["requests"]["retries"])])
+
+        for kind in ("counters", "gauges"):
+            names: Dict[str, List[Tuple[Dict[str, object], float]]] = {}
+            for item in rep[kind]:
+                names.setdefault(item["name"], []).append((item["labels"], item["value"]))
+            for name, samples in sorted(names.items()):
+                family(name, f"Crawler {kind[:-1]} {name}.", samples)
+        return "\n".join(out) + "\n"
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _write_atomic(path: str, text: str):
+    # The textfile collector may read at any moment, so never show it a partial file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+_metrics = Metrics()
+
+
+def reset_metrics() -> Metrics:
+    global _metrics
+    _metrics = Metrics()
+    return _metrics
+
+
+def observe(stage: str, seconds: float, calls: int = 1, cpu: Optional[float] = None):
+    _metrics.observe(stage, seconds, calls, cpu)
+
+
+def timed(stage: str):
+    return _metrics.timed(stage)
+
+
+def inc(name: str, value: float = 1, **labels):
+    _metrics.inc(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels):
+    _metrics.gauge(name, value, **labels)
+
+
+def record_request(url: str, status: Optional[int], seconds: float, nbytes: int, attempts: int, cache: str):
+    _metrics.record_request(url, status, seconds, nbytes, attempts, cache)
+
+
+def write_report(path: str):
+    _write_atomic(path, json.dumps(_metrics.report(), ensure_ascii=False, indent=2))
+
+
+def write_prometheus(path: str):
+    _write_atomic(path, _metrics.prometheus())
@@ -1,43 +1,89 @@
 from __future__ import annotations
 
-from typing import List, Dict, Optional
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
 
-import re
 from bs4 import BeautifulSoup
 
 try:
-    from .utils import get_soup, save_json, save_csv, norm_space, parse_date
+    from .utils import async_parse_page, parse_page, load_rows, norm_space, parse_date, table_kv_pairs, JsonSink, CsvSink, stream_rows
+    from .lazy import LazyModule, crawler_module
 except Exception:
-    from utils import get_soup, save_json, save_csv, norm_space, parse_date
-
-
-MISSIONS: List[Dict[str, str]] = [
-    {
-        "name": "Chandrayaan-3",
-        "url": "https://www.isro.gov.in/Chandrayaan3_Details.html",
-        "category": "lunar",
-    },
-    {
-        "name": "Aditya-L1",
-        "url": "https://www.isro.gov.in/Aditya_L1-MissionDetails.html",
-        "category": "solar",
-    },
-    {
-        "name": "Gaganyaan",
-        "url": "https://www.isro.gov.in/Gaganyaan.html",
-        "category": "human_spaceflight",
-    },
-    {
-        "name": "Mars Orbiter Mission (MOM)",
-        "url": "https://www.isro.gov.in/MarsOrbiterMissionSpacecraft.html",
-        "category": "planetary",
-    },
-    {
-        "name": "AstroSat",
-        "url": "https://www.isro.gov.in/AstroSat.html",
-        "category": "astronomy",
-    },
-]
+    from utils import async_parse_page, parse_page, load_rows, norm_space, parse_date, table_kv_pairs, JsonSink, CsvSink, stream_rows
+    from lazy import LazyModule, crawler_module
+
+# Only the async crawl gathers mission pages on an event loop
+asyncio = LazyModule("asyncio")
+
+
+# Hand-picked mission pages. load_missions() adds the mission pages the
+# spacecraft table links to from its name cells, read off the list pages with
+# frontier.parse_table_links, and the upcoming-mission links from the last crawl.
+MISSIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "missions.json")
+
+
+def _spacecraft_links():
+    # frontier imports this module, so it is loaded on first use rather than up top
+    frontier = crawler_module("frontier")
+    return frontier, partial(frontier.parse_table_links, frontier.SPACECRAFT_HEADERS, "SpacecraftMissions")
+
+
+def _table_missions(frontier, pages: Iterable[Dict[str, List]]) -> List[Dict[str, str]]:
+    missions: List[Dict[str, str]] = []
+    for page in pages:
+        for text, href in page["links"]:
+            url = frontier.canonical_url(href, frontier.SPACECRAFT_BASE) if href else None
+            if url and urlsplit(url).netloc == frontier.ISRO_HOST:
+                missions.append({"name": text, "url": url, "category": "spacecraft"})
+    return missions
+
+
+def spacecraft_missions(max_workers: int = 4) -> List[Dict[str, str]]:
+    # Mission pages linked from every page of the spacecraft table
+    frontier, parse = _spacecraft_links()
+    first = parse_page(frontier.SPACECRAFT_BASE, parse, name="mission_links")
+    urls = [u for u in first["pages"] if u != frontier.SPACECRAFT_BASE]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        rest = list(pool.map(lambda u: parse_page(u, parse, name="mission_links"), urls))
+    return _table_missions(frontier, [first, *rest])
+
+
+async def async_spacecraft_missions() -> List[Dict[str, str]]:
+    frontier, parse = _spacecraft_links()
+    first = await async_parse_page(frontier.SPACECRAFT_BASE, parse, name="mission_links")
+    urls = [u for u in first["pages"] if u != frontier.SPACECRAFT_BASE]
+    rest = await asyncio.gather(*(async_parse_page(u, parse, name="mission_links") for u in urls))
+    return _table_missions(frontier, [first, *rest])
+
+
+def load_missions(data_dir: str = "data", linked: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+    # linked: the spacecraft table's mission links, when the caller already has them
+    with open(MISSIONS_PATH, "r", encoding="utf-8") as f:
+        missions: List[Dict[str, str]] = json.load(f)
+    if linked is None:
+        try:
+            linked = spacecraft_missions()
+        except Exception as exc:
+            # Without the table the hand-picked and upcoming pages still get crawled
+            print(f"Spacecraft mission links failed: {exc!r}", file=sys.stderr)
+            linked = []
+    missions.extend(linked)
+    for row in load_rows(data_dir, "upcoming_missions") or []:
+        if row.get("url"):
+            missions.append({"name": row.get("title", ""), "url": row["url"], "category": "upcoming"})
+    seen = set()
+    uniq: List[Dict[str, str]] = []
+    for m in missions:
+        if m["url"] in seen:
+            continue
+        seen.add(m["url"])
+        uniq.append(m)
+    return uniq
 
 
 def _text(el) -> str:
@@ -46,45 +92,40 @@ def _text(el) -> str:
     return norm_space(el.get_text(" "))
 
 
+HEADINGS = {"h1", "h2", "h3", "h4"}
+
+
 def _find_heading_sections(soup: BeautifulSoup) -> Dict[str, List[str]]:
+    # One walk in document order; every heading closes the section before it.
+    # A heading with no text closes the previous section without opening one.
     sections: Dict[str, List[str]] = {}
-    for h in soup.find_all(["h1", "h2", "h3", "h4"]):
-        title = _text(h).strip().lower()
-        if not title:
+    title: Optional[str] = None
+    items: List[str] = []
+
+    def close():
+        if title and items:
+            sections[title] = items
+
+    for el in soup.find_all(True):
+        if el.name in HEADINGS:
+            close()
+            title = _text(el).strip().lower() or None
+            items = []
+        elif title is None:
             continue
-        items: List[str] = []
-        for sib in h.find_all_next():
-            if sib == h:
-                continue
-            if sib.name in {"h1", "h2", "h3", "h4"}:
-                break
-            if sib.name in {"ul", "ol"}:
-                for li in sib.find_all("li", recursive=False):
-                    t = _text(li)
-                    if t:
-                        items.append(t)
-            elif sib.name == "p":
-                t = _text(sib)
+        elif el.name in {"ul", "ol"}:
+            for li in el.find_all("li", recursive=False):
+                t = _text(li)
                 if t:
                     items.append(t)
-        if items:
-            sections[title] = items
+        elif el.name == "p":
+            t = _text(el)
+            if t:
+                items.append(t)
+    close()
     return sections
 
 
-def _extract_kv_from_tables(soup: BeautifulSoup) -> Dict[str, str]:
-    out: Dict[str, str] = {}
-    for table in soup.find_all("table"):
-        for tr in table.find_all("tr"):
-            tds = tr.find_all(["td", "th"])
-            if len(tds) >= 2:
-                key = _text(tds[0]).strip().rstrip(":").lower()
-                val = _text(tds[1]).strip()
-                if key and val and key not in out:
-                    out[key] = val
-    return out
-
-
 def _guess_field(kvs: Dict[str, str], keys: List[str]) -> Optional[str]:
     for k in keys:
         for existing in kvs:
@@ -101,11 +142,10 @@ def _first_paragraph(soup: BeautifulSoup) -> Optional[str]:
     return None
 
 
-def scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: Optional[str] = None) -> Dict[str, object]:
-    soup = get_soup(url)
-
-    title = name_hint or _text(soup.find(["h1", "h2"])) or ""
-    kvs = _extract_kv_from_tables(soup)
+def parse_mission_detail(soup: BeautifulSoup) -> Dict[str, object]:
+    # Everything a mission row takes from the page itself
+    heading = _text(soup.find(["h1", "h2"])) or ""
+    kvs = table_kv_pairs(soup)
     sections = _find_heading_sections(soup)
 
     launch_date = _guess_field(kvs, ["launch date", "date of launch", "date"]) or ""
@@ -113,7 +153,7 @@ def scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: O
     orbit = _guess_field(kvs, ["orbit", "halo orbit"]) or ""
     status = _guess_field(kvs, ["status"]) or ""
 
-    ld_parsed = parse_date(launch_date) if launch_date else ""
+    ld_parsed = parse_date(launch_date, "mission.launch_date") if launch_date else ""
 
     objectives: List[str] = []
     for sec_key in sections.keys():
@@ -135,9 +175,7 @@ def scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: O
     summary = _first_paragraph(soup) or ""
 
     return {
-        "name": title or name_hint or "",
-        "url": url,
-        "category": category or "",
+        "heading": heading,
         "launch_date": ld_parsed or launch_date,
         "launch_vehicle": launch_vehicle,
         "orbit": orbit,
@@ -146,21 +184,77 @@ def scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: O
         "payloads": payloads,
         "notable_events": notable_events,
         "summary": summary,
+    }
+
+
+def mission_row(url: str, detail: Dict[str, object], name_hint: Optional[str] = None, category: Optional[str] = None) -> Dict[str, object]:
+    # A parse_mission_detail() result as an output row
+    page = dict(detail)
+    heading = page.pop("heading")
+    return {
+        "name": name_hint or heading or "",
+        "url": url,
+        "category": category or "",
+        **page,
         "source": "isro.gov.in",
     }
 
 
-def scrape_all_mission_details() -> List[Dict[str, object]]:
-    out: List[Dict[str, object]] = []
-    for m in MISSIONS:
-        out.append(
-            scrape_mission_detail(url=m["url"], name_hint=m.get("name"), category=m.get("category"))
-        )
-    return out
+def scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: Optional[str] = None) -> Dict[str, object]:
+    return mission_row(url, parse_page(url, parse_mission_detail, name="mission_detail"), name_hint, category)
+
+
+async def async_scrape_mission_detail(url: str, name_hint: Optional[str] = None, category: Optional[str] = None) -> Dict[str, object]:
+    return mission_row(url, await async_parse_page(url, parse_mission_detail, name="mission_detail"), name_hint, category)
+
+
+def iter_mission_details(
+    missions: Optional[List[Dict[str, str]]] = None,
+    max_workers: int = 4,
+) -> Iterator[Dict[str, object]]:
+    if missions is None:
+        missions = load_missions()
+
+    def load(m: Dict[str, str]) -> Optional[Dict[str, object]]:
+        try:
+            return scrape_mission_detail(url=m["url"], name_hint=m.get("name"), category=m.get("category"))
+        except Exception as exc:
+            # One moved page should not cost the other missions
+            print(f"Mission detail {m['url']} failed: {exc!r}", file=sys.stderr)
+            return None
+
+    # Fetches go through the per-host budget; map() keeps the mission order
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for row in pool.map(load, missions):
+            if row is not None:
+                yield row
+
+
+def scrape_all_mission_details(max_workers: int = 4) -> List[Dict[str, object]]:
+    return list(iter_mission_details(max_workers=max_workers))
+
+
+async def async_scrape_all_mission_details(missions: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, object]]:
+    if missions is None:
+        try:
+            linked = await async_spacecraft_missions()
+        except Exception as exc:
+            print(f"Spacecraft mission links failed: {exc!r}", file=sys.stderr)
+            linked = []
+        missions = load_missions(linked=linked)
+
+    async def load(m: Dict[str, str]) -> Optional[Dict[str, object]]:
+        try:
+            return await async_scrape_mission_detail(url=m["url"], name_hint=m.get("name"), category=m.get("category"))
+        except Exception as exc:
+            print(f"Mission detail {m['url']} failed: {exc!r}", file=sys.stderr)
+            return None
+
+    # Every mission at once; the host budget paces them and gather() keeps the order
+    rows = await asyncio.gather(*(load(m) for m in missions))
+    return [row for row in rows if row is not None]
 
 
 if __name__ == "__main__":
-    data = scrape_all_mission_details()
-    save_json("data/mission_details.json", data)
-    save_csv("data/mission_details.csv", data)
-    print(f"Saved {len(data)} mission details rows")
+    n = stream_rows(iter_mission_details(), [JsonSink("data/mission_details.json"), CsvSink("data/mission_details.csv")])
+    print(f"Saved {n} mission details rows")
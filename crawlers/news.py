@@ -1,30 +1,40 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from functools import partial
+from typing import Dict, Iterator, List
+
 try:
-    from .utils import get_soup, norm_space, save_json, save_csv
+    from .utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 except Exception:
-    from utils import get_soup, norm_space, save_json, save_csv
+    from utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 
+BASE = "https://www.isro.gov.in"
+CSV_FIELDS = ["title", "url"]
 
-def scrape_news(limit: int = 100) -> List[Dict]:
-    base = "https://www.isro.gov.in"
-    url = f"{base}/Press.html"
-    soup = get_soup(url)
+
+def parse_news(page: Page, limit: int = 100) -> List[Dict]:
     items: List[Dict] = []
-    for a in soup.select('a'):
-        title = norm_space(a.get_text(" "))
-        href = a.get('href') or ''
+    for title, href in page.links():
         if not title or 'press' not in href.lower():
             continue
-        link = href if href.startswith('http') else f"{base}/{href.lstrip('/')}"
+        link = href if href.startswith('http') else f"{BASE}/{href.lstrip('/')}"
         items.append({"title": title, "url": link})
         if len(items) >= limit:
             break
     return items
 
 
+def iter_news(limit: int = 100) -> Iterator[Dict]:
+    yield from extract_page(f"{BASE}/Press.html", partial(parse_news, limit=limit), name=f"news{limit}")
+
+
+def scrape_news(limit: int = 100) -> List[Dict]:
+    return list(iter_news(limit))
+
+
+async def async_scrape_news(limit: int = 100) -> List[Dict]:
+    return await async_extract_page(f"{BASE}/Press.html", partial(parse_news, limit=limit), name=f"news{limit}")
+
+
 if __name__ == "__main__":
-    rows = scrape_news()
-    save_json("data/news.json", rows)
-    save_csv("data/news.csv", rows)
+    stream_rows(iter_news(), [JsonSink("data/news.json"), CsvSink("data/news.csv", CSV_FIELDS)])
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    from .utils import RowTable, norm_key, parse_date
+    from .lazy import optional_module
+    from . import metrics
+except Exception:
+    from utils import RowTable, norm_key, parse_date
+    from lazy import optional_module
+    import metrics
+
+
+# Batch post-processing shared by the table scrapers (spacecraft, launches).
+# Every step works on whole columns of a RowTable, and every per-value step
+# (date parsing, the vehicle/mission split) runs once per distinct value, so
+# a full historical table costs about as much as its distinct cells:
+#   1. rows that are the table header scraped again (sort-arrow cells such as
+#      "S.No.⇅" or "UpArrowDownArrow", or cells reading their own column
+#      name) are dropped
+#   2. the date column is parsed to ISO dates
+#   3. launch_vehicle_mission "PSLV-C56/DS-SAR" (launch_vehicle in rows
+#      without one) fills launch_vehicle and mission where a row lacks them
+#   4. numeric serial numbers become ints
+# The per-value steps run through the backend's map_unique() and split().
+# The API's cleanItem() still runs on read, for its key renames and for data
+# files written before this stage; it finds no header rows left in ours.
+
+ARTIFACT_RE = re.compile(r"⇅|uparrowdownarrow", re.I)
+_DIGIT_RE = re.compile(r"\d")
+SPLIT_COLUMN = "launch_vehicle_mission"
+SPLIT_INTO = ("launch_vehicle", "mission")
+SERIAL_COLUMN = "serial"
+
+# Rows per batch when normalizing a stream of rows
+BATCH_ROWS = 1024
+
+
+class TableSpec(NamedTuple):
+    date_column: str = "date"
+    date_context: str = ""  # parse_date's column argument: which formats to try first
+
+
+def is_artifact(value: object) -> bool:
+    return isinstance(value, str) and ARTIFACT_RE.search(value) is not None
+
+
+def is_header_row(row: Mapping[str, object]) -> bool:
+    # The header row scraped as data: any sort-arrow cell, or two or more
+    # cells that normalize to their own column name
+    echoes = 0
+    for key, value in row.items():
+        flag = _cell_flag(key, value)
+        if flag == 2:
+            return True
+        echoes += flag
+    return echoes >= 2
+
+
+def _cell_flag(key: str, value: object) -> int:
+    # 2: a sort-arrow cell, 1: a cell reading its own column name, 0: data
+    if not isinstance(value, str) or not value:
+        return 0
+    if ARTIFACT_RE.search(value):
+        return 2
+    # Column headers carry no digits, which rules out dates, serials and most names cheaply
+    if _DIGIT_RE.search(value):
+        return 0
+    return 1 if norm_key(value) == key else 0
+
+
+def header_mask(rows: RowTable) -> List[bool]:
+    # is_header_row() for a whole table: True for the rows to keep. Only
+    # rows holding a sort-arrow string or one that reads as some column's
+    # name are checked, found from the table's distinct strings.
+    keys = set(rows.keys())
+    suspect = {
+        v for v in rows.strings()
+        if ARTIFACT_RE.search(v) or (not _DIGIT_RE.search(v) and norm_key(v) in keys)
+    }
+    keep = [True] * len(rows)
+    if suspect:
+        for i in rows.rows_with(suspect):
+            if is_header_row(rows.row(i)):
+                keep[i] = False
+    return keep
+
+
+def coerce_serial(value: object) -> object:
+    if isinstance(value, str):
+        v = value.strip().rstrip(".")
+        if v.isdigit():
+            return int(v)
+    return value
+
+
+def split_vehicle_mission(value: object) -> Optional[Tuple[str, str]]:
+    if not isinstance(value, str) or "/" not in value:
+        return None
+    vehicle, mission = value.split("/", 1)
+    return vehicle.strip(), mission.strip()
+
+
+def _mapped(values: Sequence[object], fn: Callable[[object], object]) -> List[object]:
+    # fn over a column, called once per distinct value
+    try:
+        memo = {v: fn(v) for v in dict.fromkeys(values)}
+    except TypeError:
+        # Unhashable cells (lists) are left as they are
+        return [v if isinstance(v, (list, dict)) else fn(v) for v in values]
+    return [memo[v] for v in values]
+
+
+class PythonBackend:
+    # Column operations in plain Python; always available
+    name = "python"
+
+    def map_unique(self, values: Sequence[object], fn: Callable[[object], object]) -> List[object]:
+        return _mapped(values, fn)
+
+    def split(self, values: Sequence[object]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        pairs = _mapped(values, split_vehicle_mission)
+        return [p[0] if p else None for p in pairs], [p[1] if p else None for p in pairs]
+
+
+class ArrowBackend(PythonBackend):
+    # Column operations through pyarrow.compute: distinct values come from
+    # pc.unique and are mapped back with pc.index_in, and the vehicle/mission
+    # split runs as one kernel over the whole column. Only plain string
+    # columns go through Arrow; anything else falls back to Python.
+    name = "arrow"
+
+    def __init__(self):
+        self.pa = optional_module("pyarrow")
+        self.pc = optional_module("pyarrow.compute")
+
+    def _strings(self, values: Sequence[object]):
+        if not all(v is None or isinstance(v, str) for v in values):
+            return None
+        return self.pa.array(values, type=self.pa.string())
+
+    def map_unique(self, values: Sequence[object], fn: Callable[[object], object]) -> List[object]:
+        arr = self._strings(values)
+        if arr is None:
+            return super().map_unique(values, fn)
+        uniques = self.pc.unique(arr)
+        mapped = [fn(v) for v in uniques.to_pylist()]
+        if not all(v is None or isinstance(v, str) for v in mapped):
+            return super().map_unique(values, fn)
+        codes = self.pc.index_in(arr, value_set=uniques, skip_nulls=False)
+        return self.pc.take(self.pa.array(mapped, type=self.pa.string()), codes).to_pylist()
+
+    def split(self, values: Sequence[object]) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+        arr = self._strings(values)
+        if arr is None:
+            return super().split(values)
+        pc = self.pc
+        has_slash = pc.fill_null(pc.match_substring(arr, "/"), False)
+        parts = pc.split_pattern(pc.if_else(has_slash, arr, None), "/", max_splits=1)
+        vehicle = pc.utf8_trim_whitespace(pc.list_element(parts, 0))
+        mission = pc.utf8_trim_whitespace(pc.list_element(parts, 1))
+        return vehicle.to_pylist(), mission.to_pylist()
+
+
+def _pick_backend() -> PythonBackend:
+    # $ISRO_NORMALIZE=python|arrow; Python unless Arrow is asked for and installed
+    wanted = os.environ.get("ISRO_NORMALIZE", "python").strip().lower()
+    if wanted == "arrow" and optional_module("pyarrow.compute") is not None:
+        return ArrowBackend()
+    return PythonBackend()
+
+
+NORMALIZE_BACKENDS: Dict[str, Callable[[], PythonBackend]] = {"python": PythonBackend, "arrow": ArrowBackend}
+_backend: Optional[PythonBackend] = None
+
+
+def set_normalize_backend(name: Optional[str]) -> PythonBackend:
+    # None goes back to $ISRO_NORMALIZE
+    global _backend
+    if name is not None and name not in NORMALIZE_BACKENDS:
+        raise ValueError(f"unknown normalize backend {name!r}; choose from {', '.join(sorted(NORMALIZE_BACKENDS))}")
+    if name == "arrow" and optional_module("pyarrow.compute") is None:
+        raise RuntimeError("the arrow normalize backend needs pyarrow")
+    _backend = NORMALIZE_BACKENDS[name]() if name is not None else _pick_backend()
+    return _backend
+
+
+def get_normalize_backend() -> PythonBackend:
+    global _backend
+    if _backend is None:
+        _backend = _pick_backend()
+    return _backend
+
+
+def normalize_table(rows: RowTable, spec: TableSpec, backend: Optional[PythonBackend] = None) -> RowTable:
+    # In place; returns the same table
+    be = backend or get_normalize_backend()
+    rows.keep(header_mask(rows))
+    if not len(rows):
+        return rows
+
+    keys = set(rows.keys())
+    if spec.date_column in keys:
+        context = spec.date_context
+        dates = be.map_unique(rows.column(spec.date_column), lambda v: parse_date(v or "", context) if v is not None else None)
+        rows.set_column(spec.date_column, dates)
+
+    # Rows without launch_vehicle_mission split launch_vehicle instead
+    source = rows.column(SPLIT_COLUMN) if SPLIT_COLUMN in keys else [None] * len(rows)
+    if SPLIT_INTO[0] in keys:
+        source = [s or lv for s, lv in zip(source, rows.column(SPLIT_INTO[0]))]
+    if any(source):
+        vehicles, missions = be.split(source)
+        rows.set_column(SPLIT_INTO[0], vehicles, only_missing=True)
+        rows.set_column(SPLIT_INTO[1], missions, only_missing=True)
+
+    if SERIAL_COLUMN in keys:
+        rows.set_column(SERIAL_COLUMN, be.map_unique(rows.column(SERIAL_COLUMN), coerce_serial))
+    return rows
+
+
+def normalize_stream(
+    rows: Iterable[Mapping[str, object]],
+    spec: TableSpec,
+    stage: Optional[str] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator[Dict[str, object]]:
+    # normalize_table over a stream, a batch at a time, so a streamed crawl
+    # keeps its bounded memory. `stage` times just the normalizing.
+    batch = RowTable()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_rows:
+            yield from _normalized(batch, spec, stage)
+            batch = RowTable()
+    if len(batch):
+        yield from _normalized(batch, spec, stage)
+
+
+def _normalized(batch: RowTable, spec: TableSpec, stage: Optional[str]) -> RowTable:
+    if stage is None:
+        return normalize_table(batch, spec)
+    with metrics.timed(stage):
+        return normalize_table(batch, spec)
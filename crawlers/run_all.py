@@ -1,66 +1,426 @@
 from __future__ import annotations
 
+import argparse
 import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 try:
-    from .spacecraft_missions import scrape_spacecraft
-    from .launch_missions import scrape_launches
-    from .timeline import scrape_timeline
-    from .upcoming_missions import scrape_upcoming
-    from .utils import save_json, save_csv
-    from .news import scrape_news
-    from .launch_vehicle_specs import scrape_vehicle_specs
+    from .utils import (
+        save_json,
+        JsonSink,
+        JsonlSink,
+        CsvSink,
+        stream_rows,
+        set_host_budget,
+        configure_session,
+        configure_cache,
+        default_cache_dir,
+        default_offline,
+        configure_parse_pool,
+        set_parser_backend,
+        PARSER_BACKENDS,
+        set_page_memo,
+        flush_page_memo,
+        flush_cache,
+        memo_stats,
+        close_async_client,
+    )
+    from .incremental import RowDiff, RowIndex
+    from . import metrics
+    from .lazy import LazyAttr, LazyModule, crawler_module, optional_module, resolve
 except Exception:
     import sys as _sys, os as _os
     _CUR = _os.path.dirname(_os.path.abspath(__file__))
     if _CUR not in _sys.path:
         _sys.path.insert(0, _CUR)
-    from spacecraft_missions import scrape_spacecraft
-    from launch_missions import scrape_launches
-    from timeline import scrape_timeline
-    from upcoming_missions import scrape_upcoming
-    from utils import save_json, save_csv
-    from news import scrape_news
-    from launch_vehicle_specs import scrape_vehicle_specs
+    from utils import (
+        save_json,
+        JsonSink,
+        JsonlSink,
+        CsvSink,
+        stream_rows,
+        set_host_budget,
+        configure_session,
+        configure_cache,
+        default_cache_dir,
+        default_offline,
+        configure_parse_pool,
+        set_parser_backend,
+        PARSER_BACKENDS,
+        set_page_memo,
+        flush_page_memo,
+        flush_cache,
+        memo_stats,
+        close_async_client,
+    )
+    from incremental import RowDiff, RowIndex
+    import metrics
+    from lazy import LazyAttr, LazyModule, crawler_module, optional_module, resolve
+
+# Only --async needs the event loop
+asyncio = LazyModule("asyncio")
+
+
+class Source(NamedTuple):
+    label: str
+    rows: Callable[[], Iterable[Dict]]
+    basename: str  # output files are data/<basename>.{json,jsonl,csv}
+    key_fields: Tuple[str, ...]  # fields that identify a row across crawls
+    csv_fields: Optional[List[str]] = None  # declared CSV schema (or a LazyAttr to one); None spools and unions the keys
+    async_rows: Optional[Callable[[], Awaitable[Iterable[Dict]]]] = None  # used by --async
+    needs: Tuple[str, ...] = ()  # basenames whose fresh output this source reads; the crawl waits for them
+
+
+def _lazy_source(
+    label: str,
+    module: str,
+    basename: str,
+    key_fields: Tuple[str, ...],
+    rows: str,
+    async_rows: str,
+    csv_fields: Optional[str] = None,
+    **kw,
+) -> Source:
+    # A source whose scraper module is only imported once it runs, so naming
+    # every source costs nothing for a crawl of one or two of them
+    return Source(
+        label,
+        LazyAttr(module, rows),
+        basename,
+        key_fields,
+        LazyAttr(module, csv_fields) if csv_fields else None,
+        LazyAttr(module, async_rows),
+        **kw,
+    )
+
+
+SOURCES: List[Source] = [
+    _lazy_source("Spacecraft", "spacecraft_missions", "spacecraft_missions", ("name", "date"), "iter_spacecraft", "async_scrape_spacecraft"),
+    _lazy_source("Launches", "launch_missions", "launch_missions", ("launch_vehicle_mission", "date"), "iter_launches", "async_scrape_launches"),
+    _lazy_source("Timeline", "timeline", "timeline_links", ("url",), "iter_timeline", "async_scrape_timeline", "CSV_FIELDS"),
+    _lazy_source("Upcoming", "upcoming_missions", "upcoming_missions", ("url",), "iter_upcoming", "async_scrape_upcoming", "CSV_FIELDS"),
+    _lazy_source("News", "news", "news", ("url",), "iter_news", "async_scrape_news", "CSV_FIELDS"),
+    _lazy_source("Specs", "launch_vehicle_specs", "launch_vehicle_specs", ("vehicle",), "iter_vehicle_specs", "async_scrape_vehicle_specs", "CSV_FIELDS"),
+    # Mission pages come from missions.json, the spacecraft table's links and the upcoming
+    # output on disk, so this source starts once the upcoming source is done
+    _lazy_source(
+        "Details",
+        "mission_details",
+        "mission_details",
+        ("url",),
+        "iter_mission_details",
+        "async_scrape_all_mission_details",
+        needs=("upcoming_missions",),
+    ),
+]
+
+# Sources crawled side by side unless --workers says otherwise
+DEFAULT_WORKERS = 4
+
+INCREMENTAL_DIR = os.path.join("data", ".incremental")
+REPORT_PATH = os.path.join("data", "crawl_report.json")
+
+# Cache TTL per source page, matched by URL fragment; everything else uses --cache-ttl
+CACHE_TTL_RULES: Dict[str, float] = {
+    "Press.html": 900.0,
+    "FutureMissions.html": 3600.0,
+    "Timeline.html": 6 * 3600.0,
+    "SpacecraftMissions": 6 * 3600.0,
+    "LaunchMissions": 6 * 3600.0,
+    "_CON.html": 24 * 3600.0,
+    "LVM3.html": 24 * 3600.0,
+}
+
+
+def build_sources(follow: bool = False, follow_depth: int = 2) -> List[Source]:
+    sources = list(SOURCES)
+    if follow:
+        sources.append(Source("Followed", partial(LazyAttr("frontier", "iter_followed_pages"), max_depth=follow_depth), "mission_pages", ("url",)))
+    return sources
 
 
 def ensure_data_dir():
     os.makedirs("data", exist_ok=True)
 
 
-def main():
+def _tee(rows: Iterable[Dict], diff: RowDiff) -> Iterator[Dict]:
+    for row in rows:
+        diff.add(row)
+        yield row
+
+
+def run_source(source: Source, row_index: Optional[RowIndex] = None, after: Iterable[Future] = ()) -> Optional[int]:
+    # `after`: futures of the sources this one needs. They were submitted to
+    # the pool first, so they are running or done and waiting cannot deadlock.
+    after = list(after)
+    if after:
+        # Failed or not, their output is whatever is on disk now
+        wait(after)
+    with metrics.timed(f"source:{source.basename}"):
+        n = _run_source(source, row_index)
+    _count_source(source, n)
+    return n
+
+
+async def run_source_async(source: Source, row_index: Optional[RowIndex] = None, after: Iterable[asyncio.Task] = ()) -> Optional[int]:
+    # Rows are gathered on the event loop; writing them out blocks, so that
+    # runs in a thread while the other sources keep fetching
+    after = list(after)
+    if after:
+        # Failed or not, their output is whatever is on disk now
+        await asyncio.wait(after)
+    start = time.perf_counter()
+    if source.async_rows is None:
+        n = await asyncio.to_thread(_run_source, source, row_index)
+    else:
+        try:
+            rows = await source.async_rows()
+        except Exception as exc:
+            print(f"{source.label} failed: {exc!r}", file=sys.stderr)
+            n = None
+        else:
+            n = await asyncio.to_thread(_run_source, source._replace(rows=lambda: rows), row_index)
+    # Wall time only: the loop thread's CPU is shared by every source
+    metrics.observe(f"source:{source.basename}", time.perf_counter() - start)
+    _count_source(source, n)
+    return n
+
+
+async def _run_sources_async(sources: List[Source], row_index: Optional[RowIndex]) -> Dict[str, Optional[int]]:
+    tasks: Dict[str, asyncio.Task] = {}
+    try:
+        for source in sources:
+            after = [tasks[b] for b in source.needs if b in tasks]
+            tasks[source.basename] = asyncio.create_task(run_source_async(source, row_index, after))
+        counts = await asyncio.gather(*tasks.values())
+    finally:
+        await close_async_client()
+    return {source.label: n for source, n in zip(sources, counts)}
+
+
+def _count_source(source: Source, n: Optional[int]):
+    if n is None:
+        metrics.inc("source_failures", source=source.basename)
+    else:
+        metrics.gauge("rows", n, source=source.basename)
+
+
+def _run_source(source: Source, row_index: Optional[RowIndex]) -> Optional[int]:
+    try:
+        rows = source.rows()
+        diff = RowDiff(row_index.load(source.basename), source.key_fields) if row_index is not None else None
+        if diff is not None:
+            rows = _tee(rows, diff)
+        base = f"data/{source.basename}"
+        snapshot = crawler_module("snapshot")
+        sinks = [
+            JsonSink(f"{base}.json"),
+            JsonlSink(f"{base}.jsonl"),
+            CsvSink(f"{base}.csv", resolve(source.csv_fields)),
+            snapshot.ColumnarSink(f"{base}.isrocol"),
+        ]
+        if snapshot.have_arrow():
+            sinks.append(snapshot.ArrowSink(f"{base}.arrow"))
+        n = stream_rows(rows, sinks)
+        if diff is not None:
+            save_json(f"{base}.changes.json", diff.changes())
+            # Only advance the baseline once the change set is on disk
+            row_index.save(source.basename, diff.hashes)
+        return n
+    except Exception as exc:
+        # One broken source must not take the rest of the crawl down with it
+        print(f"{source.label} failed: {exc!r}", file=sys.stderr)
+        return None
+
+
+def main(
+    workers: Optional[int] = None,
+    per_host: Optional[int] = None,
+    delay: Optional[float] = None,
+    pool_size: Optional[int] = None,
+    cache: bool = True,
+    cache_dir: Optional[str] = None,
+    cache_ttl: float = 900.0,
+    cache_max_mb: int = 256,
+    text_max_mb: int = 64,
+    offline: bool = False,
+    incremental: bool = False,
+    index: bool = True,
+    parse_workers: int = 0,
+    parser: Optional[str] = None,
+    report: Optional[str] = REPORT_PATH,
+    metrics_textfile: Optional[str] = None,
+    use_async: bool = False,
+    follow: bool = False,
+    follow_depth: int = 2,
+    only: Optional[Sequence[str]] = None,
+    import_seconds: Optional[float] = None,
+) -> Dict[str, Optional[int]]:
+    # workers: sources crawled side by side; default min(DEFAULT_WORKERS, sources).
+    # only: basenames to crawl, in that order; default every source.
+    # import_seconds: what the entry point spent importing, kept in the report.
+    if use_async and optional_module("httpx") is None:
+        raise RuntimeError("--async needs httpx (pip install httpx)")
     ensure_data_dir()
+    metrics.reset_metrics()
+    if import_seconds is not None:
+        metrics.observe("import", import_seconds)
+    row_index: Optional[RowIndex] = None
+    if incremental:
+        set_page_memo(os.path.join(INCREMENTAL_DIR, "pages.json"))
+        row_index = RowIndex(INCREMENTAL_DIR)
+    offline = offline or default_offline()
+    if offline and not cache:
+        raise RuntimeError("--offline serves pages from the cache, so it cannot be combined with --no-cache")
+    configure_cache(
+        (cache_dir or default_cache_dir()) if cache else None,
+        ttl=cache_ttl,
+        ttl_rules=CACHE_TTL_RULES,
+        max_bytes=cache_max_mb * 1024 * 1024,
+        offline=offline,
+    )
+    # Page text the rows reference by hash; least recently used texts go past the cap
+    text_store = crawler_module("text_store")
+    text_store.configure_text_store(text_store.TEXT_DIR, max_bytes=text_max_mb * 1024 * 1024)
+    if pool_size is not None:
+        configure_session(pool_size=pool_size)
+    if per_host is not None or delay is not None:
+        set_host_budget(per_host=per_host, delay=delay)
+    if parser is not None:
+        set_parser_backend(parser)
 
-    spacecraft = scrape_spacecraft()
-    save_json("data/spacecraft_missions.json", spacecraft)
-    save_csv("data/spacecraft_missions.csv", spacecraft)
+    sources = build_sources(follow, follow_depth)
+    if only is not None:
+        by_basename = {source.basename: source for source in sources}
+        sources = [by_basename[b] for b in only if b in by_basename]
 
-    launches = scrape_launches()
-    save_json("data/launch_missions.json", launches)
-    save_csv("data/launch_missions.csv", launches)
+    configure_parse_pool(parse_workers)
+    try:
+        if use_async:
+            counts = asyncio.run(_run_sources_async(sources, row_index))
+        else:
+            if workers is None:
+                workers = min(DEFAULT_WORKERS, len(sources))
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures: Dict[str, Future] = {}
+                for source in sources:
+                    after = [futures[b] for b in source.needs if b in futures]
+                    futures[source.basename] = pool.submit(run_source, source, row_index, after)
+                counts = {source.label: futures[source.basename].result() for source in sources}
+    finally:
+        configure_parse_pool(0)
+    flush_page_memo()
+    flush_cache()
 
-    timeline = scrape_timeline()
-    save_json("data/timeline_links.json", timeline)
-    save_csv("data/timeline_links.csv", timeline)
+    if index:
+        # Last stages: rebuild the search index from whatever is now on disk.
+        # Their modules are imported here, so a run without them never loads them.
+        try:
+            with metrics.timed("index"):
+                print(f"Indexed {crawler_module('search_index').write_index('data')} documents for search")
+        except Exception as exc:
+            print(f"Search index failed: {exc!r}", file=sys.stderr)
+        # Then the mission/flight join tables the API's /missions route reads
+        try:
+            with metrics.timed("entities"):
+                print(f"Resolved {crawler_module('entities').write_entities('data')} missions across sources")
+        except Exception as exc:
+            print(f"Entity resolution failed: {exc!r}", file=sys.stderr)
+
+    for name, (hits, misses) in memo_stats().items():
+        metrics.gauge("memo_hits", hits, cache=name)
+        metrics.gauge("memo_misses", misses, cache=name)
+    if report:
+        metrics.write_report(report)
+    if metrics_textfile:
+        metrics.write_prometheus(metrics_textfile)
+
+    print("Done. " + ", ".join(f"{label}: {'failed' if n is None else n}" for label, n in counts.items()))
+    return counts
+
+
+def build_parser(description: str = "Crawl every ISRO source into data/") -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description=description)
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"sources crawled side by side (default: {DEFAULT_WORKERS}, or fewer when fewer sources run); 1 crawls them one after another",
+    )
+    ap.add_argument("--per-host", type=int, default=None, help="max in-flight requests per host (default: 4)")
+    ap.add_argument("--delay", type=float, default=None, help="starting seconds between requests to one host; adapts to response times (default: 0.6)")
+    ap.add_argument("--pool-size", type=int, default=None, help="keep-alive connections kept per host (default: 10)")
+    ap.add_argument("--no-cache", action="store_true", help="fetch every page from the network and keep no response cache")
+    ap.add_argument("--cache-dir", default=None, help="on-disk response cache (default: data/.http_cache or $ISRO_HTTP_CACHE)")
+    ap.add_argument("--cache-ttl", type=float, default=900.0, help="seconds a cached page is served without revalidation (default: 900)")
+    ap.add_argument("--cache-max-mb", type=int, default=256, help="cache size cap; least recently used pages are evicted (default: 256)")
+    ap.add_argument("--text-max-mb", type=int, default=64, help="size cap of the page text store under data/texts (default: 64)")
+    ap.add_argument("--offline", action="store_true", help="serve every page from the cache and never touch the network")
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip parsing unchanged pages and write data/<source>.changes.json with added/updated/removed rows",
+    )
+    ap.add_argument("--parse-workers", type=int, default=0, help="processes that parse HTML apart from the fetching threads (default: 0, parse in-thread)")
+    ap.add_argument(
+        "--parser",
+        choices=sorted(PARSER_BACKENDS),
+        default=None,
+        help="backend for link, table and text pages (default: lxml or $ISRO_PARSER); mission pages always use BeautifulSoup",
+    )
+    ap.add_argument("--report", default=REPORT_PATH, help=f"JSON run report with stage timings and every fetch (default: {REPORT_PATH})")
+    ap.add_argument("--metrics-textfile", default=None, help="also write Prometheus metrics here, e.g. into node_exporter's textfile directory as crawl.prom")
+    ap.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="crawl every source on one asyncio event loop instead of threads (needs httpx); --workers is ignored",
+    )
+    ap.add_argument(
+        "--follow",
+        action="store_true",
+        help="also crawl the mission pages behind the timeline, upcoming and spacecraft lists into data/mission_pages.*; "
+        "an interrupted run resumes from data/.frontier",
+    )
+    ap.add_argument("--follow-depth", type=int, default=2, help="links followed away from the list pages with --follow (default: 2)")
+    ap.add_argument("--no-index", action="store_true", help="skip rebuilding data/search_index.json and data/entities.json after the crawl")
+    return ap
 
-    upcoming = scrape_upcoming()
-    save_json("data/upcoming_missions.json", upcoming)
-    save_csv("data/upcoming_missions.csv", upcoming)
 
-    news = scrape_news()
-    save_json("data/news.json", news)
-    save_csv("data/news.csv", news)
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    return build_parser().parse_args(argv)
 
-    specs = scrape_vehicle_specs()
-    save_json("data/launch_vehicle_specs.json", specs)
-    save_csv("data/launch_vehicle_specs.csv", specs)
 
-    print(
-        "Done. Spacecraft: {sc}, Launches: {ln}, Timeline: {tl}, Upcoming: {up}, News: {nw}, Specs: {sp}".format(
-            sc=len(spacecraft), ln=len(launches), tl=len(timeline), up=len(upcoming), nw=len(news), sp=len(specs)
-        )
+def main_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    # main()'s keyword arguments from build_parser()'s options
+    return dict(
+        workers=args.workers,
+        per_host=args.per_host,
+        delay=args.delay,
+        pool_size=args.pool_size,
+        cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl,
+        cache_max_mb=args.cache_max_mb,
+        text_max_mb=args.text_max_mb,
+        offline=args.offline,
+        incremental=args.incremental,
+        index=not args.no_index,
+        parse_workers=args.parse_workers,
+        parser=args.parser,
+        report=args.report,
+        metrics_textfile=args.metrics_textfile,
+        use_async=args.use_async,
+        follow=args.follow,
+        follow_depth=args.follow_depth,
     )
 
 
 if __name__ == "__main__":
-    main()
+    results = main(**main_kwargs(parse_args()))
+    if any(n is None for n in results.values()):
+        sys.exit(1)
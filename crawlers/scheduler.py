@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except Exception:  # not on Windows; runs there without the cross-process lock
+    fcntl = None
+
+try:
+    from .utils import save_json
+    from . import run_all
+except Exception:
+    import sys as _sys, os as _os
+    _CUR = _os.path.dirname(_os.path.abspath(__file__))
+    if _CUR not in _sys.path:
+        _sys.path.insert(0, _CUR)
+    from utils import save_json
+    import run_all
+
+
+# Long-running crawl mode: one process keeps the imports, HTTP session and
+# caches warm and crawls each source on its own clock instead of everything
+# on every cron tick. A source whose rows changed is revisited sooner, one
+# that keeps coming back unchanged is backed off, between MIN_FACTOR and
+# MAX_FACTOR times its base interval. Changes are read from the
+# data/<source>.changes.json that the incremental crawl writes.
+SCHEDULER_DIR = os.path.join("data", ".scheduler")
+STATE_FILE = "state.json"
+LOCK_FILE = "lock"
+STATUS_PATH = os.path.join("data", "scheduler_status.json")
+
+HOUR = 3600.0
+# Base refresh interval per source basename, in seconds
+DEFAULT_INTERVALS: Dict[str, float] = {
+    "news": 1 * HOUR,
+    "upcoming_missions": 6 * HOUR,
+    "timeline_links": 12 * HOUR,
+    "spacecraft_missions": 12 * HOUR,
+    "launch_missions": 12 * HOUR,
+    "mission_details": 24 * HOUR,
+    "mission_pages": 24 * HOUR,
+    "launch_vehicle_specs": 7 * 24 * HOUR,
+}
+FALLBACK_INTERVAL = 24 * HOUR
+
+MIN_FACTOR = 0.25  # a source that changes every run is crawled up to 4x as often
+MAX_FACTOR = 8.0  # and one that never changes down to 8x less often
+SPEEDUP = 0.5  # interval multiplier after a run that found changes
+BACKOFF = 1.5  # and after one that did not
+CHANGE_DECAY = 0.3  # weight of the latest run in the change rate
+RETRY_FACTOR = 0.25  # first retry of a failed source, doubling up to the base interval
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+class SourceSchedule:
+    # Clock of one source; plain attributes so the state file is just vars()
+    def __init__(self, basename: str, base: float, **state):
+        self.basename = basename
+        self.base = base
+        self.interval: float = state.get("interval") or base
+        self.next_run: float = state.get("next_run") or 0.0  # 0: due now
+        self.last_run: Optional[float] = state.get("last_run")
+        self.last_changed: Optional[float] = state.get("last_changed")
+        self.last_rows: Optional[int] = state.get("last_rows")
+        self.last_changes: Optional[int] = state.get("last_changes")
+        self.change_rate: float = state.get("change_rate", 0.0)
+        self.failures: int = state.get("failures", 0)
+        # A changed base interval still bounds what was learned under the old one
+        self.interval = min(max(self.interval, base * MIN_FACTOR), base * MAX_FACTOR)
+
+    def priority(self, now: float) -> float:
+        # Most overdue (in intervals) first, sources that tend to change breaking ties upward
+        return (now - self.next_run) / self.interval + self.change_rate
+
+    def finished(self, now: float, rows: Optional[int], changes: Optional[int]):
+        self.last_run = now
+        if rows is None:
+            self.failures += 1
+            self.next_run = now + min(self.base, self.base * RETRY_FACTOR * 2 ** (self.failures - 1))
+            return
+        self.failures = 0
+        self.last_rows = rows
+        self.last_changes = changes
+        changed = bool(changes)
+        if changed:
+            self.last_changed = now
+        self.change_rate = (1 - CHANGE_DECAY) * self.change_rate + CHANGE_DECAY * changed
+        factor = SPEEDUP if changed else BACKOFF
+        self.interval = min(max(self.interval * factor, self.base * MIN_FACTOR), self.base * MAX_FACTOR)
+        self.next_run = now + self.interval
+
+    def state(self) -> Dict:
+        return {k: v for k, v in vars(self).items() if k not in ("basename", "base")}
+
+    def status(self) -> Dict:
+        return {
+            **self.state(),
+            "base": self.base,
+            "next_run": _iso(self.next_run),
+            "last_run": _iso(self.last_run),
+            "last_changed": _iso(self.last_changed),
+        }
+
+
+class Scheduler:
+    def __init__(
+        self,
+        basenames: Sequence[str],
+        intervals: Optional[Dict[str, float]] = None,
+        state_dir: str = SCHEDULER_DIR,
+        status_path: Optional[str] = STATUS_PATH,
+        max_sources: int = 0,
+    ):
+        self.state_path = os.path.join(state_dir, STATE_FILE)
+        self.status_path = status_path
+        self.max_sources = max_sources  # per tick; 0 runs everything due
+        intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        saved = self._load()
+        self.sources: Dict[str, SourceSchedule] = {
+            b: SourceSchedule(b, intervals.get(b, FALLBACK_INTERVAL), **saved.get(b, {})) for b in basenames
+        }
+        self.running: List[str] = []
+        self.last_tick: Optional[Dict] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        save_json(self.state_path, {b: s.state() for b, s in self.sources.items()})
+        if self.status_path:
+            save_json(self.status_path, self.status())
+
+    def status(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "updated": _iso(time.time()),
+            "state": "crawling" if self.running else "idle",
+            "running": self.running,
+            "next_run": _iso(self.next_wakeup()),
+            "last_tick": self.last_tick,
+            "sources": {b: s.status() for b, s in self.sources.items()},
+        }
+
+    def due(self, now: float) -> List[str]:
+        ready = sorted((s for s in self.sources.values() if s.next_run <= now), key=lambda s: -s.priority(now))
+        if self.max_sources > 0:
+            ready = ready[: self.max_sources]
+        return [s.basename for s in ready]
+
+    def next_wakeup(self) -> Optional[float]:
+        return min((s.next_run for s in self.sources.values()), default=None)
+
+    def tick(self, crawl_kwargs: Dict, now: Optional[float] = None) -> Dict[str, Optional[int]]:
+        # Crawls whatever is due as one run_all crawl, then reschedules it
+        due = self.due(time.time() if now is None else now)
+        if not due:
+            return {}
+        self.running = due
+        self.save()
+        started = time.time()
+        try:
+            counts = run_all.main(**{**crawl_kwargs, "incremental": True, "only": due})
+        except Exception as exc:
+            print(f"Scheduled crawl of {', '.join(due)} failed: {exc!r}", file=sys.stderr)
+            counts = {}
+        finished = time.time()
+        rows_by_basename = {s.basename: counts.get(s.label) for s in run_all.build_sources(follow=True) if s.basename in due}
+        for basename in due:
+            rows = rows_by_basename.get(basename)
+            self.sources[basename].finished(finished, rows, None if rows is None else _change_count(basename))
+        self.running = []
+        self.last_tick = {
+            "started": _iso(started),
+            "seconds": round(finished - started, 3),
+            "sources": {b: {"rows": rows_by_basename.get(b), "changes": self.sources[b].last_changes} for b in due},
+        }
+        self.save()
+        return rows_by_basename
+
+
+def _change_count(basename: str) -> Optional[int]:
+    try:
+        with open(os.path.join("data", f"{basename}.changes.json"), "r", encoding="utf-8") as f:
+            changes = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return len(changes.get("added", ())) + len(changes.get("updated", ())) + len(changes.get("removed", ()))
+
+
+@contextmanager
+def scheduler_lock(state_dir: str = SCHEDULER_DIR) -> Iterator[bool]:
+    # Yields False when another scheduler holds the lock. The OS drops the
+    # lock with the process, so a crashed daemon never leaves it stale.
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(state_dir, exist_ok=True)
+    with open(os.path.join(state_dir, LOCK_FILE), "a+") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            f.seek(0)
+            f.truncate()
+            f.write(f"{os.getpid()}\n")
+            f.flush()
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def serve(scheduler: Scheduler, crawl_kwargs: Dict, stop: threading.Event, max_sleep: float = 300.0):
+    # Crawls due sources until `stop` is set. Sleeps are capped so a state
+    # file edited by hand or a clock jump is noticed within max_sleep.
+    scheduler.save()
+    while not stop.is_set():
+        scheduler.tick(crawl_kwargs)
+        wakeup = scheduler.next_wakeup()
+        delay = max_sleep if wakeup is None else min(max_sleep, max(0.0, wakeup - time.time()))
+        stop.wait(delay)
+
+
+def parse_interval(text: str) -> float:
+    # "900", "15m", "6h", "7d"
+    units = {"s": 1.0, "m": 60.0, "h": HOUR, "d": 24 * HOUR}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = run_all.build_parser("Keep crawling ISRO sources, each on its own adaptive interval")
+    ap.add_argument(
+        "--interval",
+        action="append",
+        default=[],
+        metavar="SOURCE=TIME",
+        help="base interval for a source basename, e.g. news=30m or launch_vehicle_specs=14d; repeatable",
+    )
+    ap.add_argument("--max-sources", type=int, default=0, help="sources crawled per tick, highest priority first (default: all that are due)")
+    ap.add_argument("--once", action="store_true", help="crawl whatever is due now and exit, e.g. from cron")
+    ap.add_argument("--status", default=STATUS_PATH, help=f"status file rewritten on every change (default: {STATUS_PATH})")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    intervals: Dict[str, float] = {}
+    for spec in args.interval:
+        name, _, value = spec.partition("=")
+        intervals[name.strip()] = parse_interval(value)
+    basenames = [s.basename for s in run_all.build_sources(args.follow, args.follow_depth)]
+    unknown = sorted(set(intervals) - set(basenames))
+    if unknown:
+        print(f"Unknown sources for --interval: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    crawl_kwargs = run_all.main_kwargs(args)
+    run_all.ensure_data_dir()
+    with scheduler_lock() as locked:
+        if not locked:
+            print("Another scheduler is already crawling; not starting a second one", file=sys.stderr)
+            return 1
+        scheduler = Scheduler(basenames, intervals, status_path=args.status, max_sources=args.max_sources)
+        if args.once:
+            scheduler.save()
+            counts = scheduler.tick(crawl_kwargs)
+            return 1 if any(n is None for n in counts.values()) else 0
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # Finish the crawl in progress, then exit
+            signal.signal(sig, lambda *_: stop.set())
+        serve(scheduler, crawl_kwargs, stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .utils import load_rows, save_json
+except Exception:
+    from utils import load_rows, save_json
+
+
+INDEX_PATH = os.path.join("data", "search_index.json")
+
+# (type, file under data/) indexed after a crawl; missing files are skipped.
+# Every type the API's /search scanned in Mongo before the index existed is
+# here with the same name, since the route no longer scans once the file exists.
+INDEXED_SOURCES: List[Tuple[str, str]] = [
+    ("spacecraft", "spacecraft_missions"),
+    ("launches", "launch_missions"),
+    ("details", "mission_details"),
+    ("upcoming", "upcoming_missions"),
+    ("timeline", "timeline_links"),
+    ("news", "news"),
+    ("specs", "launch_vehicle_specs"),
+]
+
+# Tokens from these fields count twice, so a name match outranks a remark
+BOOSTED_FIELDS = ("name", "title", "mission", "launch_vehicle_mission", "vehicle")
+SKIPPED_FIELDS = ("url", "serial")
+
+# Applied to lowercased text before splitting, in order. Patterns must mean the
+# same in Python and JavaScript: the server folds queries with the copy saved
+# in the index file.
+SYNONYMS: List[Tuple[str, str]] = [
+    (r"\bgslv[\s\-_]*(?:mk|mark)[\s\-_.]*(?:iii|3)\b", "lvm3"),
+    (r"\blvm[\s\-_]*3\b", "lvm3"),
+    (r"\baditya[\s\-_]*l[\s\-_]*1\b", "aditya l1"),
+    (r"\bmars orbiter mission\b", "mom mars orbiter mission"),
+]
+TOKEN_SPLIT = r"[^a-z0-9]+"
+STOPWORDS = frozenset(("a", "an", "and", "of", "the", "to", "in", "on", "for", "by", "with", "is", "at", "from"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_synonym_res = [(re.compile(p), r) for p, r in SYNONYMS]
+_split_re = re.compile(TOKEN_SPLIT)
+
+
+def tokenize(text: str) -> List[str]:
+    s = text.lower()
+    for pattern, repl in _synonym_res:
+        s = pattern.sub(repl, s)
+    return [t for t in _split_re.split(s) if t and t not in STOPWORDS]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return " ".join(_field_text(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(_field_text(v) for v in value.values())
+    return "" if value is None else str(value)
+
+
+def doc_terms(row: Dict) -> Counter:
+    counts: Counter = Counter()
+    for key, value in row.items():
+        if key in SKIPPED_FIELDS:
+            continue
+        weight = 2 if key in BOOSTED_FIELDS else 1
+        for tok in tokenize(_field_text(value)):
+            counts[tok] += weight
+    return counts
+
+
+def build_index(docs: Iterable[Tuple[str, Dict]]) -> Dict:
+    stored: List[Dict] = []
+    lengths: List[int] = []
+    postings: Dict[str, List[List[int]]] = {}
+    for doc_type, row in docs:
+        terms = doc_terms(row)
+        if not terms:
+            continue
+        doc_id = len(stored)
+        stored.append({"type": doc_type, "doc": row})
+        lengths.append(sum(terms.values()))
+        for term, tf in terms.items():
+            postings.setdefault(term, []).append([doc_id, tf])
+    n = len(stored)
+    return {
+        "version": 1,
+        "tokenizer": {"synonyms": SYNONYMS, "split": TOKEN_SPLIT, "stopwords": sorted(STOPWORDS)},
+        "bm25": {"k1": BM25_K1, "b": BM25_B, "avgdl": (sum(lengths) / n) if n else 0.0},
+        "docs": stored,
+        "lengths": lengths,
+        "postings": postings,
+    }
+
+
+def iter_source_docs(data_dir: str = "data", sources: Sequence[Tuple[str, str]] = INDEXED_SOURCES) -> Iterator[Tuple[str, Dict]]:
+    for doc_type, basename in sources:
+        for row in load_rows(data_dir, basename) or []:
+            yield doc_type, row
+
+
+def write_index(data_dir: str = "data", path: Optional[str] = None) -> int:
+    index = build_index(iter_source_docs(data_dir))
+    save_json(path or os.path.join(data_dir, "search_index.json"), index)
+    return len(index["docs"])
+
+
+def search(index: Dict, query: str, limit: int = 20) -> List[Tuple[float, Dict]]:
+    # Reference BM25 scorer; utils/searchIndex.js implements the same for the API
+    n = len(index["docs"])
+    k1, b, avgdl = index["bm25"]["k1"], index["bm25"]["b"], index["bm25"]["avgdl"] or 1.0
+    scores: Dict[int, float] = {}
+    for term in set(tokenize(query)):
+        plist = index["postings"].get(term)
+        if not plist:
+            continue
+        idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+        for doc_id, tf in plist:
+            dl = index["lengths"][doc_id]
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+    ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return [(score, index["docs"][doc_id]) for doc_id, score in ranked]
+
+
+if __name__ == "__main__":
+    print(f"Indexed {write_index()} documents into {INDEX_PATH}")
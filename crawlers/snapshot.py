@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+try:
+    from .utils import RowSink, RowTable
+    from .lazy import optional_module
+except Exception:
+    from utils import RowSink, RowTable
+    from lazy import optional_module
+
+
+# Layout of a .isrocol snapshot (all integers little-endian uint32):
+#   b"ISROCOL1" | header length | 0 | JSON header | body
+# The header lists every column and sort order as [offset, length] pairs into
+# the body, each block 8-byte aligned so it can be viewed straight off an mmap.
+#   dict  column: codes (one per row, NULL_CODE for missing) + a plain string
+#                 block holding the sorted dictionary, so code order is text order
+#   plain column: offsets (rows + 1) + utf-8 data, plus a null bitmap if needed
+# Non-string cells (lists, dicts) are stored as JSON text and flagged "json".
+MAGIC = b"ISROCOL1"
+NULL_CODE = 0xFFFFFFFF
+
+# Always dictionary-encoded; other columns are when at most half their values are distinct
+DICT_COLUMNS = ("launch_vehicle", "orbit", "application")
+# Row orders precomputed by ascending value, empty values last
+SORT_COLUMNS = ("date", "launch_date")
+
+
+def _u32(values) -> bytes:
+    a = array("I", values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+
+class _Body:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def add(self, data: bytes) -> List[int]:
+        self.buf.extend(b"\0" * (-len(self.buf) % 8))
+        off = len(self.buf)
+        self.buf.extend(data)
+        return [off, len(data)]
+
+    def add_strings(self, values: Sequence[Optional[str]]) -> Dict[str, List[int]]:
+        encoded = [v.encode("utf-8") if v is not None else b"" for v in values]
+        offsets = [0]
+        for e in encoded:
+            offsets.append(offsets[-1] + len(e))
+        block = {"offsets": self.add(_u32(offsets)), "data": self.add(b"".join(encoded))}
+        if any(v is None for v in values):
+            bits = bytearray((len(values) + 7) // 8)
+            for i, v in enumerate(values):
+                if v is None:
+                    bits[i >> 3] |= 1 << (i & 7)
+            block["nulls"] = self.add(bytes(bits))
+        return block
+
+
+def encode_snapshot(
+    columns: Dict[str, List[Optional[str]]],
+    n_rows: int,
+    *,
+    json_columns: Set[str] = frozenset(),
+    dict_columns: Sequence[str] = DICT_COLUMNS,
+    sort_columns: Sequence[str] = SORT_COLUMNS,
+) -> bytes:
+    body = _Body()
+    metas: List[Dict] = []
+    for name, values in columns.items():
+        meta: Dict = {"name": name, "json": name in json_columns}
+        distinct = {v for v in values if v is not None}
+        if name in dict_columns or (n_rows and len(distinct) <= n_rows // 2):
+            dictionary = sorted(distinct)
+            index = {v: i for i, v in enumerate(dictionary)}
+            meta["encoding"] = "dict"
+            meta["codes"] = body.add(_u32(NULL_CODE if v is None else index[v] for v in values))
+            meta["dictionary"] = body.add_strings(dictionary)
+        else:
+            meta["encoding"] = "plain"
+            meta.update(body.add_strings(values))
+        metas.append(meta)
+
+    sorts: Dict[str, List[int]] = {}
+    for name in sort_columns:
+        values = columns.get(name)
+        if values is None:
+            continue
+        order = sorted(range(n_rows), key=lambda i: (not values[i], values[i] or ""))
+        sorts[name] = body.add(_u32(order))
+
+    header = json.dumps({"version": 1, "rows": n_rows, "columns": metas, "sort": sorts}).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % 8)
+    return MAGIC + struct.pack("<II", len(header), 0) + header + bytes(body.buf)
+
+
+class ColumnarSink(RowSink):
+    # Buffers cells column by column and writes the .isrocol file on close();
+    # repeated strings are buffered once
+    def __init__(self, path: str, **options):
+        super().__init__(path, binary=True)
+        self.options = options
+        self._columns: Dict[str, List] = {}
+        self._json_columns: Set[str] = set()
+        self._values: Dict[str, str] = {}
+
+    def _write(self, row: Dict):
+        for key in row:
+            if key not in self._columns:
+                self._columns[key] = [None] * self.count
+        for key, values in self._columns.items():
+            v = row.get(key)
+            if isinstance(v, str):
+                v = self._values.setdefault(v, v)
+            elif v is not None:
+                self._json_columns.add(key)
+            values.append(v)
+
+    def _finish(self):
+        # A column holding any non-string cell is stored as JSON text throughout
+        for key in self._json_columns:
+            self._columns[key] = [None if v is None else json.dumps(v, ensure_ascii=False) for v in self._columns[key]]
+        self._f.write(encode_snapshot(self._columns, self.count, json_columns=self._json_columns, **self.options))
+
+
+def have_arrow() -> bool:
+    # pyarrow is only imported once an Arrow file is actually written
+    return optional_module("pyarrow") is not None
+
+
+class ArrowSink(RowSink):
+    # Arrow IPC file with dictionary-encoded string columns; needs pyarrow
+    def __init__(self, path: str, dict_columns: Sequence[str] = DICT_COLUMNS):
+        if not have_arrow():
+            raise RuntimeError("pyarrow is not installed")
+        super().__init__(path, binary=True)
+        self.dict_columns = dict_columns
+        self._rows = RowTable()
+
+    def _write(self, row: Dict):
+        self._rows.append({k: v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False) for k, v in row.items()})
+
+    def _finish(self):
+        pa, pa_ipc = optional_module("pyarrow"), optional_module("pyarrow.ipc")
+        arrays = {}
+        for key in self._rows.keys():
+            arr = pa.array(list(self._rows.column(key)), type=pa.string())
+            arrays[key] = arr.dictionary_encode() if key in self.dict_columns else arr
+        table = pa.table(arrays) if arrays else pa.table({})
+        with pa_ipc.new_file(self._f, table.schema) as writer:
+            writer.write_table(table)
+
+
+class Column:
+    def __init__(self, snapshot: "Snapshot", meta: Dict):
+        self.name = meta["name"]
+        self.encoding = meta["encoding"]
+        self.is_json = bool(meta.get("json"))
+        self._n = snapshot.rows
+        if self.encoding == "dict":
+            self._codes = snapshot._u32(meta["codes"])
+            dictionary = _StringBlock(snapshot, meta["dictionary"])
+            self.dictionary = [dictionary[i] for i in range(len(dictionary))]
+        else:
+            self._strings = _StringBlock(snapshot, meta)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def raw(self, i: int) -> Optional[str]:
+        if self.encoding == "dict":
+            code = self._codes[i]
+            return None if code == NULL_CODE else self.dictionary[code]
+        return self._strings[i]
+
+    def __getitem__(self, i: int):
+        v = self.raw(i)
+        return json.loads(v) if self.is_json and v is not None else v
+
+    def __iter__(self) -> Iterator:
+        return (self[i] for i in range(self._n))
+
+
+class _StringBlock:
+    def __init__(self, snapshot: "Snapshot", meta: Dict):
+        self._offsets = snapshot._u32(meta["offsets"])
+        self._data = snapshot._view(meta["data"])
+        self._nulls = snapshot._view(meta["nulls"]) if "nulls" in meta else None
+        self._n = len(self._offsets) - 1
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self._nulls is not None and self._nulls[i >> 3] & (1 << (i & 7)):
+            return None
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+
+class Snapshot:
+    # Read-only view over a .isrocol file; columns decode cells on access
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a columnar snapshot")
+        header_len, _ = struct.unpack_from("<II", self._mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._mm[start : start + header_len])
+        self._body = memoryview(self._mm)[start + header_len :]
+        self.rows: int = header["rows"]
+        self._metas = {m["name"]: m for m in header["columns"]}
+        self._sorts: Dict[str, List[int]] = header.get("sort", {})
+        self._cache: Dict[str, Column] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._metas)
+
+    def _view(self, ref: List[int]) -> memoryview:
+        off, length = ref
+        return self._body[off : off + length]
+
+    def _u32(self, ref: List[int]) -> memoryview:
+        return self._view(ref).cast("I")
+
+    def column(self, name: str) -> Column:
+        col = self._cache.get(name)
+        if col is None:
+            col = self._cache[name] = Column(self, self._metas[name])
+        return col
+
+    def sort_order(self, name: str) -> Optional[memoryview]:
+        ref = self._sorts.get(name)
+        return self._u32(ref) if ref else None
+
+    def iter_rows(self, columns: Optional[Sequence[str]] = None, order: Optional[str] = None) -> Iterator[Dict]:
+        cols = [self.column(c) for c in (columns or self.columns) if c in self._metas]
+        idx = self.sort_order(order) if order else None
+        for i in idx if idx is not None else range(self.rows):
+            row = {}
+            for col in cols:
+                v = col[i]
+                if v is not None:
+                    row[col.name] = v
+            yield row
+
+    def close(self):
+        self._body = None
+        self._cache.clear()
+        try:
+            self._mm.close()
+        except BufferError:
+            # A caller still holds a column view; the map goes when that does
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
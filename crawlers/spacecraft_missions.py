@@ -1,29 +1,31 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import Dict, Iterator
 
 from bs4 import BeautifulSoup
 
 try:
     from .utils import (
-        get_soup,
-        best_table_by_headers,
-        table_to_dicts,
-        extract_pagination_links,
-        save_json,
-        save_csv,
-        parse_date,
+        async_paginated_table,
+        iter_paginated_table,
+        RowTable,
+        JsonSink,
+        CsvSink,
+        stream_rows,
     )
+    from .metrics import timed
+    from .normalize import TableSpec, normalize_stream, normalize_table
 except Exception:
     from utils import (
-        get_soup,
-        best_table_by_headers,
-        table_to_dicts,
-        extract_pagination_links,
-        save_json,
-        save_csv,
-        parse_date,
+        async_paginated_table,
+        iter_paginated_table,
+        RowTable,
+        JsonSink,
+        CsvSink,
+        stream_rows,
     )
+    from metrics import timed
+    from normalize import TableSpec, normalize_stream, normalize_table
 
 BASE = "https://www.isro.gov.in/SpacecraftMissions.html"
 EXPECTED_HEADERS = [
@@ -37,48 +39,29 @@ EXPECTED_HEADERS = [
 ]
 
 
-def normalize_rows(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    out: List[Dict[str, str]] = []
-    for r in rows:
-        row = dict(r)
-        if "date" in row:
-            row["date"] = parse_date(row.get("date", ""))
-        lvm = row.get("launch_vehicle_mission") or row.get("launch_vehicle") or ""
-        if lvm and "/" in lvm:
-            parts = [p.strip() for p in lvm.split("/", 1)]
-            row.setdefault("launch_vehicle", parts[0])
-            row.setdefault("mission", parts[1])
-        out.append(row)
-    return out
-
-
-def scrape_spacecraft() -> List[Dict[str, str]]:
-    first = get_soup(BASE)
-    table = best_table_by_headers(first, EXPECTED_HEADERS)
-    if table is None:
-        return []
-    rows = table_to_dicts(table)
-
-    pages = extract_pagination_links(first, "SpacecraftMissions")
-    urls = [BASE] + [u for u in pages if u != BASE]
-
-    all_rows: List[Dict[str, str]] = []
-    for i, url in enumerate(urls):
-        if i > 0:
-            soup = get_soup(url)
-            t = best_table_by_headers(soup, EXPECTED_HEADERS)
-            if not t:
-                continue
-            page_rows = table_to_dicts(t)
-        else:
-            page_rows = rows
-        all_rows.extend(page_rows)
-
-    return normalize_rows(all_rows)
+TABLE = TableSpec(date_column="date", date_context="spacecraft.date")
+
+
+def normalize_rows(rows: RowTable) -> RowTable:
+    # In place, column by column; see normalize.normalize_table
+    return normalize_table(rows, TABLE)
+
+
+def iter_spacecraft(max_workers: int = 4) -> Iterator[Dict[str, str]]:
+    rows = iter_paginated_table(BASE, "SpacecraftMissions", EXPECTED_HEADERS, max_workers=max_workers)
+    yield from normalize_stream(rows, TABLE, stage="normalize:spacecraft")
+
+
+def scrape_spacecraft(max_workers: int = 4) -> RowTable:
+    return RowTable(iter_spacecraft(max_workers=max_workers))
+
+
+async def async_scrape_spacecraft() -> RowTable:
+    rows = await async_paginated_table(BASE, "SpacecraftMissions", EXPECTED_HEADERS)
+    with timed("normalize:spacecraft"):
+        return normalize_rows(rows)
 
 
 if __name__ == "__main__":
-    data = scrape_spacecraft()
-    save_json("data/spacecraft_missions.json", data)
-    save_csv("data/spacecraft_missions.csv", data)
-    print(f"Saved {len(data)} spacecraft mission rows")
+    n = stream_rows(iter_spacecraft(), [JsonSink("data/spacecraft_missions.json"), CsvSink("data/spacecraft_missions.csv")])
+    print(f"Saved {n} spacecraft mission rows")
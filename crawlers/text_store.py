@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import List, Optional, Tuple
+
+
+# Raw page text kept out of the row outputs. Each distinct text is one gzip
+# blob named by its sha256, so rows carry only the hash, a page that did not
+# change between crawls is stored once, and two pages with the same text
+# share a blob. The directory is the whole index: a blob's mtime is its last
+# use, and the least recently used blobs go once the store outgrows max_bytes.
+# utils/textStore.js reads the same layout for the API.
+TEXT_DIR = os.path.join("data", "texts")
+BLOB_SUFFIX = ".txt.gz"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TextStore:
+    def __init__(self, root: str = TEXT_DIR, *, max_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.root, key + BLOB_SUFFIX)
+
+    def put(self, text: str) -> str:
+        # The text's hash, once it is on disk
+        key = text_hash(text)
+        path = self._blob_path(key)
+        try:
+            # Already stored: mark it used so eviction keeps it
+            os.utime(path)
+            return key
+        except OSError:
+            pass
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # No file name and mtime=0 in the gzip header keep the blob a function of the text alone
+        with open(tmp, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=9, mtime=0) as f:
+            f.write(text.encode("utf-8"))
+        os.replace(tmp, path)
+        with self._lock:
+            self._evict(keep=key)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with gzip.open(self._blob_path(key), "rb") as f:
+                return f.read().decode("utf-8")
+        except (OSError, ValueError):
+            return None
+
+    def _blobs(self) -> List[Tuple[float, int, str]]:
+        # (mtime, size, key) of every blob
+        out = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(BLOB_SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, name[: -len(BLOB_SUFFIX)]))
+        return out
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._blobs())
+
+    def _evict(self, keep: Optional[str] = None):
+        blobs = self._blobs()
+        total = sum(size for _, size, _ in blobs)
+        for _, size, key in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._blob_path(key))
+            except OSError:
+                continue
+            total -= size
+
+
+_store: Optional[TextStore] = None
+_store_lock = threading.Lock()
+
+
+def configure_text_store(root: str = TEXT_DIR, *, max_bytes: int = 64 * 1024 * 1024) -> TextStore:
+    global _store
+    _store = TextStore(root, max_bytes=max_bytes)
+    return _store
+
+
+def get_text_store() -> TextStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TextStore()
+    return _store
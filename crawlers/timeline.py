@@ -1,24 +1,22 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
 try:
-    from .utils import get_soup, save_json, save_csv, norm_space
+    from .utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 except Exception:
-    from utils import get_soup, save_json, save_csv, norm_space
+    from utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 
 BASE = "https://www.isro.gov.in/Timeline.html"
+CSV_FIELDS = ["title", "url"]
 
 
-def scrape_timeline(limit_years: int | None = None) -> List[Dict[str, str]]:
-    soup = get_soup(BASE)
+def parse_timeline(page: Page) -> List[Dict[str, str]]:
     rows: List[Dict[str, str]] = []
 
-    for a in soup.find_all("a"):
-        href = a.get("href") or ""
+    for title, href in page.links():
         if "timeline=timeline" not in href:
             continue
-        title = norm_space(a.get_text(" "))
         rows.append({
             "title": title,
             "url": href if href.startswith("http") else f"https://www.isro.gov.in/{href.lstrip('/')}",
@@ -36,8 +34,18 @@ def scrape_timeline(limit_years: int | None = None) -> List[Dict[str, str]]:
     return uniq
 
 
+def iter_timeline(limit_years: int | None = None) -> Iterator[Dict[str, str]]:
+    yield from extract_page(BASE, parse_timeline, name="timeline")
+
+
+def scrape_timeline(limit_years: int | None = None) -> List[Dict[str, str]]:
+    return list(iter_timeline(limit_years))
+
+
+async def async_scrape_timeline(limit_years: int | None = None) -> List[Dict[str, str]]:
+    return await async_extract_page(BASE, parse_timeline, name="timeline")
+
+
 if __name__ == "__main__":
-    data = scrape_timeline()
-    save_json("data/timeline_links.json", data)
-    save_csv("data/timeline_links.csv", data)
-    print(f"Saved {len(data)} timeline items")
+    n = stream_rows(iter_timeline(), [JsonSink("data/timeline_links.json"), CsvSink("data/timeline_links.csv", CSV_FIELDS)])
+    print(f"Saved {n} timeline items")
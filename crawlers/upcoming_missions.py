@@ -1,22 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
 try:
-    from .utils import get_soup, save_json, save_csv, norm_space
+    from .utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 except Exception:
-    from utils import get_soup, save_json, save_csv, norm_space
+    from utils import Page, async_extract_page, extract_page, JsonSink, CsvSink, stream_rows
 
 BASE = "https://www.isro.gov.in/FutureMissions.html"
+CSV_FIELDS = ["title", "url"]
 
 
-def scrape_upcoming() -> List[Dict[str, str]]:
-    soup = get_soup(BASE)
+def parse_upcoming(page: Page) -> List[Dict[str, str]]:
     rows: List[Dict[str, str]] = []
 
-    for a in soup.find_all("a"):
-        href = a.get("href") or ""
-        text = norm_space(a.get_text(" "))
+    for text, href in page.links():
         if not text:
             continue
         if any(key in href for key in ("Gaganyaan", "NISAR", "Mission", "mission")):
@@ -35,8 +33,18 @@ def scrape_upcoming() -> List[Dict[str, str]]:
     return uniq
 
 
+def iter_upcoming() -> Iterator[Dict[str, str]]:
+    yield from extract_page(BASE, parse_upcoming, name="upcoming")
+
+
+def scrape_upcoming() -> List[Dict[str, str]]:
+    return list(iter_upcoming())
+
+
+async def async_scrape_upcoming() -> List[Dict[str, str]]:
+    return await async_extract_page(BASE, parse_upcoming, name="upcoming")
+
+
 if __name__ == "__main__":
-    data = scrape_upcoming()
-    save_json("data/upcoming_missions.json", data)
-    save_csv("data/upcoming_missions.csv", data)
-    print(f"Saved {len(data)} upcoming mission items")
+    n = stream_rows(iter_upcoming(), [JsonSink("data/upcoming_missions.json"), CsvSink("data/upcoming_missions.csv", CSV_FIELDS)])
+    print(f"Saved {n} upcoming mission items")
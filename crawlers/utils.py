@@ -1,20 +1,51 @@
 from __future__ import annotations
 
+import csv
 import json
 import os
+import random
 import re
+import tempfile
+import threading
 import time
+from array import array
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Iterable, List, Dict, Optional
+from functools import lru_cache, partial
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple, TypeVar, Union
+from urllib.parse import urlsplit
 
+import lxml.html
 import requests
 from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EncodingDetector
+from lxml import etree
+from requests.adapters import HTTPAdapter
 
 try:
-    from dateutil import parser as dateparser
+    from .http_cache import CacheMiss, ResponseCache
+    from .incremental import PageMemo, memo_key, parse_memoized, parse_memoized_async
+    from . import metrics
+    from .lazy import LazyModule, optional_module
 except Exception:
-    dateparser = None
+    from http_cache import CacheMiss, ResponseCache
+    from incremental import PageMemo, memo_key, parse_memoized, parse_memoized_async
+    import metrics
+    from lazy import LazyModule, optional_module
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    import httpx
+
+# Only the async engine needs asyncio; a threaded crawl never imports it.
+# dateutil and httpx are optional and imported on first use through
+# optional_module(), which gives None when they are not installed.
+asyncio = LazyModule("asyncio")
 
 
 DEFAULT_HEADERS = {
@@ -33,19 +64,401 @@ class FetchResult:
     url: str
     status_code: int
     content: bytes
+    not_modified: bool = False
+    from_cache: bool = False
+    stale: bool = False  # cached copy served because the host's circuit is open
+    attempts: int = 0  # requests sent; 0 for a cache hit
+
+
+class HostUnavailable(RuntimeError):
+    pass
+
+
+# Statuses worth another attempt; 429 and 503 also slow the host down
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+THROTTLE_STATUSES = frozenset((429, 503))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostState:
+    def __init__(self, per_host: int, interval: float):
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(per_host)
+        self.interval = interval
+        self.tokens = float(per_host)
+        self.refilled = time.monotonic()
+        self.paused_until = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.async_slots: Optional[asyncio.Semaphore] = None
+
+
+class HostBudget:
+    # Per-host pacing. At most `per_host` requests are in flight per host, and
+    # requests are drawn from a token bucket (burst `per_host`) refilled every
+    # `delay` seconds to start with. Quick responses shrink that interval
+    # towards `min_delay`; slow ones, 429 and 503 stretch it towards
+    # `max_delay`, and a Retry-After pauses the host outright (for at most
+    # `max_pause` seconds). After `failure_threshold` failures in a row the
+    # host's circuit opens and requests fail fast with HostUnavailable for
+    # `cooldown` seconds; the first request after that is a trial whose
+    # failure reopens it.
+    def __init__(
+        self,
+        per_host: int = 4,
+        delay: float = 0.6,
+        *,
+        min_delay: Optional[float] = None,
+        max_delay: float = 30.0,
+        slow_after: float = 2.0,
+        failure_threshold: int = 5,
+        cooldown: float = 60.0,
+        max_pause: float = 300.0,
+    ):
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self.min_delay = self.delay / 4 if min_delay is None else min(min_delay, self.delay)
+        self.max_delay = max(max_delay, self.delay)
+        self.slow_after = slow_after
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, url: str) -> _HostState:
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(self.per_host, self.delay)
+            return state
+
+    def interval(self, url: str) -> float:
+        return self._host(url).interval
+
+    def check(self, url: str):
+        state = self._host(url)
+        wait = state.open_until - time.monotonic()
+        if wait > 0:
+            raise HostUnavailable(f"{urlsplit(url).netloc} is failing; retrying it in {wait:.0f}s")
+
+    def _reserve(self, state: _HostState) -> float:
+        # Takes a token and returns how long the caller must wait before sending
+        with state.lock:
+            now = time.monotonic()
+            wait = max(0.0, state.paused_until - now)
+            if state.interval > 0:
+                state.tokens = min(float(self.per_host), state.tokens + (now - state.refilled) / state.interval)
+                state.refilled = now
+                # Take the token now; the debt is waited out by the caller
+                state.tokens -= 1
+                if state.tokens < 0:
+                    wait = max(wait, -state.tokens * state.interval)
+        return wait
+
+    def _wait_for_token(self, state: _HostState):
+        # Sleeps off any debt outside the lock
+        wait = self._reserve(state)
+        if wait > 0:
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        state = self._host(url)
+        state.slots.acquire()
+        try:
+            self._wait_for_token(state)
+            yield
+        finally:
+            state.slots.release()
+
+    def _async_slots(self, state: _HostState) -> asyncio.Semaphore:
+        # asyncio semaphores belong to one event loop, so each new loop gets its own
+        loop = asyncio.get_running_loop()
+        with state.lock:
+            if state.async_loop is not loop:
+                state.async_loop = loop
+                state.async_slots = asyncio.Semaphore(self.per_host)
+            return state.async_slots
+
+    @asynccontextmanager
+    async def aslot(self, url: str) -> AsyncIterator[None]:
+        # slot() for coroutines: the same tokens, pauses and intervals, awaited
+        # instead of slept on
+        state = self._host(url)
+        async with self._async_slots(state):
+            wait = self._reserve(state)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+
+    def record_response(self, url: str, status: int, elapsed: float, retry_after: Optional[float] = None):
+        state = self._host(url)
+        with state.lock:
+            if status in THROTTLE_STATUSES:
+                state.interval = min(self.max_delay, max(state.interval, self.min_delay, 0.05) * 2)
+                if retry_after:
+                    state.paused_until = max(state.paused_until, time.monotonic() + min(retry_after, self.max_pause))
+            elif elapsed > self.slow_after:
+                state.interval = min(self.max_delay, state.interval * 1.5)
+            else:
+                state.interval = max(self.min_delay, state.interval * 0.9)
+        if status >= 500:
+            self.record_failure(url)
+        else:
+            with state.lock:
+                state.failures = 0
+                state.open_until = 0.0
+
+    def record_failure(self, url: str):
+        state = self._host(url)
+        with state.lock:
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                state.open_until = time.monotonic() + self.cooldown
+
+
+_budget = HostBudget()
+
+
+def set_host_budget(per_host: Optional[int] = None, delay: Optional[float] = None, **options) -> HostBudget:
+    # Unset arguments keep their current values; **options are HostBudget's keywords
+    global _budget
+    old = _budget
+    current = {
+        "min_delay": None if delay is not None else old.min_delay,
+        "max_delay": old.max_delay,
+        "slow_after": old.slow_after,
+        "failure_threshold": old.failure_threshold,
+        "cooldown": old.cooldown,
+        "max_pause": old.max_pause,
+    }
+    current.update(options)
+    _budget = HostBudget(
+        per_host=old.per_host if per_host is None else per_host,
+        delay=old.delay if delay is None else delay,
+        **current,
+    )
+    return _budget
+
+
+def _backoff_delay(backoff: float, attempt: int) -> float:
+    # Exponential with "equal jitter": half the step is fixed, half random
+    step = backoff ** attempt
+    return step / 2 + random.uniform(0, step / 2)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_pool_size = 10
+
+# Built on first fetch unless configure_cache() has set (or disabled) it
+_cache: Optional[ResponseCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def default_cache_dir() -> str:
+    return os.environ.get("ISRO_HTTP_CACHE", os.path.join("data", ".http_cache"))
+
+
+def default_offline() -> bool:
+    return os.environ.get("ISRO_OFFLINE", "") not in ("", "0")
+
+
+def configure_session(pool_size: int = 10) -> requests.Session:
+    global _session, _pool_size
+    with _session_lock:
+        _pool_size = max(1, pool_size)
+        old = _session
+        _session = _new_session(_pool_size)
+    if old is not None:
+        old.close()
+    return _session
+
+
+def _new_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _new_session(_pool_size)
+    return _session
+
+
+def configure_cache(
+    root: Optional[str],
+    *,
+    ttl: float = 900.0,
+    ttl_rules: Optional[Dict[str, float]] = None,
+    max_bytes: int = 256 * 1024 * 1024,
+    offline: bool = False,
+) -> Optional[ResponseCache]:
+    # root None turns the cache off
+    global _cache, _cache_configured
+    with _cache_lock:
+        if _cache is not None:
+            _cache.flush()
+        _cache = ResponseCache(root, ttl=ttl, ttl_rules=ttl_rules, max_bytes=max_bytes, offline=offline) if root else None
+        _cache_configured = True
+    return _cache
+
+
+def flush_cache():
+    # Writes the cache index if anything changed since the last flush
+    if _cache is not None:
+        _cache.flush()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    # The configured cache, or the default one under default_cache_dir()
+    global _cache, _cache_configured
+    if not _cache_configured:
+        with _cache_lock:
+            if not _cache_configured:
+                _cache = ResponseCache(default_cache_dir(), offline=default_offline())
+                _cache_configured = True
+    return _cache
 
 
 def fetch(url: str, *, timeout: int = 20, max_retries: int = 3, backoff: float = 1.5) -> FetchResult:
- 
+    start = time.perf_counter()
+    try:
+        res = _fetch(url, timeout=timeout, max_retries=max_retries, backoff=backoff)
+    except Exception:
+        _record_fetch(url, start, None)
+        raise
+    _record_fetch(url, start, res)
+    return res
+
+
+def _record_fetch(url: str, start: float, res: Optional[FetchResult]):
+    if res is None:
+        metrics.record_request(url, None, time.perf_counter() - start, 0, 0, "error")
+        return
+    if res.stale:
+        cache_state = "stale"
+    elif res.from_cache:
+        cache_state = "hit"
+    elif res.not_modified:
+        cache_state = "revalidated"
+    else:
+        cache_state = "miss"
+    metrics.record_request(url, res.status_code, time.perf_counter() - start, len(res.content), res.attempts, cache_state)
+
+
+# The steps of a fetch shared by _fetch() and _async_fetch(); only sending the
+# request and waiting differ between the two.
+
+def _cached_result(cache: Optional[ResponseCache], url: str) -> Optional[FetchResult]:
+    if cache:
+        hit = cache.get(url)
+        if hit and (hit.fresh or cache.offline):
+            return FetchResult(url=url, status_code=200, content=hit.content, from_cache=True)
+        if cache.offline:
+            raise CacheMiss(f"{url} is not cached and the crawler is offline")
+    return None
+
+
+def _circuit_result(budget: HostBudget, cache: Optional[ResponseCache], url: str, attempt: int) -> Optional[FetchResult]:
+    # None while the host's circuit is closed; otherwise a stale copy, or HostUnavailable
+    try:
+        budget.check(url)
+    except HostUnavailable:
+        hit = cache.get(url) if cache else None
+        if hit is not None:
+            return FetchResult(url=url, status_code=200, content=hit.content, from_cache=True, stale=True, attempts=attempt - 1)
+        raise
+    return None
+
+
+def _settle(
+    budget: HostBudget,
+    cache: Optional[ResponseCache],
+    url: str,
+    status: int,
+    content: bytes,
+    headers,
+    elapsed: float,
+    attempt: int,
+    max_retries: int,
+    backoff: float,
+) -> Tuple[Optional[FetchResult], float]:
+    # (result, 0) when the fetch is done, or (None, seconds to wait) to retry
+    retry_after = retry_after_seconds(headers.get("Retry-After"))
+    budget.record_response(url, status, elapsed, retry_after)
+    if status in RETRY_STATUSES and attempt < max_retries:
+        # A Retry-After pause is already waited out inside the next slot
+        return None, 0.0 if retry_after else _backoff_delay(backoff, attempt)
+    if status == 304 and cache:
+        hit = cache.get(url)
+        if hit is not None:
+            cache.touch(url)
+            return FetchResult(url=url, status_code=200, content=hit.content, not_modified=True, attempts=attempt), 0.0
+    if status == 200 and cache:
+        cache.put(url, content, headers.get("ETag"), headers.get("Last-Modified"))
+    return FetchResult(url=url, status_code=status, content=content, attempts=attempt), 0.0
+
+
+def _fetch(url: str, *, timeout: int, max_retries: int, backoff: float) -> FetchResult:
+    # Errors, 429 and 5xx are retried with jittered backoff; the last 429/5xx
+    # response is returned as is. While the host's circuit is open a cached
+    # copy of any age is served instead of failing.
+    cache = get_cache()
+    hit = _cached_result(cache, url)
+    if hit is not None:
+        return hit
+
+    budget = _budget
     last_exc: Optional[Exception] = None
     for attempt in range(1, max_retries + 1):
+        stale = _circuit_result(budget, cache, url, attempt)
+        if stale is not None:
+            return stale
         try:
-            resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
-            time.sleep(0.6)
-            return FetchResult(url=url, status_code=resp.status_code, content=resp.content)
-        except Exception as exc:  
+            headers = cache.conditional_headers(url) if cache else {}
+            with budget.slot(url):
+                start = time.monotonic()
+                resp = get_session().get(url, headers=headers, timeout=timeout)
+        except Exception as exc:
+            budget.record_failure(url)
             last_exc = exc
-            time.sleep(backoff ** attempt)
+            if attempt < max_retries:
+                time.sleep(_backoff_delay(backoff, attempt))
+            continue
+
+        res, wait = _settle(budget, cache, url, resp.status_code, resp.content, resp.headers,
+                            time.monotonic() - start, attempt, max_retries, backoff)
+        if res is not None:
+            return res
+        if wait > 0:
+            time.sleep(wait)
     if last_exc:
         raise last_exc
     raise RuntimeError(f"Failed to fetch {url}")
@@ -55,41 +468,186 @@ def get_soup(url: str) -> BeautifulSoup:
     res = fetch(url)
     if res.status_code >= 400:
         raise RuntimeError(f"HTTP {res.status_code} fetching {url}")
-    return BeautifulSoup(res.content, "lxml")
+    with metrics.timed("parse:get_soup"):
+        return BeautifulSoup(res.content, "lxml")
+
+
+T = TypeVar("T")
+
+_page_memo: Optional[PageMemo] = None
+
+
+def set_page_memo(path: Optional[str]) -> Optional[PageMemo]:
+    global _page_memo
+    if _page_memo is not None:
+        _page_memo.flush()
+    _page_memo = PageMemo(path) if path else None
+    return _page_memo
+
+
+def flush_page_memo():
+    if _page_memo is not None:
+        _page_memo.flush()
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def configure_parse_pool(workers: int = 0) -> Optional[ProcessPoolExecutor]:
+    # workers > 0 moves parsing into that many processes; 0 parses on the fetching thread
+    global _parse_pool
+    old = _parse_pool
+    if workers > 0:
+        # Pulls in multiprocessing, which in-thread parsing never needs
+        from concurrent.futures import ProcessPoolExecutor
+    _parse_pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    if old is not None:
+        old.shutdown()
+    return _parse_pool
+
+
+def _parse_bytes(parse: Callable[[BeautifulSoup], T], content: bytes) -> T:
+    return parse(BeautifulSoup(content, "lxml"))
+
+
+def _extract_bytes(extract: Callable[["Page"], T], backend: str, content: bytes) -> T:
+    return extract(Page(content, PARSER_BACKENDS[backend]))
+
+
+def _parse_fetched(url: str, run: Callable[[bytes], T], *, name: str, parser: Callable) -> T:
+    # `parser`: the caller's parse/extract callback, which keys the page memo
+    res = fetch(url)
+    if res.status_code >= 400:
+        raise RuntimeError(f"HTTP {res.status_code} fetching {url}")
+    pool = _parse_pool
+
+    def parse(content: bytes) -> T:
+        # Only reached when the page memo has no result for this content
+        metrics.inc("pages_parsed", source=name)
+        if pool is not None:
+            # The fetching thread waits here while other threads keep the network busy
+            return pool.submit(run, content).result()
+        return run(content)
+
+    metrics.inc("pages", source=name)
+    with metrics.timed(f"parse:{name}"):
+        return parse_memoized(_page_memo, memo_key(name, parser, url), res.content, parse)
+
+
+def parse_page(url: str, parse: Callable[[BeautifulSoup], T], *, name: str) -> T:
+    # Like parse(get_soup(url)), but with a page memo set an unchanged page is
+    # not parsed again. `parse` must return plain JSON data, and must be a
+    # module-level function (or a partial of one) so a parse pool can pickle it.
+    return _parse_fetched(url, partial(_parse_bytes, parse), name=name, parser=parse)
+
+
+def extract_page(url: str, extract: Callable[["Page"], T], *, name: str) -> T:
+    # parse_page for callbacks that only need links, tables or text: they get a
+    # Page built by the configured parser backend instead of a soup.
+    return _parse_fetched(url, partial(_extract_bytes, extract, _parser_backend), name=name, parser=extract)
+
+
+_SPACE_RE = re.compile(r"\s+")
+_NON_KEY_RE = re.compile(r"[^a-z0-9_]+")
+
+# Header phrase -> column key fragment, shared with the Node API through column_aliases.json
+COLUMN_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "column_aliases.json")
+
+
+def _load_phrase_aliases() -> Dict[str, str]:
+    try:
+        with open(COLUMN_ALIASES_PATH, "r", encoding="utf-8") as f:
+            return dict(json.load(f).get("phrases", {}))
+    except (OSError, ValueError):
+        return {}
+
+
+_phrase_aliases: Dict[str, str] = {}
+_alias_re: Optional[re.Pattern] = None
+
+
+def register_key_aliases(aliases: Dict[str, str]):
+    # Longest phrase first, so "launch vehicle/mission" wins over "launch vehicle"
+    global _alias_re
+    _phrase_aliases.update({k.lower(): v for k, v in aliases.items()})
+    phrases = sorted(_phrase_aliases, key=len, reverse=True)
+    _alias_re = re.compile("|".join(re.escape(p) for p in phrases)) if phrases else None
+    norm_key.cache_clear()
 
 
 def norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    return _SPACE_RE.sub(" ", s).strip()
 
 
+@lru_cache(maxsize=4096)
 def norm_key(s: str) -> str:
     s = norm_space(s).lower()
-    s = s.replace("s.no", "serial").replace("s. no", "serial").replace("sl.no", "serial").replace("sl. no", "serial")
-    s = s.replace("launch vehicle/mission", "launch_vehicle_mission")
-    s = s.replace("launch vehicle", "launch_vehicle")
-    s = s.replace("mission", "mission")
-    s = s.replace("date of launch", "date").replace("date of lauch", "date")
-    s = s.replace("date of mission", "date").replace("date of launch", "date")
-    s = s.replace("orbit type", "orbit").replace("orbit", "orbit")
-    s = s.replace("application", "application")
-    s = s.replace("remarks", "remarks")
-    s = s.replace("payload", "payload")
-    s = s.replace("payloads", "payloads")
-    s = s.replace("name of satellite", "name").replace("satellite", "name").replace("spacecraft", "name")
-    s = re.sub(r"[^a-z0-9_]+", "_", s).strip("_")
+    if _alias_re is not None:
+        s = _alias_re.sub(lambda m: _phrase_aliases[m.group(0)], s)
+    s = _NON_KEY_RE.sub("_", s).strip("_")
     return s or "col"
 
 
-def parse_date(value: str) -> str:
-    v = norm_space(value)
-    if not v:
-        return ""
-    for fmt in ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%b %Y", "%Y-%m-%d", "%Y"):
+register_key_aliases(_load_phrase_aliases())
+
+
+_MONTH_NAMES = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+_MONTHS: Dict[str, int] = {**{n: i for i, n in enumerate(_MONTH_NAMES, 1)}, **{n[:3]: i for i, n in enumerate(_MONTH_NAMES, 1)}}
+
+_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%b %Y", "%Y-%m-%d", "%Y")
+
+# Regex fast paths for the _DATE_FORMATS shapes: (name, pattern, (year, month, day) groups).
+# "%b %Y" has no "%B %Y" twin, so "January 2020" is still left to dateutil. Anything the
+# fast paths do not settle goes through strptime as before.
+_DATE_FAST_PATHS = (
+    ("mdy", re.compile(r"([a-z]+) (\d{1,2}), (\d{4})", re.I), (3, 1, 2)),
+    ("dmy", re.compile(r"(\d{1,2}) ([a-z]+) (\d{4})", re.I), (3, 2, 1)),
+    ("my", re.compile(r"([a-z]{3}) (\d{4})", re.I), (2, 1, None)),
+    ("iso", re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})"), (1, 2, 3)),
+    ("y", re.compile(r"(\d{4})"), (1, None, None)),
+)
+
+# Fast path that last succeeded per column, tried first on the next value
+_learned_date_paths: Dict[str, str] = {}
+
+
+def _fast_parse_date(v: str, column: str) -> Optional[str]:
+    learned = _learned_date_paths.get(column)
+    paths = sorted(_DATE_FAST_PATHS, key=lambda p: p[0] != learned) if learned else _DATE_FAST_PATHS
+    for name, pattern, (yg, mg, dg) in paths:
+        m = pattern.fullmatch(v)
+        if not m:
+            continue
+        month: Optional[int] = 1
+        if mg is not None:
+            raw = m.group(mg)
+            month = int(raw) if raw.isdigit() else _MONTHS.get(raw.lower())
+        if month is None:
+            continue
+        try:
+            d = datetime(int(m.group(yg)), month, int(m.group(dg)) if dg else 1)
+        except ValueError:
+            continue
+        _learned_date_paths[column] = name
+        return d.date().isoformat()
+    return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_text(v: str, column: str) -> str:
+    fast = _fast_parse_date(v, column)
+    if fast is not None:
+        return fast
+    for fmt in _DATE_FORMATS:
         try:
             dt = datetime.strptime(v, fmt)
             return dt.date().isoformat()
         except Exception:
             pass
+    dateparser = optional_module("dateutil.parser")
     if dateparser is not None:
         try:
             dt = dateparser.parse(v, dayfirst=False, yearfirst=False)
@@ -100,23 +658,44 @@ def parse_date(value: str) -> str:
     return v
 
 
-def table_to_dicts(table: Tag) -> List[Dict[str, str]]:
-    header_cells: List[Tag] = []
+def memo_stats() -> Dict[str, Tuple[int, int]]:
+    # (hits, misses) of the per-cell memo caches, for the run report
+    return {
+        "norm_key": norm_key.cache_info()[:2],
+        "parse_date": _parse_date_text.cache_info()[:2],
+    }
+
+
+def parse_date(value: str, column: str = "") -> str:
+    # `column` names where the value came from, so each column learns its own format
+    v = norm_space(value)
+    if not v:
+        return ""
+    return _parse_date_text(v, column)
+
+
+def _header_cells(table: Tag) -> Tuple[List[Tag], bool]:
+    # Header cells plus whether they came from <thead> (otherwise the first row is the header)
     thead = table.find("thead")
     if thead:
         tr = thead.find("tr")
         if tr:
-            header_cells = list(tr.find_all(["th", "td"]))
-    if not header_cells:
-        first_tr = table.find("tr")
-        if first_tr:
-            header_cells = list(first_tr.find_all(["th", "td"]))
+            cells = list(tr.find_all(["th", "td"]))
+            if cells:
+                return cells, True
+    first_tr = table.find("tr")
+    if first_tr:
+        return list(first_tr.find_all(["th", "td"])), thead is not None
+    return [], thead is not None
+
 
+def table_to_dicts(table: Tag) -> List[Dict[str, str]]:
+    header_cells, has_thead = _header_cells(table)
     headers = [norm_key(c.get_text(" ")) for c in header_cells]
     rows: List[Dict[str, str]] = []
 
     trs = table.find_all("tr")
-    start_idx = 1 if (not thead and len(trs) > 0) else 0
+    start_idx = 1 if (not has_thead and len(trs) > 0) else 0
     for tr in trs[start_idx:]:
         cells = [norm_space(td.get_text(" ")) for td in tr.find_all(["td", "th"])]
         if not cells or all(not c for c in cells):
@@ -129,58 +708,399 @@ def table_to_dicts(table: Tag) -> List[Dict[str, str]]:
     return rows
 
 
-def save_jsonl(path: str, rows: Iterable[Dict]):
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
+def kv_key(text: str) -> str:
+    # "Lift-off Mass :" -> "lift-off mass"
+    return text.strip().rstrip(":").strip().lower()
+
+
+def table_kv_pairs(doc: BeautifulSoup) -> Dict[str, str]:
+    # First two cells of every table row as key -> value; the first row
+    # with a given key wins
+    out: Dict[str, str] = {}
+    for table in doc.find_all("table"):
+        for tr in table.find_all("tr"):
+            tds = tr.find_all(["td", "th"])
+            if len(tds) >= 2:
+                key = kv_key(norm_space(tds[0].get_text(" ")))
+                val = norm_space(tds[1].get_text(" ")).strip()
+                if key and val and key not in out:
+                    out[key] = val
+    return out
+
+
+class RowTable:
+    # Rows held compactly: each row is a list of cell values plus the id of
+    # its key tuple ("shape"), so keys are stored once per distinct shape
+    # rather than once per row, and equal string cells share one object.
+    # Memory then grows with rows x cells and the number of distinct values,
+    # not with per-row dicts. Iterating yields plain dicts, built one at a
+    # time; views() yields mutable rows for in-place normalization.
+    def __init__(self, rows: Iterable[Mapping[str, object]] = ()):
+        self._shapes: List[Tuple[str, ...]] = []
+        self._positions: List[Dict[str, int]] = []  # per shape: key -> cell index
+        self._shape_ids: Dict[Tuple[str, ...], int] = {}
+        self._grown: Dict[Tuple[int, str], int] = {}  # (shape, new key) -> shape with the key added
+        self._row_shapes = array("I")
+        self._cells: List[List[object]] = []
+        self._values: Dict[str, str] = {}
+        self.extend(rows)
+
+    def _shape_id(self, keys: Tuple[str, ...]) -> int:
+        sid = self._shape_ids.get(keys)
+        if sid is None:
+            sid = self._shape_ids[keys] = len(self._shapes)
+            shape = tuple(self.intern(k) for k in keys)
+            self._shapes.append(shape)
+            self._positions.append({k: j for j, k in enumerate(shape)})
+        return sid
+
+    def intern(self, value):
+        if isinstance(value, str):
+            return self._values.setdefault(value, value)
+        return value
+
+    def append(self, row: Mapping[str, object]):
+        intern = self._values.setdefault
+        self._row_shapes.append(self._shape_id(tuple(row)))
+        self._cells.append([intern(v, v) if isinstance(v, str) else v for v in row.values()])
+
+    def extend(self, rows: Iterable[Mapping[str, object]]):
         for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self.append(row)
 
+    def __len__(self) -> int:
+        return len(self._cells)
 
-def save_json(path: str, rows: List[Dict]):
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(rows, f, ensure_ascii=False, indent=2)
+    def strings(self) -> Iterable[str]:
+        # Every distinct string cell, plus any since overwritten or dropped
+        return self._values.keys()
 
+    def rows_with(self, values: Set[object]) -> List[int]:
+        # Indices of the rows holding any of `values` in some cell
+        out = []
+        for i, cells in enumerate(self._cells):
+            try:
+                if not values.isdisjoint(cells):
+                    out.append(i)
+            except TypeError:
+                # Unhashable cells (lists)
+                if any(isinstance(v, str) and v in values for v in cells):
+                    out.append(i)
+        return out
 
-def save_csv(path: str, rows: List[Dict[str, str]]):
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    if not rows:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("")
-        return
-    import csv
+    def keys(self) -> List[str]:
+        # Every key in first-seen order
+        out: Dict[str, None] = {}
+        for shape in self._shapes:
+            out.update(dict.fromkeys(shape))
+        return list(out)
 
-    keys = sorted({k for r in rows for k in r.keys()})
-    with open(path, "w", encoding="utf-8", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+    def column(self, key: str) -> List[object]:
+        # One key's cells in row order, None where a row lacks it
+        where = [positions.get(key) for positions in self._positions]
+        if len(set(where)) == 1 and where[0] is not None:
+            # Every shape holds the key in the same place
+            j = where[0]
+            return [cells[j] for cells in self._cells]
+        return [None if where[sid] is None else cells[where[sid]] for sid, cells in zip(self._row_shapes, self._cells)]
 
+    def set_column(self, key: str, values: Iterable[object], only_missing: bool = False):
+        # One value per row; None leaves that row alone. only_missing only
+        # adds the key to rows that lack it, like setdefault.
+        # Rows only move to shapes that have the key, so `where` stays valid
+        # for the rows not yet visited
+        where = [positions.get(key) for positions in self._positions]
+        row_shapes, intern = self._row_shapes, self._values.setdefault
+        for i, (sid, cells, value) in enumerate(zip(row_shapes, self._cells, values)):
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = intern(value, value)
+            j = where[sid]
+            if j is None:
+                grown = self._grown.get((sid, key))
+                if grown is None:
+                    grown = self._grown[sid, key] = self._shape_id(self._shapes[sid] + (key,))
+                row_shapes[i] = grown
+                cells.append(value)
+            elif not only_missing:
+                cells[j] = value
 
-def extract_pagination_links(soup: BeautifulSoup, page_basename: str) -> List[str]:
-    links: List[str] = []
-    for a in soup.find_all("a"):
-        txt = norm_space(a.get_text(" "))
-        if not txt.isdigit():
-            continue
-        href = a.get("href")
-        if not href:
+    def keep(self, mask: Sequence[bool]):
+        # Drops, in place, the rows whose mask entry is false
+        if all(mask):
+            return
+        self._row_shapes = array("I", (sid for sid, k in zip(self._row_shapes, mask) if k))
+        self._cells = [cells for cells, k in zip(self._cells, mask) if k]
+
+    def row(self, i: int) -> Dict[str, object]:
+        return dict(zip(self._shapes[self._row_shapes[i]], self._cells[i]))
+
+    def __getitem__(self, i: int) -> Dict[str, object]:
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        for sid, cells in zip(self._row_shapes, self._cells):
+            yield dict(zip(self._shapes[sid], cells))
+
+    def views(self) -> Iterator["RowView"]:
+        for i in range(len(self._cells)):
+            yield RowView(self, i)
+
+    def _get(self, i: int, key: str, default=None):
+        j = self._positions[self._row_shapes[i]].get(key)
+        return default if j is None else self._cells[i][j]
+
+    def _set(self, i: int, key: str, value):
+        sid = self._row_shapes[i]
+        j = self._positions[sid].get(key)
+        if j is None:
+            # A new key goes last, as it would in a dict
+            grown = self._grown.get((sid, key))
+            if grown is None:
+                grown = self._grown[sid, key] = self._shape_id(self._shapes[sid] + (key,))
+            self._row_shapes[i] = grown
+            self._cells[i].append(self.intern(value))
+        else:
+            self._cells[i][j] = self.intern(value)
+
+    def _delete(self, i: int, key: str):
+        shape = self._shapes[self._row_shapes[i]]
+        j = self._positions[self._row_shapes[i]][key]
+        self._row_shapes[i] = self._shape_id(shape[:j] + shape[j + 1:])
+        del self._cells[i][j]
+
+
+_MISSING = object()
+
+
+class RowView(MutableMapping):
+    # One row of a RowTable, read and written in place
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: RowTable, i: int):
+        self._table = table
+        self._i = i
+
+    def _shape(self) -> Tuple[str, ...]:
+        return self._table._shapes[self._table._row_shapes[self._i]]
+
+    def __getitem__(self, key: str):
+        value = self._table._get(self._i, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        return self._table._get(self._i, key, default)
+
+    def setdefault(self, key: str, default=None):
+        value = self._table._get(self._i, key, _MISSING)
+        if value is _MISSING:
+            self._table._set(self._i, key, default)
+            return default
+        return value
+
+    def __setitem__(self, key: str, value):
+        self._table._set(self._i, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self._table._delete(self._i, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._shape())
+
+    def __len__(self) -> int:
+        return len(self._shape())
+
+    def __contains__(self, key) -> bool:
+        return key in self._table._positions[self._table._row_shapes[self._i]]
+
+
+class RowSink:
+    # Writes into a temp file next to `path` and renames it into place on
+    # close(), so readers never see a half-written output. abort() drops it.
+    def __init__(self, path: str, *, newline: Optional[str] = None, binary: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._f = open(self._tmp, "wb") if binary else open(self._tmp, "w", encoding="utf-8", newline=newline)
+        self.count = 0
+
+    def write(self, row: Dict):
+        self._write(row)
+        self.count += 1
+
+    def _write(self, row: Dict):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def close(self):
+        self._finish()
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        self._f.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "RowSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class JsonlSink(RowSink):
+    def _write(self, row: Dict):
+        self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class JsonSink(RowSink):
+    # Byte-for-byte what json.dump(rows, indent=2) writes, one row at a time
+    def _write(self, row: Dict):
+        body = json.dumps(row, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._f.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+
+    def _finish(self):
+        self._f.write("\n]" if self.count else "[]")
+
+
+class CsvSink(RowSink):
+    # With a declared schema rows go straight to the CSV (keys outside it are
+    # dropped). Without one, rows are spooled as JSON lines and the header is
+    # the sorted union of their keys, as save_csv always did.
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None):
+        super().__init__(path, newline="")
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._keys: Set[str] = set()
+        if self.fieldnames:
+            self._writer = csv.DictWriter(self._f, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        else:
+            self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def _write(self, row: Dict):
+        if self.fieldnames:
+            self._writer.writerow(row)
+        else:
+            self._keys.update(row.keys())
+            self._spool.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def _finish(self):
+        if self.fieldnames:
+            return
+        if self._keys:
+            self._spool.seek(0)
+            w = csv.DictWriter(self._f, fieldnames=sorted(self._keys))
+            w.writeheader()
+            for line in self._spool:
+                w.writerow(json.loads(line))
+        self._spool.close()
+
+    def abort(self):
+        if not self.fieldnames:
+            self._spool.close()
+        super().abort()
+
+
+def stream_rows(rows: Iterable[Dict], sinks: Sequence[RowSink]) -> int:
+    # Feeds every row to every sink; all outputs are published together or not at all
+    n = 0
+    spent = [0.0] * len(sinks)
+    clock = time.perf_counter
+    try:
+        for row in rows:
+            for i, sink in enumerate(sinks):
+                start = clock()
+                sink.write(row)
+                spent[i] += clock() - start
+            n += 1
+    except BaseException:
+        for sink in sinks:
+            sink.abort()
+        raise
+    for i, sink in enumerate(sinks):
+        start = clock()
+        sink.close()
+        metrics.observe(f"save:{type(sink).__name__}", spent[i] + clock() - start, n)
+    return n
+
+
+def save_jsonl(path: str, rows: Iterable[Dict]):
+    stream_rows(rows, [JsonlSink(path)])
+
+
+def save_json(path: str, rows: Union[List[Dict], Dict]):
+    with RowSink(path) as sink:
+        json.dump(rows, sink._f, ensure_ascii=False, indent=2)
+
+
+def save_csv(path: str, rows: Iterable[Dict[str, str]], fieldnames: Optional[Sequence[str]] = None):
+    stream_rows(rows, [CsvSink(path, fieldnames)])
+
+
+def load_rows(data_dir: str, basename: str) -> Optional[List[Dict]]:
+    # A crawler output read back: the JSONL a streamed crawl wrote, else the JSON array
+    jsonl = os.path.join(data_dir, f"{basename}.jsonl")
+    if os.path.exists(jsonl):
+        with open(jsonl, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    try:
+        with open(os.path.join(data_dir, f"{basename}.json"), "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        return rows if isinstance(rows, list) else None
+    except (OSError, ValueError):
+        return None
+
+
+def pagination_links(links: Iterable[Tuple[str, str]], page_basename: str) -> List[str]:
+    # Page URLs among (text, href) pairs: numbered links pointing at `page_basename`
+    out: List[str] = []
+    for txt, href in links:
+        if not txt.isdigit() or not href:
             continue
         if page_basename in href:
             if href.startswith("http"):
-                links.append(href)
+                out.append(href)
             else:
-                links.append(f"https://www.isro.gov.in/{href.lstrip('/')}")
+                out.append(f"https://www.isro.gov.in/{href.lstrip('/')}")
     seen = set()
     uniq: List[str] = []
-    for u in links:
+    for u in out:
         if u not in seen:
             seen.add(u)
             uniq.append(u)
     return uniq
 
 
+def extract_pagination_links(soup: BeautifulSoup, page_basename: str) -> List[str]:
+    return pagination_links(SoupBackend().links(soup), page_basename)
+
+
+def _score_table(table: Tag, expected: Set[str]) -> int:
+    # Same score table_to_dicts would give (matched headers * 100 + data rows),
+    # read from the header row and a row count without normalizing any cell.
+    header_cells, has_thead = _header_cells(table)
+    trs = table.find_all("tr")
+    start_idx = 1 if (not has_thead and len(trs) > 0) else 0
+    n_rows = sum(1 for tr in trs[start_idx:] if tr.get_text(strip=True))
+    if not n_rows:
+        return -1
+    headers = {norm_key(c.get_text(" ")) for c in header_cells}
+    return len(headers & expected) * 100 + n_rows
+
+
 def best_table_by_headers(soup: BeautifulSoup, expected_keys: Iterable[str]) -> Optional[Tag]:
     candidates = soup.find_all("table")
     if not candidates:
@@ -189,14 +1109,360 @@ def best_table_by_headers(soup: BeautifulSoup, expected_keys: Iterable[str]) ->
     best: Optional[Tag] = None
     best_score = -1
     for t in candidates:
-        rows = table_to_dicts(t)
-        if not rows:
-            continue
-        keys = set().union(*[set(r.keys()) for r in rows])
-        score = len(keys & expected) * 100 + len(rows)
+        score = _score_table(t, expected)
         if score > best_score:
             best_score = score
             best = t
-    if best is None:
-        best = max(candidates, key=lambda x: len(table_to_dicts(x)) if table_to_dicts(x) else 0)
-    return best
+    # No table has a data row; keep the old fallback of the first one
+    return best if best is not None else candidates[0]
+
+
+class ParserBackend:
+    # Turns page bytes into a document and answers the few questions the link
+    # and table crawlers ask of it. Every backend must give the same answers
+    # as SoupBackend; `python crawlers/bench.py backends` checks that.
+    name = ""
+
+    def parse(self, content: bytes):
+        raise NotImplementedError
+
+    def links(self, doc) -> List[Tuple[str, str]]:
+        # (normalized text, raw href or "") of every <a>, in document order
+        raise NotImplementedError
+
+    def table_rows(self, doc, expected_keys: Iterable[str]) -> Optional[List[Dict[str, str]]]:
+        # table_to_dicts of best_table_by_headers; None when the page has no table
+        raise NotImplementedError
+
+    def text(self, doc) -> str:
+        raise NotImplementedError
+
+    def kv_pairs(self, doc) -> Dict[str, str]:
+        # table_kv_pairs: key -> value from two-cell table rows
+        raise NotImplementedError
+
+
+class SoupBackend(ParserBackend):
+    name = "soup"
+
+    def parse(self, content: bytes) -> BeautifulSoup:
+        return BeautifulSoup(content, "lxml")
+
+    def links(self, doc: BeautifulSoup) -> List[Tuple[str, str]]:
+        return [(norm_space(a.get_text(" ")), a.get("href") or "") for a in doc.find_all("a")]
+
+    def table_rows(self, doc: BeautifulSoup, expected_keys: Iterable[str]) -> Optional[List[Dict[str, str]]]:
+        t = best_table_by_headers(doc, expected_keys)
+        return None if t is None else table_to_dicts(t)
+
+    def text(self, doc: BeautifulSoup) -> str:
+        return norm_space(doc.get_text(" "))
+
+    def kv_pairs(self, doc: BeautifulSoup) -> Dict[str, str]:
+        return table_kv_pairs(doc)
+
+
+class LxmlBackend(ParserBackend):
+    # Reads the libxml2 tree lxml builds anyway under BeautifulSoup(..., "lxml"),
+    # without copying it into Python objects. Text follows get_text(): no
+    # comments, and nothing inside <script>, <style> or <template>.
+    name = "lxml"
+
+    _strings = etree.XPath(
+        "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]",
+        smart_strings=False,
+    )
+
+    def parse(self, content: bytes) -> Optional[etree._Element]:
+        # Same encoding pick as BeautifulSoup's lxml builder
+        detector = EncodingDetector(content, is_html=True)
+        encoding = next(iter(detector.encodings), None)
+        try:
+            return lxml.html.document_fromstring(detector.markup, parser=lxml.html.HTMLParser(encoding=encoding))
+        except (etree.ParserError, ValueError, LookupError):
+            return None
+
+    def _text(self, el: etree._Element) -> str:
+        return norm_space(" ".join(self._strings(el)))
+
+    def links(self, doc: Optional[etree._Element]) -> List[Tuple[str, str]]:
+        if doc is None:
+            return []
+        return [(self._text(a), a.get("href") or "") for a in doc.iter("a")]
+
+    def _header_cells(self, table: etree._Element) -> Tuple[List[etree._Element], bool]:
+        thead = next(table.iter("thead"), None)
+        if thead is not None:
+            tr = next(thead.iter("tr"), None)
+            if tr is not None:
+                cells = list(tr.iter("th", "td"))
+                if cells:
+                    return cells, True
+        first_tr = next(table.iter("tr"), None)
+        if first_tr is not None:
+            return list(first_tr.iter("th", "td")), thead is not None
+        return [], thead is not None
+
+    def _data_trs(self, table: etree._Element, has_thead: bool) -> List[etree._Element]:
+        trs = list(table.iter("tr"))
+        return trs[1:] if not has_thead else trs
+
+    def table_rows(self, doc: Optional[etree._Element], expected_keys: Iterable[str]) -> Optional[List[Dict[str, str]]]:
+        candidates = [] if doc is None else list(doc.iter("table"))
+        if not candidates:
+            return None
+        expected = {norm_key(k) for k in expected_keys}
+        best, best_score = candidates[0], -1
+        for t in candidates:
+            # _score_table on the lxml tree
+            header_cells, has_thead = self._header_cells(t)
+            n_rows = sum(1 for tr in self._data_trs(t, has_thead) if any(s.strip() for s in self._strings(tr)))
+            if not n_rows:
+                continue
+            score = len({norm_key(self._text(c)) for c in header_cells} & expected) * 100 + n_rows
+            if score > best_score:
+                best, best_score = t, score
+
+        header_cells, has_thead = self._header_cells(best)
+        headers = [norm_key(self._text(c)) for c in header_cells]
+        rows: List[Dict[str, str]] = []
+        for tr in self._data_trs(best, has_thead):
+            cells = [self._text(td) for td in tr.iter("td", "th")]
+            if not cells or all(not c for c in cells):
+                continue
+            rows.append({(headers[i] if i < len(headers) else f"col_{i+1}"): val for i, val in enumerate(cells)})
+        return rows
+
+    def text(self, doc: Optional[etree._Element]) -> str:
+        return "" if doc is None else self._text(doc)
+
+    def kv_pairs(self, doc: Optional[etree._Element]) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        if doc is None:
+            return out
+        for table in doc.iter("table"):
+            for tr in table.iter("tr"):
+                tds = list(tr.iter("td", "th"))
+                if len(tds) >= 2:
+                    key = kv_key(self._text(tds[0]))
+                    val = self._text(tds[1]).strip()
+                    if key and val and key not in out:
+                        out[key] = val
+        return out
+
+
+PARSER_BACKENDS: Dict[str, ParserBackend] = {b.name: b for b in (SoupBackend(), LxmlBackend())}
+
+_parser_backend = os.environ.get("ISRO_PARSER", "lxml")
+
+
+def set_parser_backend(name: str) -> ParserBackend:
+    global _parser_backend
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"unknown parser backend {name!r}; expected one of {', '.join(sorted(PARSER_BACKENDS))}")
+    _parser_backend = name
+    return PARSER_BACKENDS[name]
+
+
+class Page:
+    # A fetched page parsed by one backend, as handed to extract_page() callbacks
+    def __init__(self, content: bytes, backend: ParserBackend):
+        self.backend = backend
+        with metrics.timed(f"dom:{backend.name}"):
+            self.doc = backend.parse(content)
+
+    def links(self) -> List[Tuple[str, str]]:
+        with metrics.timed("links"):
+            return self.backend.links(self.doc)
+
+    def table_rows(self, expected_keys: Iterable[str]) -> Optional[List[Dict[str, str]]]:
+        with metrics.timed("tables"):
+            return self.backend.table_rows(self.doc, expected_keys)
+
+    def text(self) -> str:
+        with metrics.timed("text"):
+            return self.backend.text(self.doc)
+
+    def kv_pairs(self) -> Dict[str, str]:
+        with metrics.timed("tables"):
+            return self.backend.kv_pairs(self.doc)
+
+
+def _table_rows(expected: List[str], page: Page) -> List[Dict[str, str]]:
+    return page.table_rows(expected) or []
+
+
+def _first_table_page(expected: List[str], page_basename: str, page: Page) -> Dict[str, List]:
+    rows = page.table_rows(expected)
+    if rows is None:
+        return {"rows": [], "pages": []}
+    return {"rows": rows, "pages": pagination_links(page.links(), page_basename)}
+
+
+def iter_paginated_table(
+    base: str,
+    page_basename: str,
+    expected_headers: Iterable[str],
+    *,
+    max_workers: int = 4,
+) -> Iterator[Dict[str, str]]:
+    expected = list(expected_headers)
+    first = extract_page(base, partial(_first_table_page, expected, page_basename), name=page_basename)
+    yield from first["rows"]
+
+    urls = [u for u in first["pages"] if u != base]
+
+    def load(url: str) -> List[Dict[str, str]]:
+        return extract_page(url, partial(_table_rows, expected), name=page_basename)
+
+    # map() hands results back in page order while pages are fetched and parsed concurrently
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for page_rows in pool.map(load, urls):
+            yield from page_rows
+
+
+# Async engine: the same fetch, parse and pacing as above on one event loop,
+# for crawls with many pages in flight. Requests share the host budget, the
+# response cache, the page memo and the parse pool with the threaded path;
+# only the HTTP client differs. Needs httpx.
+
+_async_client: Optional["httpx.AsyncClient"] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_transport: Optional[Callable[[], "httpx.AsyncBaseTransport"]] = None
+
+
+def configure_async_transport(factory: Optional[Callable[[], "httpx.AsyncBaseTransport"]]):
+    # Transport for clients created from now on (a fresh one per event loop);
+    # None restores httpx's own. Benchmarks use it to replay recorded pages.
+    global _async_transport
+    _async_transport = factory
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    # One client, and so one connection pool, per event loop; in-flight
+    # requests per host are capped by the host budget rather than the pool
+    global _async_client, _async_client_loop
+    httpx = optional_module("httpx")
+    if httpx is None:
+        raise RuntimeError("httpx is not installed; the async crawler needs it")
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=_pool_size)
+        transport = _async_transport() if _async_transport is not None else None
+        _async_client = httpx.AsyncClient(headers=DEFAULT_HEADERS, follow_redirects=True, limits=limits, transport=transport)
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client, _async_client_loop
+    client = _async_client
+    _async_client = _async_client_loop = None
+    if client is not None:
+        await client.aclose()
+
+
+async def async_fetch(url: str, *, timeout: int = 20, max_retries: int = 3, backoff: float = 1.5) -> FetchResult:
+    start = time.perf_counter()
+    try:
+        res = await _async_fetch(url, timeout=timeout, max_retries=max_retries, backoff=backoff)
+    except Exception:
+        _record_fetch(url, start, None)
+        raise
+    _record_fetch(url, start, res)
+    return res
+
+
+async def _async_fetch(url: str, *, timeout: int, max_retries: int, backoff: float) -> FetchResult:
+    # _fetch() with awaited requests and waits. Cache reads and writes are
+    # small local files and stay on the loop.
+    cache = get_cache()
+    hit = _cached_result(cache, url)
+    if hit is not None:
+        return hit
+
+    client = get_async_client()
+    budget = _budget
+    last_exc: Optional[Exception] = None
+    for attempt in range(1, max_retries + 1):
+        stale = _circuit_result(budget, cache, url, attempt)
+        if stale is not None:
+            return stale
+        try:
+            headers = cache.conditional_headers(url) if cache else {}
+            async with budget.aslot(url):
+                start = time.monotonic()
+                resp = await client.get(url, headers=headers, timeout=timeout)
+        except Exception as exc:
+            budget.record_failure(url)
+            last_exc = exc
+            if attempt < max_retries:
+                await asyncio.sleep(_backoff_delay(backoff, attempt))
+            continue
+
+        res, wait = _settle(budget, cache, url, resp.status_code, resp.content, resp.headers,
+                            time.monotonic() - start, attempt, max_retries, backoff)
+        if res is not None:
+            return res
+        if wait > 0:
+            await asyncio.sleep(wait)
+    if last_exc:
+        raise last_exc
+    raise RuntimeError(f"Failed to fetch {url}")
+
+
+async def async_get_soup(url: str) -> BeautifulSoup:
+    res = await async_fetch(url)
+    if res.status_code >= 400:
+        raise RuntimeError(f"HTTP {res.status_code} fetching {url}")
+    with metrics.timed("parse:get_soup"):
+        return BeautifulSoup(res.content, "lxml")
+
+
+async def _async_parse_fetched(url: str, run: Callable[[bytes], T], *, name: str, parser: Callable) -> T:
+    res = await async_fetch(url)
+    if res.status_code >= 400:
+        raise RuntimeError(f"HTTP {res.status_code} fetching {url}")
+    pool = _parse_pool
+
+    async def parse(content: bytes) -> T:
+        metrics.inc("pages_parsed", source=name)
+        if pool is not None:
+            # Off the loop, so fetches carry on while the page is parsed
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, run, content)
+            finally:
+                metrics.observe(f"parse:{name}", time.perf_counter() - start)
+        # Inline parsing holds the loop; timed here so other tasks' work is not counted
+        with metrics.timed(f"parse:{name}"):
+            return run(content)
+
+    metrics.inc("pages", source=name)
+    return await parse_memoized_async(_page_memo, memo_key(name, parser, url), res.content, parse)
+
+
+async def async_parse_page(url: str, parse: Callable[[BeautifulSoup], T], *, name: str) -> T:
+    return await _async_parse_fetched(url, partial(_parse_bytes, parse), name=name, parser=parse)
+
+
+async def async_extract_page(url: str, extract: Callable[["Page"], T], *, name: str) -> T:
+    return await _async_parse_fetched(url, partial(_extract_bytes, extract, _parser_backend), name=name, parser=extract)
+
+
+async def async_paginated_table(base: str, page_basename: str, expected_headers: Iterable[str]) -> RowTable:
+    # iter_paginated_table() as a RowTable, with every page after the first fetched at once;
+    # the host budget still decides how many are actually in flight
+    expected = list(expected_headers)
+    first = await async_extract_page(base, partial(_first_table_page, expected, page_basename), name=page_basename)
+    table = RowTable(first["rows"])
+    urls = [u for u in first["pages"] if u != base]
+    tasks = [asyncio.ensure_future(async_extract_page(u, partial(_table_rows, expected), name=page_basename)) for u in urls]
+    try:
+        # Packed page by page in order, so only pages that finished early wait as dicts
+        for task in tasks:
+            table.extend(await task)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return table
@@ -4,9 +4,24 @@ const path = require('path')
 const {
     getDb
 } = require('../../db/mongo')
+const {
+    renameKey
+} = require('../../utils/columnKeys')
+const {
+    searchIndex
+} = require('../../utils/searchIndex')
+const {
+    getMission
+} = require('../../utils/entities')
+const {
+    getText
+} = require('../../utils/textStore')
 
 const router = express.Router()
 
+// Numeric columns of launch_vehicle_specs rows (crawlers/launch_vehicle_specs.NUMERIC_FIELDS)
+const SPEC_NUMERIC_FIELDS = ['stages', 'height_m', 'diameter_m', 'liftoff_mass_t', 'payload_leo_kg', 'payload_gto_kg', 'payload_sub_gto_kg', 'payload_sso_kg']
+
 function buildRegexFromQuery(q) {
     // make flexible regex so dash_space_underscore is same
     const s = String(q || '').trim().toLowerCase()
@@ -73,18 +88,15 @@ function cleanItem(o) {
     for (const [k, v] of Object.entries(o || {})) {
         if (k.includes('uparrowdownarrow')) continue
         if (isHeaderArtifact(v)) continue
-        let nk = k
-        if (nk === 'serial') nk = 'sl_no'
-        if (nk === 's_no' || nk === 'sl_no_') nk = 'sl_no'
-        if (nk === 'date') nk = 'launch_date'
-        if (nk === 'name_of_satellite' || nk === 'spacecraft' || nk === 'satellite') nk = 'name'
-        nk = nk.replace(/_uparrowdownarrow$/i, '')
-        out[nk] = v
+        out[renameKey(k)] = v
     }
     if (out.launch_vehicle_mission && (!out.launch_vehicle || !out.mission)) {
         const lvm = String(out.launch_vehicle_mission)
         if (lvm.includes('/')) {
-            const [lv, ms] = lvm.split('/', 1)
+            // same split as utils/ingest_launches.js: vehicle before the first '/', mission after it
+            const parts = lvm.split('/')
+            const lv = parts.shift()
+            const ms = parts.join('/')
             out.launch_vehicle = out.launch_vehicle || lv.trim()
             out.mission = out.mission || ms.trim()
         }
@@ -462,20 +474,30 @@ router.get('/launch-vehicle-specs', (req, res) => {
                     vehicle: {
                         $regex: re
                     }
-                }, {
-                    content: {
-                        $regex: re
-                    }
                 }, {
                     url: {
                         $regex: re
                     }
                 }]
             } : {}
+            // min_<field> / max_<field> on the numeric spec fields, e.g. min_payload_gto_kg=4000
+            for (const field of SPEC_NUMERIC_FIELDS) {
+                const range = {}
+                const min = parseFloat(req.query[`min_${field}`])
+                const max = parseFloat(req.query[`max_${field}`])
+                if (Number.isFinite(min)) range.$gte = min
+                if (Number.isFinite(max)) range.$lte = max
+                if (Object.keys(range).length) q[field] = range
+            }
             const sort = parseSort(req.query.sort)
             const total = await col.countDocuments(q)
+            // Page text lives in the text store (GET /api/texts/:hash), never in the rows;
+            // older documents may still carry the full dump in content
             const docs = await col.find(q, {
-                sort
+                sort,
+                projection: {
+                    content: 0
+                }
             }).skip(skip).limit(limit).toArray()
             return res.json({
                 items: docs,
@@ -493,6 +515,25 @@ router.get('/launch-vehicle-specs', (req, res) => {
     })()
 })
 
+router.get('/texts/:hash', (req, res) => {
+    try {
+        // raw page text a crawled row references by its text_hash
+        const text = getText(req.params.hash)
+        if (text === null) return res.status(404).json({
+            error: 'text not found'
+        })
+        return res.json({
+            hash: req.params.hash.toLowerCase(),
+            text
+        })
+    } catch (e) {
+        console.error(e)
+        return res.status(500).json({
+            error: 'failed to load text'
+        })
+    }
+})
+
 router.get('/search', (req, res) => {
     ;
     (async () => {
@@ -503,6 +544,17 @@ router.get('/search', (req, res) => {
             if (!q || !String(q).trim()) return res.status(400).json({
                 error: 'q required'
             })
+            // prebuilt BM25 index from the crawler when present, mongo regex scan otherwise
+            const ranked = searchIndex(q)
+            if (ranked) {
+                // index docs are raw crawler rows; clean them the way the ingested
+                // collections were, so both paths return the same doc shape
+                const hits = ranked
+                    .map(hit => ({ ...hit, doc: cleanItem(hit.doc) }))
+                    .filter(hit => Object.keys(hit.doc).length > 0)
+                return res.json(paginate(hits, req.query.page, req.query.limit))
+            }
+
             const re = buildRegexFromQuery(q)
             const extra = expandSynonyms(q) // add few alias like lvm3/gslv
 
@@ -627,6 +679,25 @@ router.get('/search', (req, res) => {
     })()
 })
 
+router.get('/missions/:id', (req, res) => {
+    try {
+        // canonical id or any name variant, resolved against the crawler's join tables
+        const mission = getMission(req.params.id)
+        if (mission === undefined) return res.status(503).json({
+            error: 'entity index not built'
+        })
+        if (!mission) return res.status(404).json({
+            error: 'mission not found'
+        })
+        return res.json(mission)
+    } catch (e) {
+        console.error(e)
+        return res.status(500).json({
+            error: 'failed to load mission'
+        })
+    }
+})
+
 router.get('/analytics/launches', (req, res) => {
     ;
     (async () => {
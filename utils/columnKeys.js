@@ -0,0 +1,15 @@
+const path = require('path')
+
+// Same alias file the Python crawlers normalize headers with
+const ALIASES = require(path.join(__dirname, '..', 'crawlers', 'column_aliases.json'))
+
+const KEY_RENAMES = ALIASES.keys || {}
+const SUFFIX_RES = (ALIASES.strip_suffixes || []).map(s => new RegExp(`${s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}$`, 'i'))
+
+function renameKey(k) {
+  let nk = Object.prototype.hasOwnProperty.call(KEY_RENAMES, k) ? KEY_RENAMES[k] : k
+  for (const re of SUFFIX_RES) nk = nk.replace(re, '')
+  return nk
+}
+
+module.exports = { renameKey }
@@ -0,0 +1,104 @@
+const fs = require('fs')
+const path = require('path')
+
+// Mission and flight join tables from data/entities.json, built by crawlers/entities.py
+const DEFAULT_FILE = path.join(process.cwd(), 'data', 'entities.json')
+const MATCH_THRESHOLD = 0.6 // same as entities.MATCH_THRESHOLD
+
+let cached = null // { file, mtimeMs, entities, canonicalId, blocks }
+
+function makeCanonicalizer(spec) {
+  const aliases = (spec.aliases || []).map(([p, r]) => [new RegExp(p, 'g'), r])
+  const split = new RegExp(spec.split || '[^a-z0-9]+')
+  const filler = new Set(spec.filler || [])
+  const isAlpha = t => /^[a-z]+$/.test(t)
+  return name => {
+    let s = String(name || '').toLowerCase()
+    for (const [re, r] of aliases) s = s.replace(re, r)
+    let parts = s.split(split).filter(Boolean)
+    if (parts.some(t => isAlpha(t) && !filler.has(t))) parts = parts.filter(t => !filler.has(t))
+    const tokens = []
+    for (const t of parts) {
+      const last = tokens[tokens.length - 1]
+      if (/^\d+$/.test(t) && last && isAlpha(last) && last.length <= 2) tokens[tokens.length - 1] = last + t
+      else if (!tokens.includes(t)) tokens.push(t)
+    }
+    return tokens.join('-')
+  }
+}
+
+function numbersOf(key) {
+  return [...new Set(key.match(/\d+/g) || [])].sort().join(',')
+}
+
+// Same blocking keys as entities._blocks
+function blocksOf(key) {
+  const numbers = numbersOf(key)
+  if (numbers) return ['#' + numbers]
+  const toks = key.split('-')
+  const out = toks.filter(t => t.length >= 4)
+  return out.length ? out : toks
+}
+
+// Reloads only when the crawler has replaced the file
+function loadEntities(file = DEFAULT_FILE) {
+  let st
+  try {
+    st = fs.statSync(file)
+  } catch (e) {
+    return null
+  }
+  if (cached && cached.file === file && cached.mtimeMs === st.mtimeMs) return cached
+  const entities = JSON.parse(fs.readFileSync(file, 'utf8'))
+  const blocks = new Map()
+  for (const variant of Object.keys(entities.lookup.missions)) {
+    for (const b of blocksOf(variant)) {
+      if (!blocks.has(b)) blocks.set(b, [])
+      blocks.get(b).push(variant)
+    }
+  }
+  cached = { file, mtimeMs: st.mtimeMs, entities, canonicalId: makeCanonicalizer(entities.canonical || {}), blocks }
+  return cached
+}
+
+// Mission id for an id or any spelling of a name; the same exact-then-blocked
+// token overlap match the crawler resolves with
+function resolveMission(q, { file } = {}) {
+  const loaded = loadEntities(file)
+  if (!loaded) return null
+  const { entities, canonicalId, blocks } = loaded
+  const key = canonicalId(q)
+  if (!key) return null
+  if (entities.missions[key]) return key
+  if (entities.lookup.missions[key]) return entities.lookup.missions[key]
+  const tokens = new Set(key.split('-'))
+  const numbers = numbersOf(key)
+  const candidates = new Set()
+  for (const b of blocksOf(key)) for (const v of blocks.get(b) || []) candidates.add(v)
+  let best = null
+  let bestScore = MATCH_THRESHOLD
+  for (const variant of [...candidates].sort()) {
+    if (numbersOf(variant) !== numbers) continue
+    const other = variant.split('-')
+    const shared = other.filter(t => tokens.has(t)).length
+    const score = shared / (tokens.size + other.length - shared)
+    if (score >= bestScore) {
+      best = entities.lookup.missions[variant]
+      bestScore = score
+    }
+  }
+  return best
+}
+
+// The mission with its flight's launches and spacecraft joined in
+function getMission(q, { file } = {}) {
+  const loaded = loadEntities(file)
+  if (!loaded) return undefined
+  const id = resolveMission(q, { file })
+  if (!id) return null
+  const mission = loaded.entities.missions[id]
+  const flight = mission.flight ? loaded.entities.flights[mission.flight] : null
+  return { id, ...mission, flight: flight ? { id: mission.flight, ...flight } : null }
+}
+
+module.exports = { loadEntities, resolveMission, getMission }
@@ -1,6 +1,8 @@
 const fs = require('fs')
 const path = require('path')
 const { getDb } = require('../db/mongo')
+const { renameKey } = require('./columnKeys')
+const { readSnapshot } = require('./snapshot')
 
 function isHeaderArtifact(val) {
   if (!val) return false
@@ -12,13 +14,7 @@ function cleanItem(o) {
   const out = {}
   for (const [k, v] of Object.entries(o || {})) {
   if (isHeaderArtifact(v)) continue
-    let nk = k
-    if (nk === 'serial') nk = 'sl_no'
-    if (nk === 's_no' || nk === 'sl_no_') nk = 'sl_no'
-  if (nk === 'date') nk = 'launch_date'
-    if (nk === 'name_of_satellite' || nk === 'spacecraft' || nk === 'satellite') nk = 'name'
-  nk = nk.replace(/_uparrowdownarrow$/i, '')
-    out[nk] = v
+    out[renameKey(k)] = v
   }
   if (out.launch_vehicle_mission && (!out.launch_vehicle || !out.mission)) {
     const lvm = String(out.launch_vehicle_mission)
@@ -52,6 +48,19 @@ function readJson(fp) {
   }
 }
 
+// Rows from the .isrocol snapshot run_all writes next to the JSON output, when it
+// is at least as new; decodes only the cells instead of parsing the whole table
+function readRows(fp) {
+  const p = path.join(process.cwd(), fp)
+  const snap = p.replace(/\.json$/, '.isrocol')
+  try {
+    if (snap !== p && fs.statSync(snap).mtimeMs >= fs.statSync(p).mtimeMs) {
+      return readSnapshot(snap).readRows()
+    }
+  } catch (e) { /* no usable snapshot: read the JSON */ }
+  return readJson(fp)
+}
+
 async function ensureIndexes(col) {
   const idx = await col.indexes()
   for (const i of idx) {
@@ -76,7 +85,7 @@ async function upsertMany(col, docs, keyFields) {
 
 async function pushLaunchesToMongo({ file = 'data/launch_missions.json' } = {}) {
   const db = await getDb()
-  const raw = readJson(file)
+  const raw = readRows(file)
   const data = cleanData(raw)
   const col = db.collection('launches')
   await ensureIndexes(col)
@@ -0,0 +1,62 @@
+const fs = require('fs')
+const path = require('path')
+
+// BM25 search over data/search_index.json, built by crawlers/search_index.py
+const DEFAULT_FILE = path.join(process.cwd(), 'data', 'search_index.json')
+
+let cached = null // { file, mtimeMs, index, tokenize }
+
+function makeTokenizer(spec) {
+  const synonyms = (spec.synonyms || []).map(([p, r]) => [new RegExp(p, 'g'), r])
+  const split = new RegExp(spec.split || '[^a-z0-9]+')
+  const stop = new Set(spec.stopwords || [])
+  return text => {
+    let s = String(text || '').toLowerCase()
+    for (const [re, r] of synonyms) s = s.replace(re, r)
+    return s.split(split).filter(t => t && !stop.has(t))
+  }
+}
+
+// Reloads only when the crawler has replaced the file
+function loadIndex(file = DEFAULT_FILE) {
+  let st
+  try {
+    st = fs.statSync(file)
+  } catch (e) {
+    return null
+  }
+  if (cached && cached.file === file && cached.mtimeMs === st.mtimeMs) return cached
+  const index = JSON.parse(fs.readFileSync(file, 'utf8'))
+  cached = { file, mtimeMs: st.mtimeMs, index, tokenize: makeTokenizer(index.tokenizer || {}) }
+  return cached
+}
+
+function searchIndex(q, { file, types } = {}) {
+  const loaded = loadIndex(file)
+  if (!loaded) return null
+  const { index, tokenize } = loaded
+  const n = index.docs.length
+  const { k1, b } = index.bm25
+  const avgdl = index.bm25.avgdl || 1
+  const scores = new Map()
+  for (const term of new Set(tokenize(q))) {
+    const plist = index.postings[term]
+    if (!plist) continue
+    const idf = Math.log(1 + (n - plist.length + 0.5) / (plist.length + 0.5))
+    for (const [docId, tf] of plist) {
+      const dl = index.lengths[docId]
+      const s = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+      scores.set(docId, (scores.get(docId) || 0) + s)
+    }
+  }
+  const hits = []
+  for (const [docId, score] of scores) {
+    const d = index.docs[docId]
+    if (types && !types.includes(d.type)) continue
+    hits.push({ type: d.type, doc: d.doc, score, docId })
+  }
+  hits.sort((x, y) => y.score - x.score || x.docId - y.docId)
+  return hits.map(({ type, doc, score }) => ({ type, doc, score }))
+}
+
+module.exports = { loadIndex, searchIndex }
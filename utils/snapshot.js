@@ -0,0 +1,86 @@
+const fs = require('fs')
+
+// Reader for the .isrocol columnar snapshots written by crawlers/snapshot.py
+const MAGIC = 'ISROCOL1'
+const NULL_CODE = 0xFFFFFFFF
+
+function u32(body, [off, len]) {
+  // blocks are 8-byte aligned in the file; copy only if the buffer itself is not
+  const start = body.byteOffset + off
+  if (start % 4 === 0) return new Uint32Array(body.buffer, start, len / 4)
+  return new Uint32Array(body.buffer.slice(start, start + len))
+}
+
+function stringBlock(body, meta) {
+  const offsets = u32(body, meta.offsets)
+  const [dataOff] = meta.data
+  const nulls = meta.nulls ? body.subarray(meta.nulls[0], meta.nulls[0] + meta.nulls[1]) : null
+  return {
+    length: offsets.length - 1,
+    get(i) {
+      if (nulls && (nulls[i >> 3] & (1 << (i & 7)))) return null
+      return body.toString('utf8', dataOff + offsets[i], dataOff + offsets[i + 1])
+    }
+  }
+}
+
+function makeColumn(body, meta) {
+  const decode = meta.json ? v => (v == null ? v : JSON.parse(v)) : v => v
+  if (meta.encoding === 'dict') {
+    const codes = u32(body, meta.codes)
+    const block = stringBlock(body, meta.dictionary)
+    const dictionary = Array.from({ length: block.length }, (_, i) => block.get(i))
+    return {
+      name: meta.name,
+      dictionary,
+      codes,
+      get: i => (codes[i] === NULL_CODE ? null : decode(dictionary[codes[i]]))
+    }
+  }
+  const block = stringBlock(body, meta)
+  return { name: meta.name, get: i => decode(block.get(i)) }
+}
+
+function readSnapshot(file) {
+  const buf = fs.readFileSync(file)
+  if (buf.toString('latin1', 0, MAGIC.length) !== MAGIC) throw new Error(`${file} is not a columnar snapshot`)
+  const headerLen = buf.readUInt32LE(MAGIC.length)
+  const start = MAGIC.length + 8
+  const header = JSON.parse(buf.toString('utf8', start, start + headerLen))
+  const body = buf.subarray(start + headerLen)
+  const metas = Object.fromEntries(header.columns.map(m => [m.name, m]))
+  const cache = {}
+
+  function column(name) {
+    if (!metas[name]) return null
+    if (!cache[name]) cache[name] = makeColumn(body, metas[name])
+    return cache[name]
+  }
+
+  function sortOrder(name) {
+    return header.sort && header.sort[name] ? u32(body, header.sort[name]) : null
+  }
+
+  // Only the requested columns are decoded; `order` walks a precomputed sort
+  function rows({ columns, order, desc = false } = {}) {
+    const cols = (columns || Object.keys(metas)).map(column).filter(Boolean)
+    let idx = order ? sortOrder(order) : null
+    if (idx && desc) idx = Uint32Array.from(idx).reverse()
+    const n = header.rows
+    const out = new Array(n)
+    for (let j = 0; j < n; j++) {
+      const i = idx ? idx[j] : j
+      const row = {}
+      for (const c of cols) {
+        const v = c.get(i)
+        if (v != null) row[c.name] = v
+      }
+      out[j] = row
+    }
+    return out
+  }
+
+  return { rows: header.rows, columns: Object.keys(metas), column, sortOrder, readRows: rows }
+}
+
+module.exports = { readSnapshot }
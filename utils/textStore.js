@@ -0,0 +1,24 @@
+const fs = require('fs')
+const path = require('path')
+const zlib = require('zlib')
+
+// Raw page text the crawler keeps out of its rows: data/texts/<sha256>.txt.gz,
+// written by crawlers/text_store.py. Rows reference a text by its text_hash.
+const DEFAULT_DIR = path.join(process.cwd(), 'data', 'texts')
+const BLOB_SUFFIX = '.txt.gz' // same as text_store.BLOB_SUFFIX
+const HASH_RE = /^[0-9a-f]{64}$/
+
+// Text for a hash; null when it is malformed or no longer stored
+function getText(hash, dir = DEFAULT_DIR) {
+    const key = String(hash || '').toLowerCase()
+    if (!HASH_RE.test(key)) return null
+    let blob
+    try {
+        blob = fs.readFileSync(path.join(dir, key + BLOB_SUFFIX))
+    } catch (e) {
+        return null
+    }
+    return zlib.gunzipSync(blob).toString('utf8')
+}
+
+module.exports = { getText }